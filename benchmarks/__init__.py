@@ -0,0 +1 @@
+"""Offline end-to-end benchmarks for the research graph."""
@@ -0,0 +1,71 @@
+"""Compare two benchmark result files.
+
+Usage:
+    python -m benchmarks.compare baseline.json candidate.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from typing import Any, Optional
+
+METRICS = ("latency_seconds", "llm_calls", "prompt_tokens", "completion_tokens")
+
+
+def _load(path: str) -> dict[str, Any]:
+    with open(path) as file:
+        result: dict[str, Any] = json.load(file)
+    return result
+
+
+def _node_seconds(results: dict[str, Any]) -> dict[str, float]:
+    """Return the mean seconds spent in each node per run."""
+    totals: dict[str, float] = {}
+    for run in results["runs"]:
+        for node, stats in run["nodes"].items():
+            totals[node] = totals.get(node, 0.0) + stats["seconds"]
+    return {node: total / len(results["runs"]) for node, total in totals.items()}
+
+
+def _row(name: str, baseline: float, candidate: float) -> str:
+    change = (candidate - baseline) / baseline * 100 if baseline else 0.0
+    return f"{name:<28}{baseline:>14.2f}{candidate:>14.2f}{change:>+10.1f}%"
+
+
+def compare(baseline: dict[str, Any], candidate: dict[str, Any]) -> str:
+    """Return a table of the median metrics and mean node times of two results."""
+    lines = [f"{'metric':<28}{'baseline':>14}{'candidate':>14}{'change':>11}"]
+    for metric in METRICS:
+        lines.append(
+            _row(
+                metric,
+                baseline["summary"][metric]["median"],
+                candidate["summary"][metric]["median"],
+            )
+        )
+    baseline_nodes = _node_seconds(baseline)
+    candidate_nodes = _node_seconds(candidate)
+    for node in dict.fromkeys([*baseline_nodes, *candidate_nodes]):
+        lines.append(
+            _row(
+                f"{node} (s)",
+                baseline_nodes.get(node, 0.0),
+                candidate_nodes.get(node, 0.0),
+            )
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """Compare two result files from the command line."""
+    parser = argparse.ArgumentParser(description="Compare two benchmark results.")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    args = parser.parse_args(argv)
+    sys.stdout.write(compare(_load(args.baseline), _load(args.candidate)) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,420 @@
+"""Deterministic stand-ins for the chat models, search, Wikipedia and embeddings.
+
+Every fake derives its output from a hash of its input, so repeated runs send
+the graph down exactly the same path, and simulates latency with
+`asyncio.sleep` so runs measure the graph's own scheduling and overhead.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+from collections.abc import AsyncIterator, Iterator, Sequence
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+from unittest import mock
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel, LanguageModelInput
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import Runnable
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import Field
+
+from web_research_graph import embeddings, tools, utils, wikipedia
+from web_research_graph.text import content_terms, count_tokens
+
+WORDS = (
+    "history culture economy trade empire river city law army language art "
+    "science religion politics people region century period growth decline "
+    "reform network record source evidence archive study scholar influence "
+    "development structure society institution practice tradition innovation"
+).split()
+
+SECTION_TITLES = [
+    "History",
+    "Background",
+    "Development",
+    "Structure",
+    "Influence",
+    "Reception",
+    "Legacy",
+    "Criticism",
+]
+
+_TOPIC_PATTERNS = [
+    re.compile(pattern)
+    for pattern in (
+        r"Topic of interest: (.+)",
+        r"Create a Wikipedia outline for: (.+)",
+        r"Topic you are writing about: (.+)",
+        r"wiki article on (.+?)(?: using|\.|$)",
+    )
+]
+_SECTION_RE = re.compile(r"Write the full WikiSection for the (.+?) section")
+_HREF_RE = re.compile(r'href="([^"]+)"')
+
+
+@dataclass
+class FakeSettings:
+    """Latency and size settings shared by the fakes."""
+
+    # Seconds before a model starts answering
+    model_latency: float = 0.05
+    # Simulated prompt processing and generation speeds
+    prompt_tokens_per_second: float = 20000.0
+    completion_tokens_per_second: float = 400.0
+    # Length of text responses, see FakeChatModel
+    completion_tokens: int = 200
+    # Number of sections in generated outlines
+    sections: int = 5
+    search_latency: float = 0.2
+    wikipedia_latency: float = 0.3
+    embedding_latency: float = 0.05
+    embedding_size: int = 256
+
+
+# Settings without any latency, for tests that only check behaviour
+INSTANT = FakeSettings(
+    model_latency=0,
+    prompt_tokens_per_second=1e9,
+    completion_tokens_per_second=1e9,
+    completion_tokens=20,
+    sections=2,
+    search_latency=0,
+    wikipedia_latency=0,
+    embedding_latency=0,
+)
+
+
+def _rng(text: str) -> random.Random:
+    """Return a random generator seeded by a text."""
+    return random.Random(hashlib.sha256(text.encode("utf-8")).hexdigest())
+
+
+def fake_text(seed: str, words: int) -> str:
+    """Return deterministic filler text with the given number of words."""
+    rng = _rng(seed)
+    return " ".join(rng.choice(WORDS) for _ in range(max(1, words))) + "."
+
+
+def _find_topic(prompt: str) -> str:
+    for pattern in _TOPIC_PATTERNS:
+        match = pattern.search(prompt)
+        if match:
+            return match.group(1).strip()
+    return "the topic"
+
+
+def fake_structured_output(name: str, prompt: str, settings: FakeSettings) -> Any:
+    """Return deterministic arguments for a structured output tool call."""
+    topic = _find_topic(prompt)
+    if name == "TopicValidation":
+        user_input = prompt.rsplit("Human: ", 1)[-1].strip()
+        return {"is_valid": True, "topic": user_input, "message": None}
+    if name == "RelatedTopics":
+        return {"topics": [f"{topic} {word}" for word in ("history", "culture")]}
+    if name == "Perspectives":
+        return {
+            "editors": [
+                {
+                    "affiliation": f"{role} Institute",
+                    "name": f"{role} Editor",
+                    "role": role,
+                    "description": fake_text(f"{prompt}{role}", 20),
+                }
+                for role in ("Historian", "Economist", "Critic")
+            ]
+        }
+    citations = list(dict.fromkeys(re.findall(r"https?://[^\s\"'<>)\]]+", prompt)))
+    if name == "Outline":
+        return {
+            "page_title": topic,
+            "sections": [
+                {
+                    "section_title": title,
+                    "description": fake_text(f"{topic}{title}", 30),
+                    "subsections": [],
+                    "citations": citations[:3],
+                }
+                for title in SECTION_TITLES[: settings.sections]
+            ],
+        }
+    if name == "Section":
+        match = _SECTION_RE.search(prompt)
+        title = match.group(1) if match else "Section"
+        hrefs = list(dict.fromkeys(_HREF_RE.findall(prompt)))
+        markers = " ".join(f"[{i}]" for i in range(1, len(hrefs) + 1))
+        return {
+            "section_title": title,
+            "description": f"{fake_text(prompt, 120)} {markers}".strip(),
+            "subsections": [
+                {
+                    "subsection_title": f"{title} {part}",
+                    "description": fake_text(f"{prompt}{part}", 80),
+                }
+                for part in ("overview", "details")
+            ],
+            "citations": hrefs,
+        }
+    raise ValueError(f"No fake structured output for {name}")
+
+
+class FakeChatModel(BaseChatModel):
+    """A chat model that answers with deterministic text after a simulated delay.
+
+    Text responses are `completion_tokens` words long. Calls with `max_tokens`
+    set are writing passes, which answer with half the prompt when that is
+    longer, up to `max_tokens`. Structured output is answered with a tool call
+    built by `fake_structured_output`.
+    """
+
+    model: str = "fake"
+    max_tokens: Optional[int] = None
+    settings: FakeSettings = Field(default_factory=FakeSettings)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-benchmark"
+
+    def bind_tools(
+        self, tools: Sequence[Any], **kwargs: Any
+    ) -> Runnable[LanguageModelInput, BaseMessage]:
+        """Bind tools, used to answer with structured output."""
+        kwargs.pop("tool_choice", None)
+        return self.bind(
+            tools=[convert_to_openai_tool(tool) for tool in tools], **kwargs
+        )
+
+    def _respond(
+        self, messages: list[BaseMessage], tools: Optional[list[dict[str, Any]]]
+    ) -> tuple[AIMessage, float, float]:
+        """Build the response with the time to first token and generation time."""
+        prompt = "\n".join(f"{m.type.capitalize()}: {m.content}" for m in messages)
+        prompt_tokens = count_tokens(prompt)
+        if tools:
+            name = tools[0]["function"]["name"]
+            args = fake_structured_output(name, prompt, self.settings)
+            content = ""
+            completion = json.dumps(args)
+            tool_calls = [{"name": name, "args": args, "id": "call_0"}]
+        else:
+            words = self.settings.completion_tokens
+            if self.max_tokens is not None:
+                words = min(max(words, prompt_tokens // 2), self.max_tokens)
+            content = completion = fake_text(prompt, words)
+            tool_calls = []
+        completion_tokens = count_tokens(completion)
+        message = AIMessage(
+            content=content,
+            tool_calls=tool_calls,
+            usage_metadata={
+                "input_tokens": prompt_tokens,
+                "output_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        )
+        first_token = (
+            self.settings.model_latency
+            + prompt_tokens / self.settings.prompt_tokens_per_second
+        )
+        generation = completion_tokens / self.settings.completion_tokens_per_second
+        return message, first_token, generation
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        message, first_token, generation = self._respond(messages, kwargs.get("tools"))
+        time.sleep(first_token + generation)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        message, first_token, generation = self._respond(messages, kwargs.get("tools"))
+        await asyncio.sleep(first_token + generation)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        message, first_token, generation = self._respond(messages, kwargs.get("tools"))
+        await asyncio.sleep(first_token)
+        if message.tool_calls:
+            await asyncio.sleep(generation)
+            call = message.tool_calls[0]
+            yield ChatGenerationChunk(
+                message=AIMessageChunk(
+                    content="",
+                    tool_call_chunks=[
+                        {
+                            "name": call["name"],
+                            "args": json.dumps(call["args"]),
+                            "id": call["id"],
+                            "index": 0,
+                        }
+                    ],
+                    usage_metadata=message.usage_metadata,
+                )
+            )
+            return
+        words = str(message.content).split(" ")
+        for index, word in enumerate(words):
+            await asyncio.sleep(generation / len(words))
+            last = index == len(words) - 1
+            chunk = AIMessageChunk(
+                content=word if last else f"{word} ",
+                usage_metadata=message.usage_metadata if last else None,
+            )
+            yield ChatGenerationChunk(message=chunk)
+
+
+class FakeSearch:
+    """A search backend returning deterministic results for every query."""
+
+    def __init__(self, settings: FakeSettings) -> None:
+        """Create the backend."""
+        self.settings = settings
+        self.calls = 0
+
+    async def __call__(
+        self, query: str, max_results: int, timeout: Optional[float] = None
+    ) -> list[dict[str, Any]]:
+        """Return `max_results` results for the query after a delay."""
+        self.calls += 1
+        await asyncio.sleep(self.settings.search_latency)
+        slug = hashlib.sha256(query.casefold().encode("utf-8")).hexdigest()[:8]
+        terms = " ".join(content_terms(query)[:6])
+        return [
+            {
+                "link": f"https://example.org/{slug}/{index}",
+                "snippet": f"{terms}. {fake_text(f'{query}{index}', 60)}",
+                "title": f"{terms} {index}",
+            }
+            for index in range(max_results)
+        ]
+
+
+class FakeWikipediaRetriever:
+    """A Wikipedia retriever returning one deterministic page per title."""
+
+    def __init__(self, settings: FakeSettings) -> None:
+        """Create the retriever."""
+        self.settings = settings
+        self.calls = 0
+
+    async def ainvoke(self, title: str, config: Any = None) -> list[Document]:
+        """Return the page for a title after a delay."""
+        self.calls += 1
+        await asyncio.sleep(self.settings.wikipedia_latency)
+        return [
+            Document(
+                page_content=fake_text(title, 150),
+                metadata={
+                    "title": title,
+                    "related_titles": [f"{title} {word}" for word in WORDS[:12]],
+                },
+            )
+        ]
+
+
+class FakeEmbeddings(Embeddings):
+    """Hashed bag-of-words embeddings, so retrieval still favours shared terms."""
+
+    def __init__(self, settings: FakeSettings) -> None:
+        """Create the embeddings."""
+        self.settings = settings
+        self.calls = 0
+
+    def _embed(self, text: str) -> list[float]:
+        vector = [0.0] * self.settings.embedding_size
+        for term in content_terms(text):
+            digest = hashlib.md5(term.encode("utf-8")).digest()
+            vector[int.from_bytes(digest[:4], "little") % len(vector)] += 1.0
+        return vector
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        """Embed documents after a delay."""
+        self.calls += 1
+        time.sleep(self.settings.embedding_latency)
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        """Embed a query."""
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        """Embed documents after a delay, without blocking the event loop."""
+        self.calls += 1
+        await asyncio.sleep(self.settings.embedding_latency)
+        return [self._embed(text) for text in texts]
+
+    async def aembed_query(self, text: str) -> list[float]:
+        """Embed a query without blocking the event loop."""
+        return (await self.aembed_documents([text]))[0]
+
+
+@contextmanager
+def fake_backends(settings: FakeSettings) -> Iterator[dict[str, Any]]:
+    """Replace every network backend of the graph with a fake.
+
+    Yields:
+        The fake search, Wikipedia retriever and embeddings, by name.
+    """
+    search = FakeSearch(settings)
+    retriever = FakeWikipediaRetriever(settings)
+    fake_embeddings = FakeEmbeddings(settings)
+
+    def init_chat_model(
+        model: str, model_provider: str = "", **kwargs: Any
+    ) -> FakeChatModel:
+        return FakeChatModel(
+            model=f"{model_provider}/{model}",
+            max_tokens=kwargs.get("max_tokens"),
+            settings=settings,
+        )
+
+    make_embeddings: Callable[..., Embeddings] = lambda **kwargs: fake_embeddings  # noqa: E731
+    utils.clear_chat_model_cache()
+    with ExitStack() as stack:
+        stack.enter_context(
+            mock.patch.object(utils, "init_chat_model", init_chat_model)
+        )
+        stack.enter_context(mock.patch.object(tools, "_run_search", search))
+        stack.enter_context(
+            mock.patch.object(wikipedia, "get_wikipedia_retriever", lambda: retriever)
+        )
+        stack.enter_context(
+            mock.patch.object(embeddings, "OllamaEmbeddings", make_embeddings)
+        )
+        try:
+            yield {
+                "search": search,
+                "wikipedia": retriever,
+                "embeddings": fake_embeddings,
+            }
+        finally:
+            utils.clear_chat_model_cache()
@@ -0,0 +1,287 @@
+"""Run the research graph end to end against offline fakes and record metrics.
+
+Usage:
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --topic "Roman Empire" --repeat 3 \
+        --set article_assembly=deterministic
+
+Every run gets a fresh cache directory, so runs are cold unless `--warm` is
+given. Node timings are inclusive: a node that runs a subgraph also includes
+the time of the subgraph's nodes, which are reported separately.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import dataclasses
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from typing import Any, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import LLMResult
+
+from benchmarks.fakes import FakeSettings, fake_backends
+
+STANDARD_TOPICS = [
+    "Roman Empire",
+    "Photosynthesis",
+    "History of the printing press",
+    "Quantum computing",
+    "Jazz in New Orleans",
+]
+
+
+@dataclasses.dataclass
+class NodeStats:
+    """Metrics aggregated for one graph node."""
+
+    runs: int = 0
+    seconds: float = 0.0
+    llm_calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+
+class MetricsHandler(BaseCallbackHandler):
+    """Collect per-node wall time, model calls and token usage from callbacks."""
+
+    # Record timings on the event loop instead of a worker thread
+    run_inline = True
+
+    def __init__(self) -> None:
+        """Create an empty collector."""
+        self.nodes: defaultdict[str, NodeStats] = defaultdict(NodeStats)
+        self._started: dict[UUID, tuple[str, float]] = {}
+        self._llm_nodes: dict[UUID, str] = {}
+
+    def on_chain_start(
+        self,
+        serialized: Optional[dict[str, Any]],
+        inputs: Any,
+        *,
+        run_id: UUID,
+        metadata: Optional[dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        """Start timing a run if it is a graph node."""
+        node = (metadata or {}).get("langgraph_node")
+        if node is not None and kwargs.get("name") == node:
+            self._started[run_id] = (node, time.perf_counter())
+
+    def _end_chain(self, run_id: UUID) -> None:
+        started = self._started.pop(run_id, None)
+        if started is not None:
+            node, start = started
+            self.nodes[node].runs += 1
+            self.nodes[node].seconds += time.perf_counter() - start
+
+    def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        """Stop timing a node."""
+        self._end_chain(run_id)
+
+    def on_chain_error(
+        self, error: BaseException, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        """Stop timing a node that failed."""
+        self._end_chain(run_id)
+
+    def on_chat_model_start(
+        self,
+        serialized: dict[str, Any],
+        messages: list[list[BaseMessage]],
+        *,
+        run_id: UUID,
+        metadata: Optional[dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        """Count a model call against the node making it."""
+        node = (metadata or {}).get("langgraph_node", "<none>")
+        self._llm_nodes[run_id] = node
+        self.nodes[node].llm_calls += 1
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        """Add the token usage of a finished model call."""
+        node = self._llm_nodes.pop(run_id, "<none>")
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(
+                    getattr(generation, "message", None), "usage_metadata", None
+                )
+                if usage:
+                    self.nodes[node].prompt_tokens += usage["input_tokens"]
+                    self.nodes[node].completion_tokens += usage["output_tokens"]
+
+
+async def run_topic(
+    topic: str, configurable: dict[str, Any], measure_memory: bool = True
+) -> dict[str, Any]:
+    """Run the full graph for one topic and return its metrics."""
+    # Import here so the graph is built after the fakes are in place
+    from web_research_graph.graph import graph
+
+    handler = MetricsHandler()
+    config: Any = {"configurable": configurable, "callbacks": [handler]}
+    if measure_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = await graph.ainvoke({"input": topic}, config)
+    finally:
+        latency = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if measure_memory else 0
+        if measure_memory:
+            tracemalloc.stop()
+
+    nodes = {name: dataclasses.asdict(stats) for name, stats in handler.nodes.items()}
+    return {
+        "topic": topic,
+        "latency_seconds": round(latency, 4),
+        "peak_memory_mb": round(peak / 2**20, 2) if measure_memory else None,
+        "llm_calls": sum(stats.llm_calls for stats in handler.nodes.values()),
+        "prompt_tokens": sum(s.prompt_tokens for s in handler.nodes.values()),
+        "completion_tokens": sum(s.completion_tokens for s in handler.nodes.values()),
+        "article_chars": len(result.get("article") or ""),
+        "nodes": nodes,
+    }
+
+
+def summarize(runs: list[dict[str, Any]]) -> dict[str, Any]:
+    """Summarize the runs of a benchmark."""
+    summary: dict[str, Any] = {}
+    for key in ("latency_seconds", "llm_calls", "prompt_tokens", "completion_tokens"):
+        values = [run[key] for run in runs]
+        summary[key] = {
+            "mean": round(statistics.mean(values), 4),
+            "median": round(statistics.median(values), 4),
+            "min": min(values),
+            "max": max(values),
+        }
+    return summary
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_benchmark(
+    topics: list[str],
+    settings: FakeSettings,
+    configurable: Optional[dict[str, Any]] = None,
+    repeat: int = 1,
+    warm: bool = False,
+    measure_memory: bool = True,
+) -> dict[str, Any]:
+    """Run every topic `repeat` times against the fakes.
+
+    Args:
+        topics (list[str]): The topics to research.
+        settings (FakeSettings): Latency and size settings for the fakes.
+        configurable (Optional[dict[str, Any]]): Configuration overrides.
+        repeat (int): The number of runs per topic.
+        warm (bool): Share one cache directory between runs.
+        measure_memory (bool): Trace Python allocations to report peak memory.
+    """
+    runs: list[dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as cache_dir, fake_backends(settings) as fakes:
+        for iteration in range(repeat):
+            for index, topic in enumerate(topics):
+                run_dir = cache_dir if warm else f"{cache_dir}/{iteration}-{index}"
+                run_config = {
+                    "cache_path": f"{run_dir}/cache.sqlite",
+                    **(configurable or {}),
+                }
+                run = await run_topic(topic, run_config, measure_memory)
+                runs.append({"iteration": iteration, **run})
+        calls = {name: fake.calls for name, fake in fakes.items()}
+
+    return {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git_commit": _git_commit(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "settings": dataclasses.asdict(settings),
+        "configurable": configurable or {},
+        "warm": warm,
+        "backend_calls": calls,
+        "summary": summarize(runs),
+        "runs": runs,
+    }
+
+
+def _parse_value(value: str) -> Any:
+    try:
+        return json.loads(value)
+    except json.JSONDecodeError:
+        return value
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--topic", action="append", help="Topic to run (repeatable)")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--warm", action="store_true", help="Share caches between runs")
+    parser.add_argument(
+        "--no-memory", action="store_true", help="Skip peak memory tracing"
+    )
+    parser.add_argument(
+        "--set",
+        action="append",
+        default=[],
+        metavar="KEY=VALUE",
+        help="Override a Configuration field (repeatable)",
+    )
+    for settings_field in dataclasses.fields(FakeSettings):
+        parser.add_argument(
+            f"--{settings_field.name.replace('_', '-')}",
+            type=type(settings_field.default),
+            default=settings_field.default,
+        )
+    args = parser.parse_args(argv)
+
+    settings = FakeSettings(
+        **{f.name: getattr(args, f.name) for f in dataclasses.fields(FakeSettings)}
+    )
+    configurable = {
+        key: _parse_value(value)
+        for key, value in (item.split("=", 1) for item in args.set)
+    }
+    results = asyncio.run(
+        run_benchmark(
+            args.topic or STANDARD_TOPICS,
+            settings,
+            configurable,
+            repeat=args.repeat,
+            warm=args.warm,
+            measure_memory=not args.no_memory,
+        )
+    )
+    with open(args.output, "w") as file:
+        json.dump(results, file, indent=2)
+
+    latency = results["summary"]["latency_seconds"]
+    sys.stdout.write(
+        f"{len(results['runs'])} runs, median latency {latency['median']:.2f}s, "
+        f"results written to {args.output}\n"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Deterministic assembly of generated sections into a full article."""
+
+import re
+from collections.abc import Mapping, Sequence
+
+from web_research_graph.state import Section
+
+_CITATION_RE = re.compile(r"\[(\d+)\]")
+
+
+def _renumber(text: str, numbers: Mapping[int, int]) -> str:
+    """Rewrite the citation markers in a text, leaving unknown ones untouched."""
+    return _CITATION_RE.sub(
+        lambda match: f"[{numbers.get(int(match.group(1)), match.group(1))}]", text
+    )
+
+
+def renumber_citations(
+    sections: Sequence[Section],
+) -> tuple[list[Section], list[str]]:
+    """Renumber citations across the whole article instead of per section.
+
+    Every section numbers its citations from 1. Identical citations are merged
+    and the markers in the section text are rewritten to the article-wide
+    numbers.
+
+    Returns:
+        The sections without their citation lists, and the article citations.
+    """
+    citations: list[str] = []
+    article_numbers: dict[str, int] = {}
+    renumbered: list[Section] = []
+    for section in sections:
+        numbers: dict[int, int] = {}
+        for local_number, citation in enumerate(section.citations, start=1):
+            citation = citation.strip()
+            if citation not in article_numbers:
+                citations.append(citation)
+                article_numbers[citation] = len(citations)
+            numbers[local_number] = article_numbers[citation]
+        renumbered.append(
+            section.model_copy(
+                update={
+                    "description": _renumber(section.description, numbers),
+                    "subsections": [
+                        subsection.model_copy(
+                            update={
+                                "description": _renumber(
+                                    subsection.description, numbers
+                                )
+                            }
+                        )
+                        for subsection in section.subsections or []
+                    ],
+                    "citations": [],
+                }
+            )
+        )
+    return renumbered, citations
+
+
+def split_opening(text: str) -> tuple[str, str]:
+    """Split a text into its first paragraph and the rest."""
+    opening, _, rest = text.strip().partition("\n\n")
+    return opening, rest
+
+
+def closing_paragraph(section: Section) -> str:
+    """Return the last paragraph of a rendered section."""
+    return section.as_str.rsplit("\n\n", 1)[-1]
+
+
+def replace_opening(section: Section, opening: str) -> Section:
+    """Return a copy of the section with the first paragraph replaced."""
+    _, rest = split_opening(section.description)
+    description = f"{opening.strip()}\n\n{rest}" if rest else opening.strip()
+    return section.model_copy(update={"description": description})
+
+
+def assemble_article(
+    title: str, lead: str, sections: Sequence[Section], citations: Sequence[str]
+) -> str:
+    """Join the title, lead, sections and references into a markdown article."""
+    parts = [f"# {title}", lead.strip(), *(section.as_str for section in sections)]
+    if citations:
+        references = "\n".join(
+            f"[{number}] {citation}"
+            for number, citation in enumerate(citations, start=1)
+        )
+        parts.append(f"## References\n\n{references}")
+    return "\n\n".join(part for part in parts if part)
@@ -0,0 +1,356 @@
+"""Research many topics concurrently and write their articles to a directory.
+
+Usage:
+    python -m web_research_graph.batch topics.txt --output-dir articles
+    python -m web_research_graph.batch topics.txt --concurrency 8 \
+        --rpm groq=30 --tpm groq=6000 --set article_assembly=deterministic
+    python -m web_research_graph.batch topics.txt --checkpoints
+
+The topics file holds one topic per line; blank lines and lines starting with
+`#` are ignored. Runs share one process, so chat model clients, caches and
+rate limits are shared between them, and at most `max_concurrent_runs` graphs
+run at once. Every article is written as soon as it is finished and recorded in
+`manifest.jsonl`; running the same batch again skips the topics already done,
+so an interrupted batch resumes where it stopped. With `--checkpoints`, every
+step is also saved to a SQLite database in the output directory, so a topic
+interrupted halfway resumes from its last step instead of starting over; this
+needs the `batch` extra (`langgraph-checkpoint-sqlite`).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from collections.abc import AsyncIterator, Iterable
+from contextlib import AsyncExitStack, asynccontextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Literal, Optional
+
+from langgraph.checkpoint.base import BaseCheckpointSaver
+
+from web_research_graph.blobs import BlobSerializer, SQLiteBlobStore
+from web_research_graph.graph import create_graph
+from web_research_graph.rate_limits import set_provider_limits
+from web_research_graph.references import set_reference_chunk_store
+
+MANIFEST = "manifest.jsonl"
+CHECKPOINTS = "checkpoints.sqlite"
+BLOBS = "blobs.sqlite"
+
+BatchStatus = Literal["done", "rejected", "failed"]
+
+
+@dataclass
+class BatchResult:
+    """The outcome of researching one topic of a batch."""
+
+    topic: str
+    status: BatchStatus
+    path: Optional[str] = None
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+
+def read_topics(path: str) -> list[str]:
+    """Read the distinct topics of a topics file, in order."""
+    with open(path, encoding="utf-8") as file:
+        lines = (line.strip() for line in file)
+        return list(dict.fromkeys(line for line in lines if line and line[0] != "#"))
+
+
+def topic_slug(topic: str) -> str:
+    """Return a file name stem that is unique to the topic."""
+    words = re.sub(r"[^a-z0-9]+", "-", topic.casefold()).strip("-")[:60] or "topic"
+    return f"{words}-{hashlib.sha256(topic.encode('utf-8')).hexdigest()[:8]}"
+
+
+def load_manifest(output_dir: str) -> dict[str, BatchResult]:
+    """Return the latest recorded result of every topic in an output directory."""
+    results: dict[str, BatchResult] = {}
+    path = os.path.join(output_dir, MANIFEST)
+    if not os.path.exists(path):
+        return results
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            try:
+                result = BatchResult(**json.loads(line))
+            except (json.JSONDecodeError, TypeError):
+                # A line cut short by an interrupted write
+                continue
+            results[result.topic] = result
+    return results
+
+
+def _is_finished(result: Optional[BatchResult], output_dir: str) -> bool:
+    if result is None or result.status == "failed":
+        return False
+    return result.path is None or os.path.exists(os.path.join(output_dir, result.path))
+
+
+def _write_article(output_dir: str, name: str, article: str) -> None:
+    path = os.path.join(output_dir, name)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as file:
+        file.write(article)
+    os.replace(f"{path}.tmp", path)
+
+
+def _thread_config(
+    topic: str, attempt: int, configurable: dict[str, Any]
+) -> dict[str, Any]:
+    slug = topic_slug(topic)
+    thread_id = slug if attempt == 1 else f"{slug}-{attempt}"
+    return {
+        "configurable": {**configurable, "thread_id": thread_id},
+        "metadata": {"batch_topic": topic},
+    }
+
+
+async def _research(
+    graph: Any,
+    topic: str,
+    configurable: dict[str, Any],
+    checkpointed: bool,
+    resume: bool,
+) -> Optional[str]:
+    """Run the graph for one topic and return its article, if any.
+
+    With a checkpointer, every attempt at a topic gets its own thread, so a
+    fresh attempt never inherits the messages and references of an earlier
+    one. When resuming, the latest attempt continues if it stopped halfway.
+    """
+    attempt = 1
+    graph_input: Optional[dict[str, Any]] = {"input": topic}
+    if checkpointed:
+        latest = None
+        while (
+            state := await graph.aget_state(_thread_config(topic, attempt, {}))
+        ).values:
+            latest = state
+            attempt += 1
+        if resume and latest is not None and latest.next:
+            # Continue the latest attempt from its last checkpoint
+            attempt -= 1
+            graph_input = None
+    config = _thread_config(topic, attempt, configurable)
+    result = await graph.ainvoke(graph_input, config)
+    article = result.get("article")
+    return article if isinstance(article, str) else None
+
+
+@asynccontextmanager
+async def open_checkpointer(output_dir: str) -> AsyncIterator[BaseCheckpointSaver[Any]]:
+    """Open the SQLite checkpointer of a batch in its output directory.
+
+    Long values and reference chunks go to a blob database next to it, so the
+    checkpoints stay small and can be resumed by a later process.
+
+    Raises:
+        ImportError: If `langgraph-checkpoint-sqlite` is not installed.
+    """
+    try:
+        import aiosqlite
+        from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+    except ImportError as error:
+        raise ImportError(
+            "Checkpoints need langgraph-checkpoint-sqlite: "
+            "pip install 'web-research-graph[batch]'"
+        ) from error
+
+    os.makedirs(output_dir, exist_ok=True)
+    store = SQLiteBlobStore(os.path.join(output_dir, BLOBS))
+    previous = set_reference_chunk_store(store)
+    try:
+        async with aiosqlite.connect(os.path.join(output_dir, CHECKPOINTS)) as conn:
+            yield AsyncSqliteSaver(conn, serde=BlobSerializer(store))
+    finally:
+        set_reference_chunk_store(previous)
+        store.close()
+
+
+async def run_batch(
+    topics: Iterable[str],
+    output_dir: str,
+    configurable: Optional[dict[str, Any]] = None,
+    max_concurrent_runs: int = 4,
+    resume: bool = True,
+    checkpointer: Optional[BaseCheckpointSaver[Any]] = None,
+    on_result: Optional[Callable[[BatchResult], None]] = None,
+) -> list[BatchResult]:
+    """Research every topic and write the articles to `output_dir`.
+
+    Args:
+        topics (Iterable[str]): The topics to research.
+        output_dir (str): Where the articles and the manifest are written.
+        configurable (Optional[dict[str, Any]]): Configuration shared by every run.
+        max_concurrent_runs (int): The maximum number of topics researched at once.
+        resume (bool): Skip the topics the manifest records as done or
+            rejected, and continue the checkpointed topics that stopped
+            halfway. Without it, every topic starts over on a new thread.
+        checkpointer (Optional[BaseCheckpointSaver[Any]]): Saves every step of
+            every run, so a run interrupted halfway continues from its last
+            step, see `open_checkpointer`. Without one, interrupted topics
+            start over.
+        on_result (Optional[Callable[[BatchResult], None]]): Called as soon as
+            a topic is finished.
+
+    Returns:
+        The results of the topics researched by this call, in completion order.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    recorded = load_manifest(output_dir) if resume else {}
+    pending = [
+        topic
+        for topic in dict.fromkeys(topics)
+        if not _is_finished(recorded.get(topic), output_dir)
+    ]
+    graph = create_graph(interactive=False, checkpointer=checkpointer)
+    queue: asyncio.Queue[str] = asyncio.Queue()
+    for topic in pending:
+        queue.put_nowait(topic)
+    results: list[BatchResult] = []
+    manifest = open(os.path.join(output_dir, MANIFEST), "a", encoding="utf-8")
+
+    def record(result: BatchResult) -> None:
+        manifest.write(json.dumps(asdict(result)) + "\n")
+        manifest.flush()
+        results.append(result)
+        if on_result is not None:
+            on_result(result)
+
+    async def worker() -> None:
+        while not queue.empty():
+            topic = queue.get_nowait()
+            start = time.perf_counter()
+            try:
+                article = await _research(
+                    graph, topic, configurable or {}, checkpointer is not None, resume
+                )
+            except Exception as error:
+                result = BatchResult(topic, "failed", error=repr(error))
+            else:
+                if article:
+                    name = f"{topic_slug(topic)}.md"
+                    await asyncio.to_thread(_write_article, output_dir, name, article)
+                    result = BatchResult(topic, "done", path=name)
+                else:
+                    result = BatchResult(topic, "rejected")
+            result.seconds = round(time.perf_counter() - start, 3)
+            record(result)
+
+    try:
+        await asyncio.gather(
+            *(worker() for _ in range(min(max_concurrent_runs, len(pending))))
+        )
+    finally:
+        manifest.close()
+    return results
+
+
+def _parse_value(value: str) -> Any:
+    try:
+        return json.loads(value)
+    except json.JSONDecodeError:
+        return value
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """Run a batch from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("topics_file", help="File with one topic per line")
+    parser.add_argument("--output-dir", default="articles")
+    parser.add_argument(
+        "--concurrency", type=int, default=4, help="Topics researched at once"
+    )
+    parser.add_argument(
+        "--no-resume", action="store_true", help="Redo topics already done"
+    )
+    parser.add_argument(
+        "--set",
+        action="append",
+        default=[],
+        metavar="KEY=VALUE",
+        help="Override a Configuration field (repeatable)",
+    )
+    parser.add_argument(
+        "--checkpoints",
+        action="store_true",
+        help="Save every step so interrupted topics resume from their last step",
+    )
+    parser.add_argument(
+        "--rpm",
+        action="append",
+        default=[],
+        metavar="PROVIDER=N",
+        help="Requests per minute allowed by a provider (repeatable)",
+    )
+    parser.add_argument(
+        "--tpm",
+        action="append",
+        default=[],
+        metavar="PROVIDER=N",
+        help="Tokens per minute allowed by a provider (repeatable)",
+    )
+    args = parser.parse_args(argv)
+
+    quotas: dict[str, dict[str, float]] = {}
+    for option, values in (
+        ("requests_per_minute", args.rpm),
+        ("tokens_per_minute", args.tpm),
+    ):
+        for item in values:
+            provider, value = item.split("=", 1)
+            quotas.setdefault(provider, {})[option] = float(value)
+    for provider, limits in quotas.items():
+        set_provider_limits(
+            provider,
+            requests_per_minute=limits.get("requests_per_minute"),
+            tokens_per_minute=limits.get("tokens_per_minute"),
+        )
+
+    configurable = {
+        key: _parse_value(value)
+        for key, value in (item.split("=", 1) for item in args.set)
+    }
+
+    def report(result: BatchResult) -> None:
+        detail = result.path or result.error or ""
+        sys.stdout.write(
+            f"{result.status:>8} {result.seconds:8.1f}s  {result.topic}  {detail}\n"
+        )
+        sys.stdout.flush()
+
+    async def run() -> list[BatchResult]:
+        async with AsyncExitStack() as stack:
+            checkpointer = (
+                await stack.enter_async_context(open_checkpointer(args.output_dir))
+                if args.checkpoints
+                else None
+            )
+            return await run_batch(
+                read_topics(args.topics_file),
+                args.output_dir,
+                configurable,
+                max_concurrent_runs=args.concurrency,
+                resume=not args.no_resume,
+                checkpointer=checkpointer,
+                on_result=report,
+            )
+
+    results = asyncio.run(run())
+    failed = sum(result.status == "failed" for result in results)
+    sys.stdout.write(
+        f"{len(results)} topics researched, {failed} failed, "
+        f"manifest in {os.path.join(args.output_dir, MANIFEST)}\n"
+    )
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
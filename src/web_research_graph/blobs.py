@@ -0,0 +1,278 @@
+"""Out-of-line storage for the large values in checkpoints.
+
+Reference bodies, interview answers, section text and the article are written
+once and then carried unchanged through every later checkpoint. `BlobSerializer`
+wraps the checkpoint serializer and moves every long string into a
+content-addressed `BlobStore`, leaving a short reference in its place. Each
+value is stored once however many checkpoints contain it, so checkpoint size
+and write time stay proportional to what changed in a step.
+
+Use it when creating the checkpointer:
+
+    store = SQLiteBlobStore(".cache/blobs.sqlite")
+    checkpointer = MemorySaver(serde=BlobSerializer(store))
+
+Any checkpointer accepting a `serde` works, for example the Postgres one. The
+blob store must be reachable by every worker reading those checkpoints.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Iterable, Mapping
+from typing import Any, Optional
+
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from pydantic import BaseModel
+
+BLOB_REF_PREFIX = "\x00blob:"
+
+
+def blob_key(data: bytes) -> str:
+    """Return the content address of a blob."""
+    return hashlib.sha256(data).hexdigest()
+
+
+class BlobStore(ABC):
+    """Interface implemented by every blob store.
+
+    Blobs are immutable and keyed by the hash of their content, so writing a
+    blob that already exists is a no-op.
+    """
+
+    @abstractmethod
+    def put_many(self, blobs: Mapping[str, bytes]) -> None:
+        """Store blobs keyed by their content address."""
+
+    @abstractmethod
+    def get_many(self, keys: Iterable[str]) -> dict[str, bytes]:
+        """Return the stored blobs among `keys`."""
+
+    def put(self, data: bytes) -> str:
+        """Store a blob and return its content address."""
+        key = blob_key(data)
+        self.put_many({key: data})
+        return key
+
+    def get(self, key: str) -> bytes:
+        """Return the blob stored under `key`."""
+        blob = self.get_many([key]).get(key)
+        if blob is None:
+            raise KeyError(key)
+        return blob
+
+
+class InMemoryBlobStore(BlobStore):
+    """A thread-safe blob store held in process memory."""
+
+    def __init__(self) -> None:
+        """Create an empty store."""
+        self._blobs: dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def put_many(self, blobs: Mapping[str, bytes]) -> None:
+        """Store blobs keyed by their content address."""
+        with self._lock:
+            for key, data in blobs.items():
+                self._blobs.setdefault(key, data)
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, bytes]:
+        """Return the stored blobs among `keys`."""
+        with self._lock:
+            return {key: self._blobs[key] for key in keys if key in self._blobs}
+
+    def __len__(self) -> int:
+        """Return the number of stored blobs."""
+        return len(self._blobs)
+
+
+class SQLiteBlobStore(BlobStore):
+    """A thread-safe blob store persisted to a SQLite database."""
+
+    def __init__(self, path: str) -> None:
+        """Open (or create) the blob database at `path`."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS blobs "
+                "(key TEXT PRIMARY KEY, data BLOB NOT NULL) WITHOUT ROWID"
+            )
+
+    def put_many(self, blobs: Mapping[str, bytes]) -> None:
+        """Store blobs keyed by their content address."""
+        if not blobs:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO blobs (key, data) VALUES (?, ?)",
+                blobs.items(),
+            )
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, bytes]:
+        """Return the stored blobs among `keys`."""
+        keys = list(keys)
+        found: dict[str, bytes] = {}
+        # Stay well below SQLite's limit on query parameters
+        for start in range(0, len(keys), 500):
+            batch = keys[start : start + 500]
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT key, data FROM blobs WHERE key IN "
+                    f"({', '.join('?' * len(batch))})",
+                    batch,
+                ).fetchall()
+            found.update((key, bytes(data)) for key, data in rows)
+        return found
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class BlobSerializer(SerializerProtocol):
+    """A checkpoint serializer that stores long strings in a blob store.
+
+    Strings of at least `min_size` characters found in lists, tuples, dicts
+    and pydantic models (messages included) are replaced by a reference to
+    their blob; everything else is serialized by `serde`, msgpack by default.
+    """
+
+    def __init__(
+        self,
+        store: BlobStore,
+        min_size: int = 512,
+        serde: Optional[SerializerProtocol] = None,
+        known_keys: int = 100_000,
+    ) -> None:
+        """Create a serializer writing blobs to `store`.
+
+        Args:
+            store (BlobStore): Where the long strings are stored.
+            min_size (int): The length from which a string is stored out of line.
+            serde (Optional[SerializerProtocol]): The serializer for the rest.
+            known_keys (int): How many recently written blob keys to remember,
+                so unchanged values are not written again at every step.
+        """
+        self.store = store
+        self.min_size = min_size
+        self.serde = serde or JsonPlusSerializer()
+        self.known_keys = known_keys
+        self._known: OrderedDict[str, None] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _externalize(self, obj: Any, blobs: dict[str, bytes]) -> Any:
+        """Return `obj` with its long strings replaced, collecting their blobs."""
+        if isinstance(obj, str):
+            if len(obj) < self.min_size or obj.startswith(BLOB_REF_PREFIX):
+                return obj
+            data = obj.encode("utf-8", "surrogatepass")
+            key = blob_key(data)
+            blobs[key] = data
+            return BLOB_REF_PREFIX + key
+        return _transform(obj, lambda value: self._externalize(value, blobs))
+
+    def _write(self, blobs: dict[str, bytes]) -> None:
+        with self._lock:
+            new = {key: data for key, data in blobs.items() if key not in self._known}
+        if not new:
+            return
+        self.store.put_many(new)
+        with self._lock:
+            for key in new:
+                self._known[key] = None
+                self._known.move_to_end(key)
+            while len(self._known) > self.known_keys:
+                self._known.popitem(last=False)
+
+    def dumps(self, obj: Any) -> bytes:
+        """Serialize an object without storing blobs."""
+        return self.serde.dumps(obj)
+
+    def loads(self, data: bytes) -> Any:
+        """Deserialize an object serialized by `dumps`."""
+        return self.serde.loads(data)
+
+    def dumps_typed(self, obj: Any) -> tuple[str, bytes]:
+        """Serialize an object, writing its long strings to the blob store."""
+        blobs: dict[str, bytes] = {}
+        obj = self._externalize(obj, blobs)
+        self._write(blobs)
+        return self.serde.dumps_typed(obj)
+
+    def loads_typed(self, data: tuple[str, bytes]) -> Any:
+        """Deserialize an object, reading its long strings from the blob store."""
+        obj = self.serde.loads_typed(data)
+        keys: set[str] = set()
+        _collect_refs(obj, keys)
+        if not keys:
+            return obj
+        blobs = self.store.get_many(keys)
+        missing = keys - blobs.keys()
+        if missing:
+            raise KeyError(f"Blobs missing from the store: {sorted(missing)}")
+        texts = {
+            key: data.decode("utf-8", "surrogatepass") for key, data in blobs.items()
+        }
+        return _resolve(obj, texts)
+
+
+def _transform(obj: Any, fn: Any) -> Any:
+    """Apply `fn` to the children of a container, copying it only if one changed."""
+    if isinstance(obj, (list, tuple)):
+        items = [fn(item) for item in obj]
+        if all(new is old for new, old in zip(items, obj)):
+            return obj
+        if isinstance(obj, list):
+            return items
+        # Named tuples take their fields as separate arguments
+        return type(obj)(*items) if hasattr(obj, "_fields") else type(obj)(items)
+    if isinstance(obj, dict):
+        values = {key: fn(value) for key, value in obj.items()}
+        if all(values[key] is value for key, value in obj.items()):
+            return obj
+        return values
+    if isinstance(obj, BaseModel):
+        update = {}
+        for name in type(obj).model_fields:
+            value = getattr(obj, name, None)
+            new = fn(value)
+            if new is not value:
+                update[name] = new
+        return obj.model_copy(update=update) if update else obj
+    return obj
+
+
+def _collect_refs(obj: Any, keys: set[str]) -> None:
+    if isinstance(obj, str):
+        if obj.startswith(BLOB_REF_PREFIX):
+            keys.add(obj[len(BLOB_REF_PREFIX) :])
+    elif isinstance(obj, (list, tuple)):
+        for item in obj:
+            _collect_refs(item, keys)
+    elif isinstance(obj, dict):
+        for value in obj.values():
+            _collect_refs(value, keys)
+    elif isinstance(obj, BaseModel):
+        for name in type(obj).model_fields:
+            _collect_refs(getattr(obj, name, None), keys)
+
+
+def _resolve(obj: Any, texts: dict[str, str]) -> Any:
+    if isinstance(obj, str):
+        if obj.startswith(BLOB_REF_PREFIX):
+            return texts[obj[len(BLOB_REF_PREFIX) :]]
+        return obj
+    return _transform(obj, lambda value: _resolve(value, texts))
@@ -0,0 +1,207 @@
+"""Pluggable key-value caches shared by the tools and nodes.
+
+Two backends are provided: an in-memory LRU for a single process and an
+on-disk SQLite store that survives restarts and can be shared by workers on
+the same machine. Values must be JSON-serializable. Both backends only record
+when an entry was stored; deciding whether an entry is still fresh is left to
+the caller, which allows stale-while-revalidate policies.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    """A cached value along with the time it was stored."""
+
+    value: Any
+    stored_at: float
+
+    @property
+    def age(self) -> float:
+        """Return the number of seconds since the entry was stored."""
+        return time.time() - self.stored_at
+
+
+class BaseCache(ABC):
+    """Interface implemented by every cache backend."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Return the entry stored under `key`, if any."""
+
+    @abstractmethod
+    def set(self, key: str, value: Any) -> None:
+        """Store `value` under `key`, replacing any previous entry."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove the entry stored under `key`, if any."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove every entry."""
+
+
+class InMemoryCache(BaseCache):
+    """A thread-safe least-recently-used cache held in process memory."""
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        """Create a cache holding at most `maxsize` entries."""
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Return the entry stored under `key`, if any."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, value: Any) -> None:
+        """Store `value` under `key`, evicting the least recently used entry."""
+        with self._lock:
+            self._entries[key] = CacheEntry(value=value, stored_at=time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        """Remove the entry stored under `key`, if any."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        """Return the number of cached entries."""
+        return len(self._entries)
+
+
+class SQLiteCache(BaseCache):
+    """A thread-safe cache persisted to a SQLite database.
+
+    Several caches can share one database file by using different namespaces.
+    When `maxsize` is set, the oldest entries of the namespace are evicted once
+    it holds more than `maxsize` entries.
+    """
+
+    def __init__(
+        self, path: str, namespace: str = "default", maxsize: Optional[int] = None
+    ) -> None:
+        """Open (or create) the cache database at `path`."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.namespace = namespace
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+                "stored_at REAL NOT NULL, PRIMARY KEY (namespace, key))"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS cache_age ON cache (namespace, stored_at)"
+            )
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Return the entry stored under `key`, if any."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, stored_at FROM cache WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            ).fetchone()
+        if row is None:
+            return None
+        return CacheEntry(value=json.loads(row[0]), stored_at=row[1])
+
+    def set(self, key: str, value: Any) -> None:
+        """Store `value` under `key`, evicting the oldest entries if full."""
+        payload = json.dumps(value)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, value, stored_at) "
+                "VALUES (?, ?, ?, ?)",
+                (self.namespace, key, payload, time.time()),
+            )
+            if self.maxsize is not None:
+                self._conn.execute(
+                    "DELETE FROM cache WHERE namespace = ? AND key IN ("
+                    "SELECT key FROM cache WHERE namespace = ? "
+                    "ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                    (self.namespace, self.namespace, self.maxsize),
+                )
+
+    def delete(self, key: str) -> None:
+        """Remove the entry stored under `key`, if any."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM cache WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            )
+
+    def clear(self) -> None:
+        """Remove every entry in this namespace."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM cache WHERE namespace = ?", (self.namespace,)
+            )
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+_CACHES: dict[tuple[str, str, str], BaseCache] = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def get_cache(
+    backend: str, namespace: str, path: str = "", maxsize: Optional[int] = None
+) -> Optional[BaseCache]:
+    """Return the process-wide cache for a backend and namespace.
+
+    Args:
+        backend (str): One of "none", "memory" or "sqlite".
+        namespace (str): Name separating this cache from the others.
+        path (str): The database file, used by the "sqlite" backend.
+        maxsize (Optional[int]): The maximum number of entries to keep. Applies
+            to a cache that already exists too.
+    """
+    if backend == "none":
+        return None
+    if backend not in ("memory", "sqlite"):
+        raise ValueError(f"Unknown cache backend: {backend}")
+    key = (backend, namespace, path)
+    with _CACHES_LOCK:
+        cache = _CACHES.get(key)
+        if cache is None:
+            if backend == "sqlite":
+                cache = SQLiteCache(path, namespace=namespace, maxsize=maxsize)
+            else:
+                cache = InMemoryCache(maxsize) if maxsize else InMemoryCache()
+            _CACHES[key] = cache
+        elif maxsize is not None and isinstance(cache, (InMemoryCache, SQLiteCache)):
+            cache.maxsize = maxsize
+    return cache
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field, fields
-from typing import Annotated, Optional
+from typing import Annotated, Literal, Optional
 
 from langchain_core.runnables import RunnableConfig, ensure_config
 
@@ -48,6 +48,124 @@ class Configuration:
         )
     )
 
+    backup_llm_model: Annotated[str, {"__template_metadata__": {"kind": "llm"}}] = (
+        field(
+            default="",
+            metadata={
+                "description": "A model from another provider that interview questions and answers "
+                "fall back to when the fast model is slow or failing. Leave empty to disable hedging. "
+                "Should be in the form: provider/model-name."
+            },
+        )
+    )
+
+    hedge_percentile: float = field(
+        default=0.95,
+        metadata={
+            "description": "The percentile of the fast model's recent latency after which the "
+            "same call is also sent to `backup_llm_model`; the first to answer is used."
+        },
+    )
+
+    hedge_initial_delay: float = field(
+        default=2.0,
+        metadata={
+            "description": "The number of seconds after which a call is hedged until enough "
+            "latencies of the fast model have been observed."
+        },
+    )
+
+    question_transcript_max_tokens: int = field(
+        default=3000,
+        metadata={
+            "description": "The token budget for the interview transcript given to an editor asking a question. "
+            "The newest turns are kept and older ones are compacted."
+        },
+    )
+
+    answer_transcript_max_tokens: int = field(
+        default=3000,
+        metadata={
+            "description": "The token budget for the interview transcript given to the expert answering a question. "
+            "The newest turns are kept and older ones are compacted."
+        },
+    )
+
+    refine_conversations_max_tokens: int = field(
+        default=16000,
+        metadata={
+            "description": "The token budget for the interview conversations used to refine the outline. "
+            "The newest turns are kept and older ones are compacted."
+        },
+    )
+
+    expert_references_k: int = field(
+        default=6,
+        metadata={
+            "description": "The maximum number of references given to the expert for each answer."
+        },
+    )
+
+    expert_references_max_tokens: int = field(
+        default=1500,
+        metadata={
+            "description": "The token budget for the references given to the expert for each answer."
+        },
+    )
+
+    embedding_model: str = field(
+        default="mxbai-embed-large",
+        metadata={
+            "description": "The name of the Ollama embedding model used to retrieve references."
+        },
+    )
+
+    retrieval_backend: Literal["vector", "bm25", "hybrid"] = field(
+        default="vector",
+        metadata={
+            "description": "How references are retrieved for each article section: 'vector' ranks "
+            "them by embedding similarity, 'bm25' by SQLite full-text search without any embedding "
+            "model and 'hybrid' fuses both rankings, falling back to BM25 when embeddings are unavailable."
+        },
+    )
+
+    retrieval_rrf_k: int = field(
+        default=60,
+        metadata={
+            "description": "The reciprocal-rank fusion constant of the 'hybrid' backend; "
+            "larger values give lower-ranked references more weight."
+        },
+    )
+
+    retrieval_k: int = field(
+        default=3,
+        metadata={
+            "description": "The number of references retrieved for each article section."
+        },
+    )
+
+    retrieval_mmr: bool = field(
+        default=False,
+        metadata={
+            "description": "Whether to diversify retrieved references with maximal marginal relevance. "
+            "Ignored by the 'bm25' backend."
+        },
+    )
+
+    retrieval_fetch_k: int = field(
+        default=20,
+        metadata={
+            "description": "The number of candidate references considered by maximal marginal relevance."
+        },
+    )
+
+    retrieval_mmr_lambda: float = field(
+        default=0.5,
+        metadata={
+            "description": "Maximal marginal relevance trade-off between relevance (1) and diversity (0)."
+        },
+    )
+
     max_search_results: int = field(
         default=4,
         metadata={
@@ -55,6 +173,268 @@ class Configuration:
         },
     )
 
+    max_interview_turns: int = field(
+        default=3,
+        metadata={
+            "description": "The maximum number of questions each editor asks the expert."
+        },
+    )
+
+    interview_min_information_gain: int = field(
+        default=0,
+        metadata={
+            "description": "An interview ends early once an answer brings fewer than this many "
+            "new references plus new outline terms. 0, the default, always asks "
+            "`max_interview_turns` questions; 3 trims interviews that repeat themselves."
+        },
+    )
+
+    dedup_questions: bool = field(
+        default=True,
+        metadata={
+            "description": "Whether a question nearly identical to one already searched in the "
+            "same run reuses its search results instead of searching again."
+        },
+    )
+
+    question_similarity_threshold: float = field(
+        default=0.7,
+        metadata={
+            "description": "The estimated Jaccard similarity of their terms from which two "
+            "questions are considered near-duplicates."
+        },
+    )
+
+    fetch_pages: bool = field(
+        default=False,
+        metadata={
+            "description": "Whether to fetch the full page behind every search result and store "
+            "its most relevant passages alongside the result's snippet."
+        },
+    )
+
+    fetch_timeout: float = field(
+        default=10.0,
+        metadata={
+            "description": "The maximum number of seconds spent fetching a single page."
+        },
+    )
+
+    fetch_max_bytes: int = field(
+        default=2_000_000,
+        metadata={"description": "Fetched pages are cut off after this many bytes."},
+    )
+
+    fetch_max_connections: int = field(
+        default=16,
+        metadata={
+            "description": "The maximum number of open connections used to fetch pages in a run."
+        },
+    )
+
+    fetch_max_per_host: int = field(
+        default=2,
+        metadata={
+            "description": "The maximum number of pages fetched concurrently from a single host."
+        },
+    )
+
+    fetch_private_hosts: bool = field(
+        default=False,
+        metadata={
+            "description": "Whether pages on private, loopback and link-local addresses, such "
+            "as an intranet, may be fetched. Off by default, so a search result cannot "
+            "reach internal services."
+        },
+    )
+
+    passages_per_page: int = field(
+        default=6,
+        metadata={
+            "description": "The maximum number of passages kept from a fetched page, "
+            "chosen by relevance to the question that found it."
+        },
+    )
+
+    passage_max_tokens: int = field(
+        default=200,
+        metadata={
+            "description": "The token budget of a single passage of a fetched page."
+        },
+    )
+
+    max_concurrent_interviews: int = field(
+        default=3,
+        metadata={
+            "description": "The maximum number of editor interviews to conduct concurrently. "
+            "Set to 1 to interview one editor at a time."
+        },
+    )
+
+    max_concurrent_sections: int = field(
+        default=4,
+        metadata={
+            "description": "The maximum number of article sections to generate concurrently."
+        },
+    )
+
+    section_max_attempts: int = field(
+        default=3,
+        metadata={
+            "description": "The number of attempts made to generate a single section before giving up. "
+            "A failed section is retried on its own without discarding the others."
+        },
+    )
+
+    article_assembly: Literal["rewrite", "deterministic", "boundaries"] = field(
+        default="rewrite",
+        metadata={
+            "description": "How sections are assembled into the article: 'rewrite' sends the "
+            "whole draft through the long context model, 'deterministic' joins the sections "
+            "under a generated lead and 'boundaries' also rewrites the opening of each section "
+            "so it follows on from the previous one."
+        },
+    )
+
+    query_compression: Literal["keywords", "llm", "none"] = field(
+        default="keywords",
+        metadata={
+            "description": "How to shorten long search queries: 'keywords' extracts keywords locally, "
+            "'llm' summarizes them with the long context model and 'none' searches as is."
+        },
+    )
+
+    query_compression_threshold: int = field(
+        default=40,
+        metadata={
+            "description": "Search queries longer than this number of characters are compressed."
+        },
+    )
+
+    query_max_keywords: int = field(
+        default=8,
+        metadata={
+            "description": "The maximum number of keywords kept when compressing a search query."
+        },
+    )
+
+    search_timeout: float = field(
+        default=20.0,
+        metadata={
+            "description": "The maximum number of seconds to wait for a single search request."
+        },
+    )
+
+    cache_path: str = field(
+        default=".cache/web_research.sqlite",
+        metadata={
+            "description": "The SQLite database file used by caches with the 'sqlite' backend."
+        },
+    )
+
+    search_cache: Literal["none", "memory", "sqlite"] = field(
+        default="memory",
+        metadata={
+            "description": "Where to cache search results: 'none' disables the cache, "
+            "'memory' keeps an in-process LRU and 'sqlite' persists them to `cache_path`."
+        },
+    )
+
+    search_cache_ttl: float = field(
+        default=24 * 60 * 60,
+        metadata={
+            "description": "The number of seconds a cached search result is considered fresh."
+        },
+    )
+
+    search_cache_stale_ttl: float = field(
+        default=60 * 60,
+        metadata={
+            "description": "The number of seconds past `search_cache_ttl` during which a stale "
+            "search result is still served while it is refreshed in the background."
+        },
+    )
+
+    embedding_cache: Literal["none", "memory", "sqlite"] = field(
+        default="sqlite",
+        metadata={
+            "description": "Where to cache reference embeddings: 'none' disables the cache, "
+            "'memory' keeps them in process and 'sqlite' persists them to `cache_path`."
+        },
+    )
+
+    wikipedia_cache: Literal["none", "memory", "sqlite"] = field(
+        default="sqlite",
+        metadata={
+            "description": "Where to cache Wikipedia pages: 'none' disables the cache, "
+            "'memory' keeps them in process and 'sqlite' persists them to `cache_path`."
+        },
+    )
+
+    wikipedia_cache_ttl: float = field(
+        default=7 * 24 * 60 * 60,
+        metadata={
+            "description": "The number of seconds a cached Wikipedia page is considered fresh."
+        },
+    )
+
+    max_concurrent_wikipedia_lookups: int = field(
+        default=4,
+        metadata={
+            "description": "The maximum number of Wikipedia pages fetched concurrently by a run."
+        },
+    )
+
+    llm_cache: Literal["none", "memory", "sqlite"] = field(
+        default="none",
+        metadata={
+            "description": "Where to cache structured model responses: 'none' disables the "
+            "cache, 'memory' keeps them in process and 'sqlite' persists them to `cache_path`."
+        },
+    )
+
+    llm_cache_ttl: float = field(
+        default=7 * 24 * 60 * 60,
+        metadata={
+            "description": "The number of seconds a cached model response is reused."
+        },
+    )
+
+    llm_cache_max_entries: int = field(
+        default=10000,
+        metadata={
+            "description": "The maximum number of cached model responses; the oldest are evicted."
+        },
+    )
+
+    cache_topic_validation: bool = field(
+        default=True,
+        metadata={
+            "description": "Whether `validate_topic` uses the model response cache."
+        },
+    )
+
+    cache_outline: bool = field(
+        default=True,
+        metadata={
+            "description": "Whether `generate_outline` uses the model response cache."
+        },
+    )
+
+    cache_related_topics: bool = field(
+        default=True,
+        metadata={
+            "description": "Whether `expand_topics` uses the model response cache."
+        },
+    )
+
+    cache_perspectives: bool = field(
+        default=True,
+        metadata={
+            "description": "Whether `generate_perspectives` uses the model response cache."
+        },
+    )
+
     @classmethod
     def from_runnable_config(
         cls, config: Optional[RunnableConfig] = None
@@ -0,0 +1,192 @@
+"""Content-addressed caching for text embeddings.
+
+Embeddings are keyed by (model name, sha256 of the text) and stored as packed
+float32 BLOBs in SQLite, so snippets embedded in earlier runs are never sent to
+the embedding model again.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+import threading
+from array import array
+from typing import Iterable, Optional
+
+from langchain_core.embeddings import Embeddings
+from langchain_ollama import OllamaEmbeddings
+
+from web_research_graph.configuration import Configuration
+
+EMBED_BATCH_SIZE = 64
+
+
+def text_hash(text: str) -> str:
+    """Return the sha256 hex digest of a text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _pack(vector: list[float]) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def _unpack(blob: bytes) -> list[float]:
+    vector = array("f")
+    vector.frombytes(blob)
+    return vector.tolist()
+
+
+def _as_float32(vector: list[float]) -> list[float]:
+    # Round fresh vectors like stored ones, so results do not depend on the cache
+    return array("f", vector).tolist()
+
+
+class EmbeddingStore:
+    """A thread-safe SQLite store of float32 embeddings keyed by text hash."""
+
+    def __init__(self, path: str = ":memory:") -> None:
+        """Open (or create) the embedding store at `path`."""
+        directory = os.path.dirname(path)
+        if path != ":memory:" and directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "model TEXT NOT NULL, hash TEXT NOT NULL, vector BLOB NOT NULL, "
+                "PRIMARY KEY (model, hash))"
+            )
+
+    def get_many(self, model: str, hashes: Iterable[str]) -> dict[str, list[float]]:
+        """Return the stored embeddings for the given text hashes."""
+        hashes = list(hashes)
+        found: dict[str, list[float]] = {}
+        with self._lock:
+            # Stay well below SQLite's limit on query parameters
+            for start in range(0, len(hashes), 500):
+                chunk = hashes[start : start + 500]
+                placeholders = ", ".join("?" for _ in chunk)
+                rows = self._conn.execute(
+                    "SELECT hash, vector FROM embeddings "
+                    f"WHERE model = ? AND hash IN ({placeholders})",
+                    (model, *chunk),
+                ).fetchall()
+                found.update((row[0], _unpack(row[1])) for row in rows)
+        return found
+
+    def put_many(self, model: str, vectors: dict[str, list[float]]) -> None:
+        """Store embeddings keyed by text hash."""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, hash, vector) VALUES (?, ?, ?)",
+                [(model, key, _pack(vector)) for key, vector in vectors.items()],
+            )
+
+    def __len__(self) -> int:
+        """Return the number of stored embeddings."""
+        with self._lock:
+            return int(
+                self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            )
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings that only send texts missing from the store to the model."""
+
+    def __init__(
+        self,
+        underlying: Embeddings,
+        model_name: str,
+        store: EmbeddingStore,
+        batch_size: int = EMBED_BATCH_SIZE,
+    ) -> None:
+        """Wrap `underlying`, caching its document embeddings in `store`."""
+        self.underlying = underlying
+        self.model_name = model_name
+        self.store = store
+        self.batch_size = batch_size
+
+    def _plan(
+        self, texts: list[str]
+    ) -> tuple[list[str], dict[str, list[float]], dict[str, str]]:
+        """Hash the texts and split them into cached vectors and misses."""
+        hashes = [text_hash(text) for text in texts]
+        cached = self.store.get_many(self.model_name, set(hashes))
+        misses = {key: text for key, text in zip(hashes, texts) if key not in cached}
+        return hashes, cached, misses
+
+    def _batches(self, misses: dict[str, str]) -> Iterable[list[tuple[str, str]]]:
+        items = list(misses.items())
+        for start in range(0, len(items), self.batch_size):
+            yield items[start : start + self.batch_size]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        """Embed documents, reusing stored embeddings."""
+        hashes, cached, misses = self._plan(texts)
+        for batch in self._batches(misses):
+            vectors = self.underlying.embed_documents([text for _, text in batch])
+            embedded = {
+                key: _as_float32(vector) for (key, _), vector in zip(batch, vectors)
+            }
+            self.store.put_many(self.model_name, embedded)
+            cached.update(embedded)
+        return [cached[key] for key in hashes]
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        """Asynchronously embed documents, reusing stored embeddings."""
+        hashes, cached, misses = self._plan(texts)
+        for batch in self._batches(misses):
+            vectors = await self.underlying.aembed_documents(
+                [text for _, text in batch]
+            )
+            embedded = {
+                key: _as_float32(vector) for (key, _), vector in zip(batch, vectors)
+            }
+            self.store.put_many(self.model_name, embedded)
+            cached.update(embedded)
+        return [cached[key] for key in hashes]
+
+    def embed_query(self, text: str) -> list[float]:
+        """Embed a query text."""
+        return self.underlying.embed_query(text)
+
+    async def aembed_query(self, text: str) -> list[float]:
+        """Asynchronously embed a query text."""
+        return await self.underlying.aembed_query(text)
+
+
+_STORES: dict[str, EmbeddingStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def get_embedding_store(backend: str, path: str = "") -> Optional[EmbeddingStore]:
+    """Return the process-wide embedding store for a backend.
+
+    Args:
+        backend (str): One of "none", "memory" or "sqlite".
+        path (str): The database file, used by the "sqlite" backend.
+    """
+    if backend == "none":
+        return None
+    if backend not in ("memory", "sqlite"):
+        raise ValueError(f"Unknown embedding cache backend: {backend}")
+    key = ":memory:" if backend == "memory" else path
+    with _STORES_LOCK:
+        store = _STORES.get(key)
+        if store is None:
+            store = _STORES[key] = EmbeddingStore(key)
+    return store
+
+
+def load_embeddings(configuration: Configuration) -> Embeddings:
+    """Load the configured embedding model, cached if enabled."""
+    embeddings: Embeddings = OllamaEmbeddings(model=configuration.embedding_model)
+    store = get_embedding_store(configuration.embedding_cache, configuration.cache_path)
+    if store is None:
+        return embeddings
+    return CachedEmbeddings(embeddings, configuration.embedding_model, store)
@@ -0,0 +1,191 @@
+"""Lexical retrieval with SQLite FTS5, alone or fused with vector search.
+
+`FTSIndex` ranks documents with the BM25 scoring built into SQLite's FTS5
+extension, so retrieval needs no embedding model at all. `HybridIndex` fuses
+its rankings with those of a `VectorIndex` by reciprocal-rank fusion: a
+document scores `1 / (rrf_k + rank)` in each ranking it appears in, which
+combines the two without calibrating BM25 scores against cosine similarities.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import warnings
+from collections.abc import Sequence
+from typing import Optional, Protocol
+
+from langchain_core.documents import Document
+
+from web_research_graph.text import content_terms
+from web_research_graph.vector_index import VectorIndex
+
+# The URL of a reference counts for less than its content
+SOURCE_WEIGHT = 0.5
+
+
+class Retriever(Protocol):
+    """An index that answers a batch of queries with its top documents."""
+
+    def __len__(self) -> int:
+        """Return the number of indexed documents."""
+        ...
+
+    async def abatch_search(
+        self,
+        queries: Sequence[str],
+        k: int = 3,
+        mmr: bool = False,
+        fetch_k: int = 20,
+        lambda_mult: float = 0.5,
+    ) -> list[list[Document]]:
+        """Return the top-k documents for each query."""
+        ...
+
+    def close(self) -> None:
+        """Release the resources held by the index."""
+        ...
+
+
+def fts_query(text: str) -> str:
+    """Turn free text into an FTS5 query matching any of its content terms."""
+    terms = dict.fromkeys(content_terms(text))
+    return " OR ".join('"{}"'.format(term.replace('"', '""')) for term in terms)
+
+
+class FTSIndex:
+    """A BM25 index over a fixed set of documents, held in in-memory SQLite."""
+
+    def __init__(self, documents: Sequence[Document]) -> None:
+        """Index the documents and their sources."""
+        self.documents = list(documents)
+        self._db = sqlite3.connect(":memory:", check_same_thread=False)
+        try:
+            self._db.execute(
+                "CREATE VIRTUAL TABLE docs USING fts5("
+                "source, content, tokenize='porter unicode61')"
+            )
+        except sqlite3.OperationalError:
+            # SQLite was built without FTS5
+            self._db.close()
+            raise
+        self._db.executemany(
+            "INSERT INTO docs (rowid, source, content) VALUES (?, ?, ?)",
+            (
+                (row, doc.metadata.get("source", ""), doc.page_content)
+                for row, doc in enumerate(self.documents)
+            ),
+        )
+
+    def __len__(self) -> int:
+        """Return the number of indexed documents."""
+        return len(self.documents)
+
+    def close(self) -> None:
+        """Close the SQLite connection; the index cannot be searched after."""
+        self._db.close()
+
+    def search(self, query: str, k: int) -> list[Document]:
+        """Return up to `k` documents ranked by BM25 relevance to the query."""
+        match = fts_query(query)
+        if not match or k <= 0:
+            return []
+        rows = self._db.execute(
+            "SELECT rowid FROM docs WHERE docs MATCH ? "
+            "ORDER BY bm25(docs, ?, 1.0) LIMIT ?",
+            (match, SOURCE_WEIGHT, k),
+        ).fetchall()
+        return [self.documents[row] for (row,) in rows]
+
+    async def abatch_search(
+        self,
+        queries: Sequence[str],
+        k: int = 3,
+        mmr: bool = False,
+        fetch_k: int = 20,
+        lambda_mult: float = 0.5,
+    ) -> list[list[Document]]:
+        """Return the top-k documents for each query.
+
+        The MMR arguments are accepted for compatibility with `VectorIndex`
+        and ignored, since diversifying needs document embeddings.
+        """
+        return [self.search(query, k) for query in queries]
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[Document]], k: int, rrf_k: int = 60
+) -> list[Document]:
+    """Fuse rankings of the same documents into the top `k` of them."""
+    scores: dict[int, float] = {}
+    documents: dict[int, Document] = {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking, start=1):
+            scores[id(doc)] = scores.get(id(doc), 0.0) + 1 / (rrf_k + rank)
+            documents[id(doc)] = doc
+    best = sorted(scores, key=lambda key: scores[key], reverse=True)[:k]
+    return [documents[key] for key in best]
+
+
+class HybridIndex:
+    """Fuse BM25 and vector rankings of the same documents."""
+
+    def __init__(
+        self,
+        lexical: FTSIndex,
+        vector: Optional[VectorIndex] = None,
+        rrf_k: int = 60,
+    ) -> None:
+        """Combine two indexes of the same documents.
+
+        Args:
+            lexical (FTSIndex): The BM25 index.
+            vector (Optional[VectorIndex]): The vector index, if the documents
+                could be embedded. Without one, only BM25 is used.
+            rrf_k (int): Damps the weight of the top ranks in the fusion.
+        """
+        self.lexical = lexical
+        self.vector = vector
+        self.rrf_k = rrf_k
+
+    def __len__(self) -> int:
+        """Return the number of indexed documents."""
+        return len(self.lexical)
+
+    def close(self) -> None:
+        """Close both indexes."""
+        self.lexical.close()
+        if self.vector is not None:
+            self.vector.close()
+
+    async def abatch_search(
+        self,
+        queries: Sequence[str],
+        k: int = 3,
+        mmr: bool = False,
+        fetch_k: int = 20,
+        lambda_mult: float = 0.5,
+    ) -> list[list[Document]]:
+        """Return the top-k fused documents for each query.
+
+        Each index contributes its `fetch_k` best candidates to the fusion.
+        The MMR arguments apply to the vector candidates.
+        """
+        candidates = max(k, fetch_k)
+        lexical = await self.lexical.abatch_search(queries, candidates)
+        if self.vector is None:
+            return [ranking[:k] for ranking in lexical]
+        try:
+            vector = await self.vector.abatch_search(
+                queries, candidates, mmr, fetch_k, lambda_mult
+            )
+        except Exception as error:
+            warnings.warn(
+                f"Embedding the queries failed, retrieving with BM25 only: {error!r}",
+                RuntimeWarning,
+                stacklevel=2,
+            )
+            return [ranking[:k] for ranking in lexical]
+        return [
+            reciprocal_rank_fusion(rankings, k, self.rrf_k)
+            for rankings in zip(lexical, vector)
+        ]
@@ -1,6 +1,10 @@
 """Define a research and content generation workflow graph."""
 
-from langgraph.graph import StateGraph
+from typing import Any, Optional
+
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.graph import END, StateGraph
+from langgraph.pregel import Pregel
 
 from web_research_graph.configuration import Configuration
 from web_research_graph.interviews_graph.graph import interview_graph
@@ -12,6 +16,7 @@ from web_research_graph.nodes.topic_expander import expand_topics
 from web_research_graph.nodes.topic_input import request_topic
 from web_research_graph.nodes.topic_validator import validate_topic
 from web_research_graph.state import InputState, OutputState, State
+from web_research_graph.telemetry import TelemetryCallbackHandler
 
 
 def should_continue(state: State) -> bool:
@@ -19,33 +24,57 @@ def should_continue(state: State) -> bool:
     return state.topic.is_valid
 
 
-builder = StateGraph(
-    State, input=InputState, output=OutputState, config_schema=Configuration
-)
-
-builder.add_node("validate_topic", validate_topic)
-builder.add_node("request_topic", request_topic)
-builder.add_node("generate_outline", generate_outline)
-builder.add_node("expand_topics", expand_topics)
-builder.add_node("generate_perspectives", generate_perspectives)
-builder.add_node("conduct_interviews", interview_graph)
-builder.add_node("refine_outline", refine_outline)
-builder.add_node("generate_article", generate_article)
-
-
-builder.set_entry_point("validate_topic")
-builder.add_conditional_edges(
-    "validate_topic",
-    should_continue,
-    {True: "generate_outline", False: "request_topic"},
-)
-builder.add_edge("request_topic", "validate_topic")
-builder.add_edge("generate_outline", "expand_topics")
-builder.add_edge("expand_topics", "generate_perspectives")
-builder.add_edge("generate_perspectives", "conduct_interviews")
-builder.add_edge("conduct_interviews", "refine_outline")
-builder.add_edge("refine_outline", "generate_article")
-builder.set_finish_point("generate_article")
-
-graph = builder.compile(interrupt_after=["request_topic"])
-graph.name = "Research and Outline Generator"
+def create_graph(
+    interactive: bool = True, checkpointer: Optional[BaseCheckpointSaver[Any]] = None
+) -> Pregel:
+    """Build the research graph.
+
+    Args:
+        interactive (bool): Ask the user for a new topic when the topic is
+            invalid. Otherwise an invalid topic ends the run without an article,
+            which suits batch runs where there is nobody to ask.
+        checkpointer (Optional[BaseCheckpointSaver]): Saves the state of every
+            step so an interrupted run can be resumed.
+    """
+    builder = StateGraph(
+        State, input=InputState, output=OutputState, config_schema=Configuration
+    )
+
+    builder.add_node("validate_topic", validate_topic)
+    builder.add_node("generate_outline", generate_outline)
+    builder.add_node("expand_topics", expand_topics)
+    builder.add_node("generate_perspectives", generate_perspectives)
+    builder.add_node("conduct_interviews", interview_graph)
+    builder.add_node("refine_outline", refine_outline)
+    builder.add_node("generate_article", generate_article)
+
+    builder.set_entry_point("validate_topic")
+    if interactive:
+        builder.add_node("request_topic", request_topic)
+        builder.add_conditional_edges(
+            "validate_topic",
+            should_continue,
+            {True: "generate_outline", False: "request_topic"},
+        )
+        builder.add_edge("request_topic", "validate_topic")
+    else:
+        builder.add_conditional_edges(
+            "validate_topic", should_continue, {True: "generate_outline", False: END}
+        )
+    builder.add_edge("generate_outline", "expand_topics")
+    builder.add_edge("expand_topics", "generate_perspectives")
+    builder.add_edge("generate_perspectives", "conduct_interviews")
+    builder.add_edge("conduct_interviews", "refine_outline")
+    builder.add_edge("refine_outline", "generate_article")
+    builder.set_finish_point("generate_article")
+
+    # Trace every node and model call, including those of the interview subgraphs
+    compiled = builder.compile(
+        checkpointer=checkpointer,
+        interrupt_after=["request_topic"] if interactive else None,
+    ).with_config(callbacks=[TelemetryCallbackHandler()])
+    compiled.name = "Research and Outline Generator"
+    return compiled
+
+
+graph = create_graph()
@@ -0,0 +1,280 @@
+"""Latency-hedged model calls with a backup model from another provider.
+
+`HedgedChatModel` sends a call to its primary model and, if no answer has
+started after a delay, sends the same call to a backup model. Whichever starts
+answering first wins and the other call is cancelled. A primary that fails
+before answering is replaced by the backup at once.
+
+The delay is a percentile of the primary's recent latencies, kept online by a
+process-wide `LatencyTracker` per model: with the 95th percentile, roughly one
+call in twenty is hedged, which cuts the slow tail for a few percent of extra
+calls. Streamed calls are hedged on the time to the first chunk, other calls
+on the time to the whole response.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import math
+import threading
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Sequence
+from typing import Any, Callable, Optional, TypeVar
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models import BaseChatModel, LanguageModelInput
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+from langchain_core.runnables import Runnable, RunnableBinding
+from opentelemetry import metrics
+
+from web_research_graph.utils import load_chat_model
+
+T = TypeVar("T")
+
+_hedged_calls = metrics.get_meter(__name__).create_counter(
+    "web_research.llm.hedged_calls",
+    unit="{call}",
+    description="Model calls by whether a backup was sent and which model won",
+)
+
+
+class LatencyTracker:
+    """A thread-safe window of the most recent latencies of a model."""
+
+    def __init__(self, window: int = 256) -> None:
+        """Keep the latest `window` samples."""
+        self._samples: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        """Record a latency."""
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        """Return the number of samples."""
+        return len(self._samples)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Return the `q` percentile (between 0 and 1) of the samples, if any."""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, max(0, math.ceil(q * len(samples)) - 1))]
+
+
+_TRACKERS: dict[tuple[str, str], LatencyTracker] = {}
+_TRACKERS_LOCK = threading.Lock()
+
+
+def get_latency_tracker(model_name: str, kind: str) -> LatencyTracker:
+    """Return the process-wide tracker of a model for "first_chunk" or "response"."""
+    with _TRACKERS_LOCK:
+        tracker = _TRACKERS.get((model_name, kind))
+        if tracker is None:
+            tracker = _TRACKERS[(model_name, kind)] = LatencyTracker()
+        return tracker
+
+
+async def _first_chunk(
+    stream: AsyncIterator[ChatGenerationChunk],
+) -> Optional[ChatGenerationChunk]:
+    """Wait for the first chunk of a stream, or None if it is empty."""
+    try:
+        return await stream.__anext__()
+    except StopAsyncIteration:
+        return None
+
+
+class HedgedChatModel(BaseChatModel):
+    """A chat model that hedges slow calls to its primary with a backup model."""
+
+    primary: BaseChatModel
+    backup: BaseChatModel
+    primary_name: str
+    backup_name: str
+    percentile: float = 0.95
+    initial_delay: float = 2.0
+    min_samples: int = 20
+
+    @property
+    def _llm_type(self) -> str:
+        return f"hedged-{self.primary._llm_type}"
+
+    @property
+    def _identifying_params(self) -> dict[str, Any]:
+        return {"primary": self.primary_name, "backup": self.backup_name}
+
+    def _get_ls_params(self, stop: Optional[list[str]] = None, **kwargs: Any) -> Any:
+        return self.primary._get_ls_params(stop=stop, **kwargs.get("primary", {}))
+
+    def bind_tools(
+        self, tools: Sequence[Any], **kwargs: Any
+    ) -> Runnable[LanguageModelInput, BaseMessage]:
+        """Bind tools formatted for each model, so either can answer."""
+        structured_output = kwargs.pop("ls_structured_output_format", None)
+        bound: dict[str, Any] = {}
+        for key, model in (("primary", self.primary), ("backup", self.backup)):
+            binding = model.bind_tools(tools, **kwargs)
+            if not (isinstance(binding, RunnableBinding) and binding.bound is model):
+                raise NotImplementedError(f"Cannot hedge the tools bound by {model}")
+            bound[key] = binding.kwargs
+        if structured_output is not None:
+            bound["ls_structured_output_format"] = structured_output
+        return RunnableBinding(bound=self, kwargs=bound)
+
+    def _delay(self, kind: str) -> float:
+        tracker = get_latency_tracker(self.primary_name, kind)
+        delay = tracker.percentile(self.percentile)
+        if delay is None or len(tracker) < self.min_samples:
+            return self.initial_delay
+        return delay
+
+    async def _race(
+        self, attempts: Sequence[Callable[[], Awaitable[T]]], kind: str
+    ) -> tuple[int, T]:
+        """Run the primary attempt, hedged with the backup one after a delay.
+
+        Returns:
+            The index of the winning attempt and its result.
+        """
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        deadline = start + self._delay(kind)
+        tasks = {asyncio.ensure_future(attempts[0]()): 0}
+        backup_start: Optional[float] = None
+        errors: list[BaseException] = []
+        try:
+            while True:
+                timeout = (
+                    None
+                    if backup_start is not None
+                    else max(0.0, deadline - loop.time())
+                )
+                done, _ = await asyncio.wait(
+                    tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    index = tasks.pop(task)
+                    error = task.exception()
+                    if error is not None:
+                        errors.append(error)
+                        continue
+                    now = loop.time()
+                    name = self.backup_name if index else self.primary_name
+                    get_latency_tracker(name, kind).observe(
+                        now - (backup_start if index and backup_start else start)
+                    )
+                    _hedged_calls.add(
+                        1,
+                        {
+                            "model": self.primary_name,
+                            "hedged": backup_start is not None,
+                            "winner": "backup" if index else "primary",
+                        },
+                    )
+                    return index, task.result()
+                if backup_start is None:
+                    # The primary is slow or failed, so send the backup call
+                    backup_start = loop.time()
+                    tasks[asyncio.ensure_future(attempts[1]())] = 1
+                elif not tasks:
+                    raise errors[0]
+        finally:
+            for task, index in tasks.items():
+                task.cancel()
+                if index == 0:
+                    # A cancelled primary took at least this long, which keeps
+                    # the percentile from drifting down to the calls that won
+                    get_latency_tracker(self.primary_name, kind).observe(
+                        loop.time() - start
+                    )
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        """Generate synchronously with the primary model only."""
+        return self.primary._generate(messages, stop=stop, **kwargs.get("primary", {}))
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        attempts = [
+            functools.partial(
+                model._agenerate, messages, stop=stop, **kwargs.get(key, {})
+            )
+            for model, key in ((self.primary, "primary"), (self.backup, "backup"))
+        ]
+        _, result = await self._race(attempts, "response")
+        return result
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        streams = [
+            model._astream(messages, stop=stop, **kwargs.get(key, {}))
+            for model, key in ((self.primary, "primary"), (self.backup, "backup"))
+        ]
+        try:
+            index, first = await self._race(
+                [functools.partial(_first_chunk, stream) for stream in streams],
+                "first_chunk",
+            )
+            if first is None:
+                return
+            yield first
+            async for chunk in streams[index]:
+                yield chunk
+        finally:
+            for stream in streams:
+                await stream.aclose()  # type: ignore[attr-defined]
+
+
+def load_hedged_chat_model(
+    fully_specified_name: str,
+    backup_name: str = "",
+    percentile: float = 0.95,
+    initial_delay: float = 2.0,
+    max_tokens: Optional[int] = None,
+) -> BaseChatModel:
+    """Load a chat model hedged with a backup model, if one is given.
+
+    Args:
+        fully_specified_name (str): The primary model, as 'provider/model'.
+        backup_name (str): The backup model, as 'provider/model'. Without one,
+            the primary model is returned as is.
+        percentile (float): The percentile of the primary's latency after which
+            the backup call is sent.
+        initial_delay (float): The delay used until enough latencies are known.
+        max_tokens (Optional[int]): Maximum number of tokens to generate.
+    """
+    primary = load_chat_model(fully_specified_name, max_tokens=max_tokens)
+    if not backup_name or backup_name == fully_specified_name:
+        return primary
+    return HedgedChatModel(
+        primary=primary,
+        backup=load_chat_model(backup_name, max_tokens=max_tokens),
+        primary_name=fully_specified_name,
+        backup_name=backup_name,
+        percentile=percentile,
+        initial_delay=initial_delay,
+    )
@@ -1,5 +1,5 @@
 """Interview process package."""
 
-from .graph import interview_graph
+from .graph import editor_interview_graph, interview_graph
 
-__all__ = ["interview_graph"]
+__all__ = ["interview_graph", "editor_interview_graph"]
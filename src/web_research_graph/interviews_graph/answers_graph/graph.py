@@ -8,9 +8,9 @@ from web_research_graph.interviews_graph.answers_graph.nodes.generate import (
 from web_research_graph.interviews_graph.answers_graph.nodes.search import (
     search_for_context,
 )
-from web_research_graph.state import InterviewState
+from web_research_graph.state import EditorInterviewState
 
-builder = StateGraph(InterviewState)
+builder = StateGraph(EditorInterviewState)
 
 # Add nodes
 builder.add_node("search_context", search_for_context)
@@ -1,35 +1,62 @@
 """Node for generating expert answers."""
 
-from langchain_core.messages import AIMessage
+from langchain_core.messages import AIMessage, HumanMessage
 from langchain_core.runnables import RunnableConfig
 
 from web_research_graph.configuration import Configuration
+from web_research_graph.hedging import load_hedged_chat_model
 from web_research_graph.prompts import INTERVIEW_ANSWER_PROMPT
-from web_research_graph.state import InterviewState
-from web_research_graph.utils import load_chat_model
+from web_research_graph.references import select_references
+from web_research_graph.state import EditorInterviewState
+from web_research_graph.token_budget import fit_messages
+from web_research_graph.utils import get_message_text, swap_roles
 
 EXPERT_NAME = "expert"
+# Said by the expert when the model returns an empty answer
+NO_ANSWER = "I'm sorry, I don't know."
 
 
 async def generate_expert_answer(
-    state: InterviewState, config: RunnableConfig
-) -> InterviewState:
+    state: EditorInterviewState, config: RunnableConfig
+) -> EditorInterviewState:
     """Generate an expert answer using the gathered information."""
     configuration = Configuration.from_runnable_config(config)
-    model = load_chat_model(configuration.fast_llm_model)
+    model = load_hedged_chat_model(
+        configuration.fast_llm_model,
+        configuration.backup_llm_model,
+        configuration.hedge_percentile,
+        configuration.hedge_initial_delay,
+    )
 
-    editor = state.editors[state.current_editor_index]
-    if editor is None:
+    if state.editor is None:
         raise ValueError("Editor not found in state")
-    messages = state.interviews[state.current_editor_index]
+    messages = swap_roles(state.interview, EXPERT_NAME)
+
+    # Only include the references most relevant to the current question
+    question = next(
+        (msg for msg in reversed(messages) if isinstance(msg, HumanMessage)), None
+    )
+    references = select_references(
+        state.references,
+        get_message_text(question) if question else "",
+        configuration.expert_references_k,
+        configuration.expert_references_max_tokens,
+        configuration.fast_llm_model,
+    )
 
     # Format references for the prompt
-    references_text = ""
-    if state.references:
-        references_text = "\n\n".join(
-            f"Source: {url}\nContent: {content}"
-            for url, content in state.references.items()
-        )
+    references_text = "\n\n".join(
+        f"Source: {reference.url}\nContent: {reference.content}"
+        for reference in references
+    )
+
+    # Keep the transcript within its token budget
+    messages = fit_messages(
+        messages,
+        configuration.answer_transcript_max_tokens,
+        configuration.fast_llm_model,
+        start_on="human",
+    )
 
     # Create the chain
     chain = (INTERVIEW_ANSWER_PROMPT | model).with_config(config)
@@ -39,9 +66,12 @@ async def generate_expert_answer(
 
     content = result.content if hasattr(result, "content") else str(result)
 
+    # The expert must still answer, or the editor's question would be routed
+    # back to the expert forever
     if not content:
-        return state
+        content = NO_ANSWER
 
     return {
-        "messages": AIMessage(content=content, name=EXPERT_NAME),
+        "interview": AIMessage(content=content, name=EXPERT_NAME),
+        "reference_counts": [*state.reference_counts, state.references.page_count],
     }  # type: ignore
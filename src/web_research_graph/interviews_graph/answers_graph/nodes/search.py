@@ -1,9 +1,14 @@
 """Node for searching relevant context for answers."""
 
+import asyncio
+
 from langchain_core.messages import HumanMessage
 from langchain_core.runnables import RunnableConfig
 
-from web_research_graph.state import InterviewState
+from web_research_graph.interviews_graph.session import get_session
+from web_research_graph.references import passage_url
+from web_research_graph.state import EditorInterviewState
+from web_research_graph.telemetry import record_cache_lookup
 from web_research_graph.tools import search
 from web_research_graph.utils import swap_roles
 
@@ -11,14 +16,13 @@ EXPERT_NAME = "expert"
 
 
 async def search_for_context(
-    state: InterviewState, config: RunnableConfig
-) -> InterviewState:
+    state: EditorInterviewState, config: RunnableConfig
+) -> EditorInterviewState:
     """Search for relevant information to answer the question."""
-    editor = state.editors[state.current_editor_index]
-    if editor is None:
+    if state.editor is None:
         raise ValueError("Editor not found in state")
 
-    messages = state.interviews[state.current_editor_index]
+    messages = state.interview
     # Swap roles to get the correct perspective
     swapped_messages = swap_roles(messages, EXPERT_NAME)
 
@@ -29,10 +33,19 @@ async def search_for_context(
     )
 
     if not last_question:
-        return state
+        return {}  # type: ignore
 
-    # Perform search
-    search_results = await search(str(last_question.content), config=config)
+    # Perform search, unless another editor already asked nearly the same
+    query = str(last_question.content)
+    session = get_session(config, state.topic.topic or "")
+    index = session.question_index if session is not None else None
+    if index is None:
+        search_results = await search(query, config=config)
+    else:
+        search_results, reused = await index.search(
+            query, lambda: search(query, config=config)
+        )
+        await record_cache_lookup("questions", "hit" if reused else "miss", config)
 
     # Store results in references
     if search_results:
@@ -42,6 +55,20 @@ async def search_for_context(
                 references[result.get("link", "unknown")] = result.get("snippet", "")
             elif isinstance(result, str):
                 references[f"source_{len(references)}"] = result
+
+        # Add the most relevant passages of every page, fetched concurrently
+        fetcher = session.page_fetcher if session is not None else None
+        if fetcher is not None:
+            links = [link for link in references if link.startswith("http")]
+            pages = await asyncio.gather(
+                *(fetcher.fetch_passages(link, query) for link in links),
+                return_exceptions=True,
+            )
+            for link, passages in zip(links, pages):
+                if isinstance(passages, BaseException):
+                    continue
+                for number, passage in passages:
+                    references[passage_url(link, number)] = passage
         return {
             "references": references,
         }  # type: ignore
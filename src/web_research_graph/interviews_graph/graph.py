@@ -1,42 +1,81 @@
 """Define the interview workflow graph."""
 
+from collections.abc import Hashable
+from typing import Callable, cast
+
 from langgraph.graph import END, StateGraph
 from langgraph.pregel import RetryPolicy
 
 from web_research_graph.interviews_graph.answers_graph.graph import answer_graph
+from web_research_graph.interviews_graph.nodes.begin import begin_interview
+from web_research_graph.interviews_graph.nodes.finish import (
+    end_interviews,
+    finish_interview,
+)
 from web_research_graph.interviews_graph.nodes.initialize import initialize_interview
-from web_research_graph.interviews_graph.nodes.next_editor import next_editor
 from web_research_graph.interviews_graph.nodes.question import generate_question
-from web_research_graph.interviews_graph.router import route_messages
-from web_research_graph.state import InterviewState
-
-builder = StateGraph(InterviewState)
+from web_research_graph.interviews_graph.router import (
+    dispatch_interviews,
+    route_messages,
+)
+from web_research_graph.state import (
+    EditorInterviewState,
+    InterviewOutputState,
+    InterviewState,
+)
 
-# FIXME:
-# - each interview should have its own dialogue history
-# - all interview dialogues should be accessible for the next step
-# - in the paper, they are not including the interview history for the expert to answer; though it is reasonable to provide it.
+# Each editor is interviewed in its own sub-run with a private transcript.
+# In the paper, they are not including the interview history for the expert to
+# answer; though it is reasonable to provide it.
+editor_builder = StateGraph(EditorInterviewState, output=InterviewOutputState)
 
 # Add nodes
-builder.add_node("initialize", initialize_interview)
-builder.add_node("ask_question", generate_question, retry=RetryPolicy(max_attempts=5))
-builder.add_node("answer_question", answer_graph, retry=RetryPolicy(max_attempts=5))
-builder.add_node("next_editor", next_editor)
+editor_builder.add_node("begin", begin_interview)
+editor_builder.add_node(
+    "ask_question", generate_question, retry=RetryPolicy(max_attempts=5)
+)
+editor_builder.add_node(
+    "answer_question", answer_graph, retry=RetryPolicy(max_attempts=5)
+)
+editor_builder.add_node("finish", finish_interview)
 
 # Add edges
-builder.set_entry_point("initialize")
-builder.add_edge("initialize", "ask_question")
-builder.add_conditional_edges(
+editor_builder.set_entry_point("begin")
+editor_builder.add_edge("begin", "ask_question")
+editor_builder.add_conditional_edges(
+    "ask_question",
+    route_messages,
+    {"answer_question": "answer_question", "end": "finish"},
+)
+editor_builder.add_conditional_edges(
     "answer_question",
     route_messages,
-    {"ask_question": "ask_question", "next_editor": "next_editor", "end": END},
+    {"ask_question": "ask_question", "end": "finish"},
 )
-builder.add_edge("ask_question", "answer_question")
+editor_builder.add_edge("finish", END)
+
+editor_interview_graph = editor_builder.compile()
+editor_interview_graph.name = "Editor Interview"
+
+# All editor interviews are fanned out at once and merged back into the
+# shared messages and references when every sub-run is done. The objects the
+# interviews share live in an `InterviewSession`, closed at the end.
+builder = StateGraph(InterviewState, output=InterviewOutputState)
+
+# Add nodes
+builder.add_node("initialize", initialize_interview)
+builder.add_node("interview_editor", editor_interview_graph)
+builder.add_node("end_interviews", end_interviews)
+
+# Add edges
+builder.set_entry_point("initialize")
 builder.add_conditional_edges(
-    "next_editor",
-    lambda x: "end" if x.is_complete else "ask_question",
-    {"ask_question": "ask_question", "end": END},
+    "initialize",
+    cast(Callable[..., list[Hashable]], dispatch_interviews),
+    ["interview_editor"],
 )
+builder.add_edge("interview_editor", "end_interviews")
+builder.add_edge("end_interviews", END)
 
 interview_graph = builder.compile()
 interview_graph.name = "Interview Conductor"
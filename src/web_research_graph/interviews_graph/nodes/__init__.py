@@ -1,7 +1,7 @@
 """Interview nodes package."""
 
+from .finish import finish_interview
 from .initialize import initialize_interview
-from .next_editor import next_editor
 from .question import generate_question
 
-__all__ = ["initialize_interview", "generate_question", "next_editor"]
+__all__ = ["initialize_interview", "generate_question", "finish_interview"]
@@ -0,0 +1,17 @@
+"""Node for starting an editor's interview."""
+
+from langchain_core.runnables import RunnableConfig
+
+from web_research_graph.interviews_graph.session import get_session
+from web_research_graph.state import EditorInterviewState
+
+
+async def begin_interview(
+    state: EditorInterviewState, config: RunnableConfig
+) -> EditorInterviewState:
+    """Wait until fewer than `max_concurrent_interviews` interviews are held."""
+    session = get_session(config, state.topic.topic or "")
+    if session is not None and state.editor_index not in session.active:
+        await session.interviews.acquire()
+        session.active.add(state.editor_index)
+    return {}  # type: ignore
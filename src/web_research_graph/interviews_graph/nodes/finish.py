@@ -0,0 +1,26 @@
+"""Nodes for closing the interviews."""
+
+from langchain_core.runnables import RunnableConfig
+
+from web_research_graph.interviews_graph.session import close_session, get_session
+from web_research_graph.state import EditorInterviewState, InterviewState
+
+
+def finish_interview(
+    state: EditorInterviewState, config: RunnableConfig
+) -> EditorInterviewState:
+    """Publish the private interview transcript to the shared messages."""
+    session = get_session(config, state.topic.topic or "")
+    if session is not None and state.editor_index in session.active:
+        # Let the next editor in
+        session.active.discard(state.editor_index)
+        session.interviews.release()
+    return {"messages": list(state.interview)}  # type: ignore
+
+
+async def end_interviews(
+    state: InterviewState, config: RunnableConfig
+) -> InterviewState:
+    """Close what the interviews of the run shared, once they are all done."""
+    await close_session(config)
+    return {}  # type: ignore
@@ -1,11 +1,20 @@
 """Node for initializing the interview process."""
 
-from langchain_core.messages import AIMessage, AnyMessage
+from dataclasses import asdict, is_dataclass
+from typing import Any
+
 from langchain_core.runnables import RunnableConfig
 
 from web_research_graph.state import Editor, InterviewState
 
-EXPERT_NAME = "expert"
+
+def _as_editor(editor: Any) -> Editor:
+    """Coerce a structured-output editor into an Editor object."""
+    if isinstance(editor, Editor):
+        return editor
+    if is_dataclass(editor) and not isinstance(editor, type):
+        return Editor(**asdict(editor))
+    return Editor(**editor)
 
 
 def initialize_interview(
@@ -16,27 +25,16 @@ def initialize_interview(
     if not state.perspectives:
         raise ValueError("No perspectives found in state")
 
-    perspectives = state.perspectives
-    editors = perspectives.get("editors", [])
+    perspectives: Any = state.perspectives
+    if isinstance(perspectives, dict):
+        editors = perspectives.get("editors", [])
+    else:
+        editors = perspectives.editors
 
     if not editors:
         raise ValueError("No editors found in perspectives")
 
     # Convert editors to proper Editor objects
-    editors_list = [Editor(**editor) for editor in editors]
-
-    # first expert response
-    initial_message = AIMessage(
-        content=f"So you said you were writing an article on {state.topic.topic}?",
-        name=EXPERT_NAME,
-    )
-
-    # alloc interviews history
-    interviews: list[list[AnyMessage]] = [[] for _ in editors_list]
-    interviews[0].append(initial_message)
-
-    return {
-        "editors": editors_list,
-        "current_editor_index": 0,
-        "interviews": interviews,
-    }  # type: ignore
+    editors_list = [_as_editor(editor) for editor in editors]
+
+    return {"editors": editors_list}  # type: ignore
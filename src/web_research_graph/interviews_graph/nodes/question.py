@@ -4,34 +4,43 @@ from langchain_core.messages import AIMessage
 from langchain_core.runnables import RunnableConfig
 
 from web_research_graph.configuration import Configuration
+from web_research_graph.hedging import load_hedged_chat_model
 from web_research_graph.prompts import INTERVIEW_QUESTION_PROMPT
-from web_research_graph.state import InterviewState
-from web_research_graph.utils import load_chat_model, sanitize_name, swap_roles
+from web_research_graph.state import EditorInterviewState
+from web_research_graph.token_budget import fit_messages
+from web_research_graph.utils import sanitize_name, swap_roles
 
 
 async def generate_question(
-    state: InterviewState, config: RunnableConfig
-) -> InterviewState:
+    state: EditorInterviewState, config: RunnableConfig
+) -> EditorInterviewState:
     """Generate a question from the editor's perspective."""
     configuration = Configuration.from_runnable_config(config)
-    model = load_chat_model(configuration.fast_llm_model)
-
-    editor = state.editors[state.current_editor_index]
+    model = load_hedged_chat_model(
+        configuration.fast_llm_model,
+        configuration.backup_llm_model,
+        configuration.hedge_percentile,
+        configuration.hedge_initial_delay,
+    )
+
+    editor = state.editor
     if editor is None:
         raise ValueError(
             "Editor not found in state. Make sure to set the editor before starting the interview."
         )
 
     editor_name = sanitize_name(editor.name)
-    interviews = list(state.interviews)
-    interview = interviews[state.current_editor_index]
-    swapped = swap_roles(interview, editor_name)
+    swapped = fit_messages(
+        swap_roles(state.interview, editor_name),
+        configuration.question_transcript_max_tokens,
+        configuration.fast_llm_model,
+        start_on="human",
+    )
 
     chain = (INTERVIEW_QUESTION_PROMPT | model).with_config(config)
 
     result = await chain.ainvoke({"messages": swapped, "persona": editor.persona})
 
     content = result.content if hasattr(result, "content") else str(result)
-    interview.append(AIMessage(content=content, name=editor_name))
 
-    return {"interviews": interviews}  # type: ignore
+    return {"interview": AIMessage(content=content, name=editor_name)}  # type: ignore
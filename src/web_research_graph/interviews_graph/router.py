@@ -1,33 +1,91 @@
 """Router functions for managing interview flow."""
 
+from typing import Optional
+
 from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.types import Send
 
-from web_research_graph.state import InterviewState
-from web_research_graph.utils import sanitize_name
+from web_research_graph.configuration import Configuration
+from web_research_graph.state import EditorInterviewState, InterviewState
+from web_research_graph.text import content_terms
+from web_research_graph.utils import get_message_text, sanitize_name
 
-MAX_TURNS = 3
 EXPERT_NAME = "expert"
 
 
-def route_messages(state: InterviewState) -> str:
-    """Determine whether to continue the interview or end it."""
-    editor = state.editors[state.current_editor_index]
-    current_editor_name = sanitize_name(editor.name)
+def dispatch_interviews(state: InterviewState) -> list[Send]:
+    """Fan out one private interview sub-run per editor."""
+    return [
+        Send(
+            "interview_editor",
+            {
+                "topic": state.topic,
+                "outline": state.outline,
+                # Every expert sees the references gathered so far in the run
+                "references": state.references,
+                "reference_counts": [state.references.page_count],
+                "editor": editor,
+                "editor_index": index,
+                "interview": [
+                    # first expert response
+                    AIMessage(
+                        content=f"So you said you were writing an article on {state.topic.topic}?",
+                        name=EXPERT_NAME,
+                    )
+                ],
+            },
+        )
+        for index, editor in enumerate(state.editors)
+    ]
+
+
+def information_gain(state: EditorInterviewState) -> int:
+    """Count what the latest expert answer added to the interview.
+
+    The gain is the number of pages its search added plus the number of
+    outline terms the answer mentions for the first time in the interview.
+    """
+    answers = [
+        get_message_text(m)
+        for m in state.interview[1:]
+        if isinstance(m, AIMessage) and m.name == EXPERT_NAME
+    ]
+    if not answers:
+        return 0
+
+    counts = state.reference_counts
+    new_references = (
+        counts[-1] - (counts[-2] if len(counts) > 1 else 0) if counts else 0
+    )
+
+    outline = state.outline.as_str if state.outline else ""
+    relevant = set(content_terms(f"{state.topic.topic or ''} {outline}"))
+    seen = {term for answer in answers[:-1] for term in content_terms(answer)}
+    new_terms = (set(content_terms(answers[-1])) & relevant) - seen
+    return new_references + len(new_terms)
 
-    messages = state.interviews[state.current_editor_index]
+
+def route_messages(
+    state: EditorInterviewState, config: Optional[RunnableConfig] = None
+) -> str:
+    """Determine whether to continue the interview or end it.
+
+    The interview ends after `max_interview_turns` answers, or earlier once an
+    answer brings less than `interview_min_information_gain`.
+    """
+    configuration = Configuration.from_runnable_config(config)
+    if state.editor is None:
+        raise ValueError("Editor not found in state")
+    current_editor_name = sanitize_name(state.editor.name)
+
+    messages = state.interview
     # Get the last message
     if messages:
         last_message = messages[-1]
 
-        # If the last message was from the expert, wait for editor's response
+        # If the last message was from the expert, check whether we are done
         if isinstance(last_message, AIMessage) and last_message.name == EXPERT_NAME:
-            return "ask_question"
-
-        # If the last message was from the editor
-        if (
-            isinstance(last_message, AIMessage)
-            and last_message.name == current_editor_name
-        ):
             # Count expert responses in this conversation
             expert_responses = len(
                 [
@@ -36,14 +94,27 @@ def route_messages(state: InterviewState) -> str:
                     if isinstance(m, AIMessage) and m.name == EXPERT_NAME
                 ]
             )
+            # The opening line is also spoken by the expert
+            if expert_responses - 1 >= configuration.max_interview_turns:
+                return "end"
+            if (
+                expert_responses > 1
+                and information_gain(state)
+                < configuration.interview_min_information_gain
+            ):
+                return "end"
+            return "ask_question"
 
-            # Check if we've reached max turns or got a thank you
-            if expert_responses >= MAX_TURNS or last_message.content.endswith(
+        # If the last message was from the editor, answer it unless they said thanks
+        if (
+            isinstance(last_message, AIMessage)
+            and last_message.name == current_editor_name
+        ):
+            if get_message_text(last_message).endswith(
                 "Thank you so much for your help!"
             ):
-                return "next_editor"
-
-            return "next_editor"
+                return "end"
+            return "answer_question"
 
     # If we're just starting, ask a question
     return "ask_question"
@@ -0,0 +1,119 @@
+"""Objects shared by the editor interviews of one run.
+
+The interviews of a run share a `QuestionIndex`, so near-duplicate questions
+search only once, a `PageFetcher`, so every search uses one connection pool,
+and a cap on the number of interviews held at once. None of them can be
+checkpointed, so they are kept out of the state and the config. Each run of
+the interview graph gets an `InterviewSession` instead, registered under the
+run's checkpoint namespace, which every node below it shares as a prefix.
+Sessions are created by the first node that needs one, so a run resumed from
+a checkpoint by another process gets a new one, and are closed by the last
+node of the interview graph.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.constants import CONFIG_KEY_CHECKPOINT_NS, NS_END, NS_SEP
+
+from web_research_graph.configuration import Configuration
+from web_research_graph.page_fetch import PageFetcher
+from web_research_graph.question_index import QuestionIndex, question_shingles
+
+# Nodes of the interview graph, whose namespace starts a session
+SESSION_NODES = frozenset({"initialize", "interview_editor", "end_interviews"})
+
+# Sessions of failed runs are never closed, so only the latest are kept
+MAX_SESSIONS = 256
+
+
+@dataclass
+class InterviewSession:
+    """What the interviews of one run share."""
+
+    interviews: asyncio.Semaphore
+    question_index: Optional[QuestionIndex[Any]] = None
+    page_fetcher: Optional[PageFetcher] = None
+    # Editors holding one of the interview slots
+    active: set[int] = field(default_factory=set)
+
+    @classmethod
+    def from_config(
+        cls, config: Optional[RunnableConfig], topic: str
+    ) -> InterviewSession:
+        """Create the session of a run from its configuration."""
+        configuration = Configuration.from_runnable_config(config)
+        session = cls(
+            asyncio.Semaphore(max(1, configuration.max_concurrent_interviews))
+        )
+        if configuration.dedup_questions:
+            session.question_index = QuestionIndex(
+                configuration.question_similarity_threshold,
+                ignore=question_shingles(topic),
+            )
+        if configuration.fetch_pages:
+            session.page_fetcher = PageFetcher(
+                max_connections=configuration.fetch_max_connections,
+                max_per_host=configuration.fetch_max_per_host,
+                max_bytes=configuration.fetch_max_bytes,
+                timeout=configuration.fetch_timeout,
+                max_passages=configuration.passages_per_page,
+                passage_max_tokens=configuration.passage_max_tokens,
+                allow_private=configuration.fetch_private_hosts,
+            )
+        return session
+
+    async def aclose(self) -> None:
+        """Close the connections of the page fetcher."""
+        if self.page_fetcher is not None:
+            await self.page_fetcher.aclose()
+
+
+_SESSIONS: OrderedDict[tuple[str, str], InterviewSession] = OrderedDict()
+_SESSIONS_LOCK = threading.Lock()
+
+
+def session_key(config: Optional[RunnableConfig]) -> Optional[tuple[str, str]]:
+    """Return the key of the interview run a node belongs to, if any."""
+    configurable = (config or {}).get("configurable") or {}
+    parts = str(configurable.get(CONFIG_KEY_CHECKPOINT_NS, "")).split(NS_SEP)
+    for depth, part in enumerate(parts):
+        if part.split(NS_END, 1)[0] in SESSION_NODES:
+            thread = str(configurable.get("thread_id", ""))
+            return thread, NS_SEP.join(parts[:depth])
+    return None
+
+
+def get_session(
+    config: Optional[RunnableConfig], topic: str = ""
+) -> Optional[InterviewSession]:
+    """Return the session of the interview run, creating it if needed.
+
+    Returns:
+        None when the node does not run under the interview graph.
+    """
+    key = session_key(config)
+    if key is None:
+        return None
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.get(key)
+        if session is None:
+            session = _SESSIONS[key] = InterviewSession.from_config(config, topic)
+            while len(_SESSIONS) > MAX_SESSIONS:
+                _SESSIONS.popitem(last=False)
+        return session
+
+
+async def close_session(config: Optional[RunnableConfig]) -> None:
+    """Close and forget the session of the interview run."""
+    key = session_key(config)
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.pop(key, None) if key is not None else None
+    if session is not None:
+        await session.aclose()
@@ -0,0 +1,70 @@
+"""An incremental in-memory BM25 index."""
+
+from __future__ import annotations
+
+import heapq
+import math
+from collections import Counter, defaultdict
+from typing import Optional
+
+from web_research_graph.text import content_terms
+
+
+class BM25Index:
+    """A BM25 index that documents can be appended to at any time."""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75) -> None:
+        """Create an empty index with the given BM25 parameters."""
+        self.k1 = k1
+        self.b = b
+        self._postings: defaultdict[str, dict[int, int]] = defaultdict(dict)
+        self._lengths: dict[int, int] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        """Return the number of indexed documents."""
+        return len(self._lengths)
+
+    def add(self, doc_id: int, text: str) -> None:
+        """Index a document under `doc_id`."""
+        if doc_id in self._lengths:
+            raise ValueError(f"Document {doc_id} is already indexed")
+        terms = content_terms(text)
+        for term, count in Counter(terms).items():
+            self._postings[term][doc_id] = count
+        self._lengths[doc_id] = len(terms)
+        self._total_length += len(terms)
+
+    def search(
+        self, query: str, k: int, max_id: Optional[int] = None
+    ) -> list[tuple[int, float]]:
+        """Return the `k` best (doc_id, score) pairs for the query.
+
+        Args:
+            query (str): The query text.
+            k (int): The maximum number of results.
+            max_id (Optional[int]): Ignore documents with a larger ID.
+        """
+        if not self._lengths or k <= 0:
+            return []
+        total = len(self._lengths)
+        average_length = self._total_length / total or 1.0
+        scores: defaultdict[int, float] = defaultdict(float)
+        for term in set(content_terms(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, frequency in postings.items():
+                if max_id is not None and doc_id > max_id:
+                    continue
+                length_norm = (
+                    1 - self.b + self.b * self._lengths[doc_id] / average_length
+                )
+                scores[doc_id] += (
+                    idf
+                    * frequency
+                    * (self.k1 + 1)
+                    / (frequency + self.k1 * length_norm)
+                )
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
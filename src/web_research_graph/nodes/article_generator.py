@@ -1,50 +1,146 @@
 """Node for generating the full Wikipedia article."""
 
-from typing import Optional, cast
+import asyncio
+import sqlite3
+import warnings
+from collections.abc import Awaitable, Iterable, Mapping, Sequence
+from typing import Any, Optional, TypeVar
 
-from langchain_community.vectorstores import InMemoryVectorStore
 from langchain_core.documents import Document
 from langchain_core.output_parsers import StrOutputParser
-from langchain_core.runnables import RunnableConfig
-from langchain_core.vectorstores import VectorStoreRetriever
-from langchain_ollama import OllamaEmbeddings
+from langchain_core.runnables import Runnable, RunnableConfig, RunnableLambda
+from langgraph.types import StreamWriter
 
+from web_research_graph.article_assembly import (
+    assemble_article,
+    closing_paragraph,
+    renumber_citations,
+    replace_opening,
+    split_opening,
+)
 from web_research_graph.configuration import Configuration
-from web_research_graph.prompts import ARTICLE_WRITER_PROMPT, SECTION_WRITER_PROMPT
+from web_research_graph.embeddings import load_embeddings
+from web_research_graph.fts_index import FTSIndex, HybridIndex, Retriever
+from web_research_graph.prompts import (
+    ARTICLE_WRITER_PROMPT,
+    LEAD_WRITER_PROMPT,
+    SECTION_WRITER_PROMPT,
+    TRANSITION_PROMPT,
+)
+from web_research_graph.references import page_url
 from web_research_graph.state import Section, State
 from web_research_graph.utils import dict_to_section, load_chat_model
+from web_research_graph.vector_index import VectorIndex
+
+T = TypeVar("T")
+
+
+def _ignore_stream(chunk: Any) -> None:
+    """Drop stream events when the node runs outside of a streaming graph."""
+
+
+async def _gather_or_cancel(awaitables: Iterable[Awaitable[T]]) -> list[T]:
+    """Await everything in order, cancelling the rest as soon as one fails."""
+    tasks = [asyncio.ensure_future(awaitable) for awaitable in awaitables]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    for task in tasks:
+        error = None if task.cancelled() else task.exception()
+        if error is not None:
+            raise error
+    return [task.result() for task in tasks]
+
+
+def _as_section(result: Any) -> Section:
+    """Check the structured output of the section writer."""
+    if isinstance(result, dict):
+        return dict_to_section(result)
+    if not isinstance(result, Section):
+        raise TypeError(f"Unexpected return type: {type(result)}")
+    return result
 
 
 async def create_retriever(
-    references: Optional[dict[str, str]],
-) -> VectorStoreRetriever:
-    """Create a retriever from the reference documents."""
-    embeddings = OllamaEmbeddings(model="mxbai-embed-large")
+    references: Optional[Mapping[str, str]],
+    config: Optional[RunnableConfig] = None,
+) -> Retriever:
+    """Create an index of the reference documents for the configured backend.
+
+    Reference embeddings are cached, so only new snippets reach the model.
+    Passages of a fetched page are cited as the page itself.
+    """
+    configuration = Configuration.from_runnable_config(config)
     reference_docs = [
-        Document(page_content=content, metadata={"source": source})
-        for source, content in references.items()
+        Document(page_content=content, metadata={"source": page_url(source)})
+        for source, content in (references or {}).items()
     ]
+    backend = configuration.retrieval_backend
+    if backend == "bm25":
+        return FTSIndex(reference_docs)
+    if backend == "vector":
+        return await VectorIndex.afrom_documents(
+            reference_docs, load_embeddings(configuration)
+        )
+    if backend != "hybrid":
+        raise ValueError(f"Unknown retrieval backend: {backend!r}")
+
+    embeddings = load_embeddings(configuration)
+    try:
+        lexical = FTSIndex(reference_docs)
+    except sqlite3.OperationalError as error:
+        warnings.warn(
+            f"SQLite full-text search is unavailable, retrieving with embeddings "
+            f"only: {error!r}",
+            RuntimeWarning,
+            stacklevel=2,
+        )
+        return await VectorIndex.afrom_documents(reference_docs, embeddings)
+    try:
+        vector: Optional[VectorIndex] = await VectorIndex.afrom_documents(
+            reference_docs, embeddings
+        )
+    except Exception as error:
+        warnings.warn(
+            f"Embedding the references failed, retrieving with BM25 only: {error!r}",
+            RuntimeWarning,
+            stacklevel=2,
+        )
+        vector = None
+    return HybridIndex(lexical, vector, configuration.retrieval_rrf_k)
+
 
-    vectorstore = InMemoryVectorStore.from_documents(
-        reference_docs,
-        embedding=embeddings,
+async def retrieve_section_docs(
+    index: Retriever,
+    topic: str,
+    section_titles: list[str],
+    config: Optional[RunnableConfig] = None,
+) -> list[list[Document]]:
+    """Retrieve the relevant documents for every section in one batch."""
+    configuration = Configuration.from_runnable_config(config)
+    return await index.abatch_search(
+        [f"{topic}: {section_title}" for section_title in section_titles],
+        k=configuration.retrieval_k,
+        mmr=configuration.retrieval_mmr,
+        fetch_k=configuration.retrieval_fetch_k,
+        lambda_mult=configuration.retrieval_mmr_lambda,
     )
-    return vectorstore.as_retriever(k=3)
 
 
 async def generate_section(
     outline_str: str,
     section_title: str,
-    topic: str,
-    retriever: VectorStoreRetriever,
+    docs: list[Document],
     config: Optional[RunnableConfig] = None,
 ) -> Section:
     """Generate a single section of the article."""
     # Get configuration
     configuration = Configuration.from_runnable_config(config)
 
-    # Retrieve relevant documents
-    docs = await retriever.ainvoke(f"{topic}: {section_title}")
+    # Format the retrieved documents
     formatted_docs = "\n".join(
         f'<Document href="{doc.metadata["source"]}"/>\n{doc.page_content}\n</Document>'
         for doc in docs
@@ -52,63 +148,231 @@ async def generate_section(
 
     # Create the chain
     model = load_chat_model(configuration.long_context_model, max_tokens=2000)
-    chain = (SECTION_WRITER_PROMPT | model.with_structured_output(Section)).with_config(
-        config
+    # Malformed output is retried like any other failure
+    chain = (
+        (
+            SECTION_WRITER_PROMPT
+            | model.with_structured_output(Section)
+            | RunnableLambda(_as_section)
+        )
+        .with_retry(stop_after_attempt=max(1, configuration.section_max_attempts))
+        .with_config(config)
     )
 
     # Generate the section
-    result = await chain.ainvoke(
+    return await chain.ainvoke(
         {
             "outline": outline_str,
             "section": section_title,
             "docs": formatted_docs,
         }
     )
-    assert isinstance(result, Section), f"Unexpected return type: {type(result)}"
-    return result
+
+
+async def _stream_text(
+    chain: Runnable[dict[str, Any], str],
+    inputs: dict[str, Any],
+    writer: StreamWriter,
+    strip: bool = False,
+) -> str:
+    """Run a text chain, streaming its tokens as article tokens.
+
+    With `strip`, the streamed tokens add up to the stripped text: leading
+    whitespace is dropped and trailing whitespace is held back until more
+    text follows it.
+    """
+    chunks: list[str] = []
+    started = not strip
+    pending = ""
+    async for chunk in chain.astream(inputs):
+        chunks.append(chunk)
+        if strip:
+            text = pending + chunk
+            if not started:
+                text = text.lstrip()
+                started = bool(text)
+            chunk = text.rstrip()
+            pending = text[len(chunk) :]
+        if chunk:
+            writer({"type": "article_token", "content": chunk})
+    return "".join(chunks)
+
+
+async def rewrite_article(
+    topic: str,
+    sections: Sequence[Section],
+    config: Optional[RunnableConfig] = None,
+    writer: StreamWriter = _ignore_stream,
+) -> str:
+    """Rewrite the section drafts into the final article in a single pass."""
+    configuration = Configuration.from_runnable_config(config)
+
+    # Format all sections for final article generation
+    draft = "\n\n".join(section.as_str for section in sections)
+
+    # Create the chain for generating the final article
+    model = load_chat_model(configuration.long_context_model, max_tokens=4000)
+    chain = (ARTICLE_WRITER_PROMPT | model | StrOutputParser()).with_config(config)
+
+    # Generate the final article, streaming its tokens as they arrive
+    return await _stream_text(chain, {"draft": draft, "topic": topic}, writer)
+
+
+async def smooth_transitions(
+    topic: str,
+    sections: Sequence[Section],
+    config: Optional[RunnableConfig] = None,
+) -> list[Section]:
+    """Rewrite the opening paragraph of every section after the first.
+
+    Each boundary is rewritten independently from the closing paragraph of the
+    previous section, so the boundaries run in parallel.
+    """
+    configuration = Configuration.from_runnable_config(config)
+    model = load_chat_model(configuration.fast_llm_model, max_tokens=500)
+    chain = (TRANSITION_PROMPT | model | StrOutputParser()).with_config(config)
+    semaphore = asyncio.Semaphore(max(1, configuration.max_concurrent_sections))
+
+    async def _smooth(previous: Section, section: Section) -> Section:
+        opening, _ = split_opening(section.description)
+        if not opening:
+            return section
+        async with semaphore:
+            rewritten = await chain.ainvoke(
+                {
+                    "topic": topic,
+                    "previous": closing_paragraph(previous),
+                    "section": section.section_title,
+                    "opening": opening,
+                }
+            )
+        return replace_opening(section, rewritten) if rewritten.strip() else section
+
+    smoothed = await asyncio.gather(
+        *(
+            _smooth(previous, section)
+            for previous, section in zip(sections, sections[1:])
+        )
+    )
+    return [*sections[:1], *smoothed]
+
+
+async def assemble_sections(
+    title: str,
+    topic: str,
+    sections: Sequence[Section],
+    config: Optional[RunnableConfig] = None,
+    writer: StreamWriter = _ignore_stream,
+) -> str:
+    """Assemble the article from the sections without rewriting them.
+
+    Citations are renumbered across the article and only a short lead is
+    generated. With the 'boundaries' strategy the section openings are also
+    smoothed, concurrently with the lead.
+    """
+    configuration = Configuration.from_runnable_config(config)
+    sections, citations = renumber_citations(sections)
+
+    transitions = None
+    if configuration.article_assembly == "boundaries":
+        transitions = asyncio.ensure_future(smooth_transitions(topic, sections, config))
+
+    # Stream the title and lead while the transitions are rewritten
+    header = f"# {title}\n\n"
+    writer({"type": "article_token", "content": header})
+    model = load_chat_model(configuration.long_context_model, max_tokens=1000)
+    chain = (LEAD_WRITER_PROMPT | model | StrOutputParser()).with_config(config)
+    lead = await _stream_text(
+        chain,
+        {"topic": topic, "sections": "\n\n".join(s.as_str for s in sections)},
+        writer,
+        strip=True,
+    )
+
+    if transitions is not None:
+        sections = await transitions
+    article = assemble_article(title, lead, sections, citations)
+    # The article starts with the header and stripped lead already streamed
+    writer(
+        {"type": "article_token", "content": article[len(header) + len(lead.strip()) :]}
+    )
+    return article
 
 
 async def generate_article(
-    state: State, config: Optional[RunnableConfig] = None
+    state: State,
+    config: Optional[RunnableConfig] = None,
+    writer: StreamWriter = _ignore_stream,
 ) -> State:
-    """Generate the complete Wikipedia article."""
+    """Generate the complete Wikipedia article.
+
+    When the graph is streamed with `stream_mode="custom"`, every section is
+    emitted as a `{"type": "section", ...}` event as soon as it is written, and
+    the final article as `{"type": "article_token", ...}` events.
+    """
     if not state.outline:
         raise ValueError("No outline found in state")
 
     # Convert dictionary outline to Outline object if needed
     current_outline = state.outline
 
-    # Create retriever from references in state
-    retriever = cast(
-        VectorStoreRetriever,
-        (await create_retriever(state.references)).with_config(config),
-    )
-
-    # Generate each section in parallel
-    sections = []
-    for section in current_outline.sections:
-        section_content = await generate_section(
-            current_outline.as_str,
-            section.section_title,
+    # Index the references and retrieve documents for every section at once
+    index = await create_retriever(state.references, config)
+    try:
+        section_docs = await retrieve_section_docs(
+            index,
             current_outline.page_title,
-            retriever,
+            [section.section_title for section in current_outline.sections],
             config,
         )
-        # Convert dictionary to Section object if needed
-        if isinstance(section_content, dict):
-            section_content = dict_to_section(section_content)
-        sections.append(section_content)
-
-    # Format all sections for final article generation
-    draft = "\n\n".join(section.as_str for section in sections)
+    finally:
+        index.close()
 
-    # Create the chain for generating the final article
+    # Generate each section in parallel, keeping the outline order
     configuration = Configuration.from_runnable_config(config)
-    model = load_chat_model(configuration.long_context_model, max_tokens=4000)
-    chain = (ARTICLE_WRITER_PROMPT | model | StrOutputParser()).with_config(config)
+    semaphore = asyncio.Semaphore(max(1, configuration.max_concurrent_sections))
 
-    # Generate the final article
-    final_article = await chain.ainvoke({"draft": draft, "topic": state.topic.topic})
+    async def _generate(index: int, section: Section, docs: list[Document]) -> Section:
+        async with semaphore:
+            section_content = await generate_section(
+                current_outline.as_str,
+                section.section_title,
+                docs,
+                config,
+            )
+        # Send the finished section to the client right away
+        writer(
+            {
+                "type": "section",
+                "index": index,
+                "title": section_content.section_title,
+                "markdown": section_content.as_str,
+            }
+        )
+        return section_content
+
+    # Without the other sections the article is lost, so stop writing them
+    sections = await _gather_or_cancel(
+        (
+            _generate(index, section, docs)
+            for index, (section, docs) in enumerate(
+                zip(current_outline.sections, section_docs)
+            )
+        )
+    )
+
+    if configuration.article_assembly == "rewrite":
+        final_article = await rewrite_article(
+            state.topic.topic or current_outline.page_title, sections, config, writer
+        )
+    else:
+        final_article = await assemble_sections(
+            current_outline.page_title,
+            state.topic.topic or current_outline.page_title,
+            sections,
+            config,
+            writer,
+        )
 
     # Update state with the generated article
     return {
@@ -4,24 +4,27 @@ from langchain_core.runnables import RunnableConfig
 
 from web_research_graph.configuration import Configuration
 from web_research_graph.prompts import OUTLINE_PROMPT
+from web_research_graph.response_cache import ainvoke_structured
 from web_research_graph.state import Outline, State
-from web_research_graph.utils import load_chat_model
 
 
 async def generate_outline(state: State, config: RunnableConfig) -> State:
     """Generate a Wikipedia-style outline for a given topic."""
     configuration = Configuration.from_runnable_config(config)
-    model = load_chat_model(configuration.tool_model)
 
     # Use the validated topic from state
     if not state.topic.is_valid or not state.topic.topic:
         raise ValueError("No valid topic found in state")
 
-    # Create the chain for outline generation with structured output
-    chain = (OUTLINE_PROMPT | model.with_structured_output(Outline)).with_config(config)
-
     # Generate the outline using the validated topic
-    response = await chain.ainvoke({"topic": state.topic.topic})
+    response = await ainvoke_structured(
+        OUTLINE_PROMPT,
+        {"topic": state.topic.topic},
+        Outline,
+        configuration.tool_model,
+        config,
+        cache_enabled=configuration.cache_outline,
+    )
 
     return {
         "outline": response,
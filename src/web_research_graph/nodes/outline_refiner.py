@@ -7,6 +7,7 @@ from langchain_core.runnables import RunnableConfig
 from web_research_graph.configuration import Configuration
 from web_research_graph.prompts import REFINE_OUTLINE_PROMPT
 from web_research_graph.state import Outline, State
+from web_research_graph.token_budget import fit_messages
 from web_research_graph.utils import get_message_text, load_chat_model
 
 
@@ -22,9 +23,14 @@ async def refine_outline(
 
     current_outline = state.outline
 
-    # Format conversations from the state's messages
+    # Format conversations from the state's messages, within the token budget
+    messages = fit_messages(
+        state.messages,
+        configuration.refine_conversations_max_tokens,
+        configuration.tool_model,
+    )
     conversations = "\n\n".join(
-        f"### {m.name}\n\n{get_message_text(m)}" for m in state.messages
+        f"### {m.name}\n\n{get_message_text(m)}" for m in messages
     )
 
     # Create the chain with structured output
@@ -0,0 +1,352 @@
+"""Fetch the full pages behind search results and split them into passages.
+
+Search results only carry a snippet of a couple of sentences. When page
+fetching is enabled, every run gets a `PageFetcher`: one pooled HTTP client
+whose downloads are streamed, capped in size and limited per host, so a slow or
+huge page cannot stall the other searches. Parsing HTML is CPU-bound, so text
+is extracted in a process pool instead of on the event loop. Each page is
+fetched once per run, however many questions lead to it.
+
+Search results and their redirects are untrusted URLs, so by default only
+http(s) pages on public addresses are fetched: a result pointing at a private,
+loopback or link-local address, such as a cloud metadata service, is blocked.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+import ipaddress
+import multiprocessing
+import os
+import socket
+import threading
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from html.parser import HTMLParser
+from typing import Any, Optional
+from urllib.parse import urlsplit
+
+import httpx
+from opentelemetry import metrics
+
+from web_research_graph.lexical_index import BM25Index
+from web_research_graph.text import split_passages
+
+USER_AGENT = "Mozilla/5.0 (compatible; web-research-graph)"
+
+MAX_EXTRACT_WORKERS = min(4, os.cpu_count() or 1)
+_extract_executor: Optional[ProcessPoolExecutor] = None
+_extract_executor_lock = threading.Lock()
+
+_page_fetches = metrics.get_meter(__name__).create_counter(
+    "web_research.pages.fetched",
+    unit="{page}",
+    description="Page fetches by outcome",
+)
+
+# Elements whose text is never part of the page content
+_SKIPPED_TAGS = frozenset(
+    "script style noscript template svg canvas iframe nav header footer aside "
+    "form button select head".split()
+)
+# Elements that start a new paragraph
+_BLOCK_TAGS = frozenset(
+    "p div section article main li ul ol dl dt dd table tr td th blockquote pre "
+    "h1 h2 h3 h4 h5 h6 br hr figure figcaption".split()
+)
+_VOID_TAGS = frozenset(
+    "br hr img input meta link area base col embed source wbr".split()
+)
+
+
+class _TextExtractor(HTMLParser):
+    """Collect the visible text of a page, preferring its main content."""
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.stack: list[str] = []
+        self.skipping = 0
+        self.main_depth = 0
+        self.text: list[str] = []
+        self.main_text: list[str] = []
+
+    def handle_starttag(self, tag: str, attrs: Any) -> None:
+        if tag in _BLOCK_TAGS:
+            self._append("\n\n")
+        if tag in _VOID_TAGS:
+            return
+        self.stack.append(tag)
+        if tag in _SKIPPED_TAGS:
+            self.skipping += 1
+        elif tag in ("main", "article"):
+            self.main_depth += 1
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag not in self.stack:
+            return
+        # Close the elements left open inside this one, as browsers do
+        while self.stack:
+            open_tag = self.stack.pop()
+            if open_tag in _SKIPPED_TAGS:
+                self.skipping -= 1
+            elif open_tag in ("main", "article"):
+                self.main_depth -= 1
+            if open_tag == tag:
+                break
+        if tag in _BLOCK_TAGS:
+            self._append("\n\n")
+
+    def handle_data(self, data: str) -> None:
+        if not self.skipping:
+            self._append(data)
+
+    def _append(self, text: str) -> None:
+        self.text.append(text)
+        if self.main_depth:
+            self.main_text.append(text)
+
+
+def _clean(parts: list[str]) -> str:
+    paragraphs = (" ".join(p.split()) for p in "".join(parts).split("\n\n"))
+    return "\n\n".join(p for p in paragraphs if p)
+
+
+def html_to_text(html: str) -> str:
+    """Return the readable text of an HTML page, one paragraph per block.
+
+    Scripts, styles and navigation are dropped. When the page marks its main
+    content with `<main>` or `<article>`, only that content is kept.
+    """
+    parser = _TextExtractor()
+    parser.feed(html)
+    parser.close()
+    main = _clean(parser.main_text)
+    return main or _clean(parser.text)
+
+
+def extract_passages(
+    body: str, is_html: bool, query: str, max_passages: int, max_tokens: int
+) -> list[tuple[int, str]]:
+    """Extract the passages of a page most relevant to a query, in page order.
+
+    Runs in a worker process, so it only takes and returns plain values.
+
+    Returns:
+        Each passage with its number in the page, counting from 1. The number
+        does not depend on the query, so it identifies the passage.
+    """
+    passages = split_passages(html_to_text(body) if is_html else body, max_tokens)
+    if len(passages) <= max_passages:
+        return list(enumerate(passages, start=1))
+    index = BM25Index()
+    for number, passage in enumerate(passages):
+        index.add(number, passage)
+    best = {number for number, _ in index.search(query, max_passages)}
+    # Pad with the opening passages, which usually summarize the page
+    for number in range(len(passages)):
+        if len(best) >= max_passages:
+            break
+        best.add(number)
+    return [(number + 1, passages[number]) for number in sorted(best)]
+
+
+class BlockedURLError(ValueError):
+    """Raised when a URL may not be fetched, as it is not a public web page."""
+
+
+def is_public_address(address: str) -> bool:
+    """Return whether an IP address is a public unicast address."""
+    ip = ipaddress.ip_address(address)
+    return ip.is_global and not ip.is_multicast
+
+
+async def check_public_url(url: str) -> None:
+    """Check that a URL is an http(s) URL whose host only resolves publicly.
+
+    Raises:
+        BlockedURLError: If the URL has another scheme, or its host is or
+            resolves to a private, loopback, link-local or reserved address.
+    """
+    parts = urlsplit(url)
+    host = parts.hostname
+    if parts.scheme not in ("http", "https") or not host:
+        raise BlockedURLError(f"Not an http(s) URL: {url}")
+    try:
+        addresses = [str(ipaddress.ip_address(host))]
+    except ValueError:
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        infos = await asyncio.get_running_loop().getaddrinfo(
+            host, port, type=socket.SOCK_STREAM
+        )
+        addresses = [str(info[4][0]) for info in infos]
+    if not all(is_public_address(address) for address in addresses):
+        raise BlockedURLError(f"Not a public address: {url}")
+
+
+def get_extract_executor() -> ProcessPoolExecutor:
+    """Return the process pool shared by every run for text extraction."""
+    global _extract_executor
+    with _extract_executor_lock:
+        if _extract_executor is None:
+            # Forking a process that runs threads can deadlock the children
+            _extract_executor = ProcessPoolExecutor(
+                max_workers=MAX_EXTRACT_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _extract_executor
+
+
+def shutdown_extract_executor() -> None:
+    """Stop the worker processes of the text extraction pool, if started.
+
+    Runs at exit. A later extraction starts a new pool.
+    """
+    global _extract_executor
+    with _extract_executor_lock:
+        executor, _extract_executor = _extract_executor, None
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+atexit.register(shutdown_extract_executor)
+
+
+class PageFetcher:
+    """A pooled HTTP client that fetches pages and splits them into passages.
+
+    Use it as an async context manager, so its connections are closed.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 16,
+        max_per_host: int = 2,
+        max_bytes: int = 2_000_000,
+        timeout: float = 10.0,
+        max_passages: int = 6,
+        passage_max_tokens: int = 200,
+        allow_private: bool = False,
+    ) -> None:
+        """Create a fetcher.
+
+        Args:
+            max_connections (int): The maximum number of open connections.
+            max_per_host (int): The maximum number of concurrent requests to
+                a single host.
+            max_bytes (int): Pages are cut off after this many bytes.
+            timeout (float): The maximum number of seconds spent on a page.
+            max_passages (int): The maximum number of passages kept per page.
+            passage_max_tokens (int): The token budget of a single passage.
+            allow_private (bool): Whether pages on private, loopback and
+                link-local addresses may be fetched.
+        """
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.max_passages = max_passages
+        self.passage_max_tokens = passage_max_tokens
+        self.allow_private = allow_private
+        self.client = httpx.AsyncClient(
+            follow_redirects=True,
+            # Runs before every request, including each redirect
+            event_hooks={"request": [self._check_request]},
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            headers={"User-Agent": USER_AGENT},
+        )
+        self._hosts: defaultdict[str, asyncio.Semaphore] = defaultdict(
+            lambda: asyncio.Semaphore(self.max_per_host)
+        )
+        self._pages: dict[str, asyncio.Future[Optional[tuple[str, bool]]]] = {}
+
+    async def __aenter__(self) -> PageFetcher:
+        """Return the fetcher."""
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        """Close the connections."""
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the connections."""
+        await self.client.aclose()
+
+    async def _check_request(self, request: httpx.Request) -> None:
+        """Refuse requests to addresses that are not public."""
+        if not self.allow_private:
+            await check_public_url(str(request.url))
+
+    async def _download(self, url: str) -> Optional[tuple[str, bool]]:
+        """Download a page, returning its text and whether it is HTML."""
+        async with self._hosts[urlsplit(url).netloc.lower()]:
+            async with self.client.stream("GET", url) as response:
+                content_type = response.headers.get("content-type", "").lower()
+                is_html = "html" in content_type
+                if response.status_code != 200 or not (
+                    is_html or content_type.startswith("text/plain")
+                ):
+                    _page_fetches.add(1, {"outcome": "skipped"})
+                    return None
+                body = bytearray()
+                async for chunk in response.aiter_bytes():
+                    body += chunk
+                    if len(body) >= self.max_bytes:
+                        # Keep the beginning of a huge page rather than nothing
+                        del body[self.max_bytes :]
+                        _page_fetches.add(1, {"outcome": "truncated"})
+                        break
+                else:
+                    _page_fetches.add(1, {"outcome": "fetched"})
+                encoding = response.encoding or "utf-8"
+        return body.decode(encoding, errors="replace"), is_html
+
+    async def _fetch_once(self, url: str) -> Optional[tuple[str, bool]]:
+        """Download a page, recording a failure once for all its callers."""
+        try:
+            return await asyncio.wait_for(self._download(url), self.timeout)
+        except BlockedURLError:
+            _page_fetches.add(1, {"outcome": "blocked"})
+            return None
+        except (
+            httpx.HTTPError,
+            asyncio.TimeoutError,
+            OSError,
+            UnicodeDecodeError,
+            LookupError,
+        ):
+            _page_fetches.add(1, {"outcome": "failed"})
+            return None
+
+    async def fetch(self, url: str) -> Optional[tuple[str, bool]]:
+        """Fetch a page once per fetcher, or return None if it is unavailable.
+
+        Returns:
+            The text of the page and whether it is HTML.
+        """
+        if urlsplit(url).scheme not in ("http", "https"):
+            return None
+        page = self._pages.get(url)
+        if page is None:
+            page = self._pages[url] = asyncio.ensure_future(self._fetch_once(url))
+        return await asyncio.shield(page)
+
+    async def fetch_passages(self, url: str, query: str = "") -> list[tuple[int, str]]:
+        """Return the numbered passages of a page most relevant to a query."""
+        page = await self.fetch(url)
+        if page is None:
+            return []
+        body, is_html = page
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            get_extract_executor(),
+            extract_passages,
+            body,
+            is_html,
+            query,
+            self.max_passages,
+            self.passage_max_tokens,
+        )
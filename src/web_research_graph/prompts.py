@@ -156,6 +156,35 @@ Strictly follow Wikipedia format guidelines.""",
     ]
 )
 
+LEAD_WRITER_PROMPT = ChatPromptTemplate.from_messages(
+    [
+        (
+            "system",
+            """You are an expert Wikipedia author. Write the lead section of the wiki article on {topic}.
+The article has the following sections:\n\n{sections}\n\n
+The lead must summarize the most important points of the article in one to three paragraphs.
+Do not add headings, citations or facts that are not in the sections.""",
+        ),
+        ("user", "Write the lead section of the article in markdown."),
+    ]
+)
+
+TRANSITION_PROMPT = ChatPromptTemplate.from_messages(
+    [
+        (
+            "system",
+            """You are an expert Wikipedia editor polishing the wiki article on {topic}.
+The previous section ends with:\n\n{previous}\n\n
+The next section, {section}, opens with:\n\n{opening}""",
+        ),
+        (
+            "user",
+            "Rewrite only the opening paragraph of the next section so it follows on naturally from the previous one."
+            ' Keep every fact and every citation marker such as "[1]". Output ONLY the rewritten paragraph.',
+        ),
+    ]
+)
+
 OUTLINE_PROMPT = ChatPromptTemplate.from_messages(
     [
         (
@@ -0,0 +1,154 @@
+"""Reuse the search results of near-duplicate interview questions.
+
+Editors interviewed in the same run often ask nearly the same question. A
+`QuestionIndex` is created for each run and keeps a MinHash signature of every
+question that was searched, bucketed with locality-sensitive hashing. A new
+question whose estimated Jaccard similarity to an indexed one reaches the
+threshold reuses that question's search, even while it is still in flight.
+Terms of the topic itself are ignored, since every question shares them.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import random
+from collections import defaultdict
+from collections.abc import Awaitable, Iterable
+from dataclasses import dataclass
+from typing import Callable, Generic, Optional, TypeVar
+
+from web_research_graph.text import content_terms
+
+T = TypeVar("T")
+
+NUM_PERMUTATIONS = 64
+BANDS = 16
+_PRIME = (1 << 61) - 1
+_rng = random.Random(20240229)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME))
+    for _ in range(NUM_PERMUTATIONS)
+]
+
+
+def question_shingles(text: str, ignore: Iterable[str] = ()) -> frozenset[str]:
+    """Return the normalized terms of a question, without the ignored ones."""
+    terms = {term.removesuffix("'s") for term in content_terms(text)}
+    return frozenset(terms - set(ignore))
+
+
+def minhash(shingles: Iterable[str]) -> tuple[int, ...]:
+    """Return the MinHash signature of a non-empty set of shingles."""
+    hashes = [
+        int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "big")
+        for s in shingles
+    ]
+    return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS)
+
+
+def estimated_similarity(left: tuple[int, ...], right: tuple[int, ...]) -> float:
+    """Estimate the Jaccard similarity of two sets from their signatures."""
+    return sum(a == b for a, b in zip(left, right)) / len(left)
+
+
+@dataclass
+class _Entry(Generic[T]):
+    question: str
+    signature: tuple[int, ...]
+    task: asyncio.Future[T]
+
+
+class QuestionIndex(Generic[T]):
+    """A per-run index of searched questions and their results."""
+
+    def __init__(self, threshold: float = 0.7, ignore: Iterable[str] = ()) -> None:
+        """Create an empty index.
+
+        Args:
+            threshold (float): The similarity from which a question reuses the
+                results of an indexed one.
+            ignore (Iterable[str]): Terms left out of the comparison, usually
+                those of the topic.
+        """
+        self.threshold = threshold
+        self.ignore = frozenset(ignore)
+        self.searched = 0
+        self.reused = 0
+        self._entries: list[_Entry[T]] = []
+        self._buckets: defaultdict[tuple[int, tuple[int, ...]], list[_Entry[T]]] = (
+            defaultdict(list)
+        )
+
+    @property
+    def dedup_ratio(self) -> float:
+        """Return the share of questions that reused another question's search."""
+        total = self.searched + self.reused
+        return self.reused / total if total else 0.0
+
+    def _bands(self, signature: tuple[int, ...]) -> list[tuple[int, tuple[int, ...]]]:
+        rows = NUM_PERMUTATIONS // BANDS
+        return [
+            (band, signature[band * rows : (band + 1) * rows]) for band in range(BANDS)
+        ]
+
+    def find(self, question: str) -> Optional[_Entry[T]]:
+        """Return the most similar indexed question above the threshold, if any."""
+        shingles = question_shingles(question, self.ignore)
+        if not shingles:
+            return None
+        signature = minhash(shingles)
+        candidates = {
+            id(entry): entry
+            for key in self._bands(signature)
+            for entry in self._buckets.get(key, ())
+        }
+        best, best_similarity = None, self.threshold
+        for entry in candidates.values():
+            similarity = estimated_similarity(signature, entry.signature)
+            if similarity >= best_similarity:
+                best, best_similarity = entry, similarity
+        return best
+
+    def _add(self, question: str, task: asyncio.Future[T]) -> None:
+        shingles = question_shingles(question, self.ignore)
+        if not shingles:
+            return
+        entry = _Entry(question, minhash(shingles), task)
+        self._entries.append(entry)
+        for key in self._bands(entry.signature):
+            self._buckets[key].append(entry)
+
+    def _remove(self, task: asyncio.Future[T]) -> None:
+        for entry in [entry for entry in self._entries if entry.task is task]:
+            self._entries.remove(entry)
+            for key in self._bands(entry.signature):
+                self._buckets[key].remove(entry)
+
+    async def search(
+        self, question: str, run_search: Callable[[], Awaitable[T]]
+    ) -> tuple[T, bool]:
+        """Return the results of a similar question, or run the search.
+
+        Returns:
+            The results, and whether they were reused from another question.
+        """
+        entry = self.find(question)
+        if entry is not None:
+            try:
+                result = await asyncio.shield(entry.task)
+            except Exception:
+                # The other search failed, so run this one on its own
+                pass
+            else:
+                self.reused += 1
+                return result, True
+
+        self.searched += 1
+        task = asyncio.ensure_future(run_search())
+        self._add(question, task)
+        try:
+            return await asyncio.shield(task), False
+        except Exception:
+            self._remove(task)
+            raise
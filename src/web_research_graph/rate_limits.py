@@ -0,0 +1,537 @@
+"""Provider-wide rate limiting and adaptive concurrency for model calls.
+
+Every chat model returned by `load_chat_model` is wrapped in a
+`RateLimitedChatModel`, so all runs in a process share one `ProviderLimiter`
+per provider. A limiter combines:
+
+- optional token buckets for requests and tokens per minute, which space calls
+  out before the provider has to refuse them;
+- an AIMD concurrency limit: it grows by one call per round of successful calls
+  and halves when the provider answers 429, at most once per second;
+- a pause honouring the provider's `retry-after` header.
+
+Limits are configured per provider with `set_provider_limits`. The time spent
+queueing, the number of queued calls, rate limited responses and the current
+concurrency limit are recorded as OpenTelemetry metrics.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Callable, Iterator, Sequence
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Optional, Union
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models import BaseChatModel, LanguageModelInput
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+from langchain_core.runnables import Runnable
+from opentelemetry import metrics
+from pydantic import BaseModel
+
+from web_research_graph.text import count_tokens
+
+_meter = metrics.get_meter(__name__)
+_queue_wait = _meter.create_histogram(
+    "web_research.llm.queue_wait",
+    unit="s",
+    description="Time model calls waited for the provider rate limits",
+)
+_queued = _meter.create_up_down_counter(
+    "web_research.llm.queued",
+    unit="{call}",
+    description="Model calls waiting for the provider rate limits",
+)
+_rate_limited = _meter.create_counter(
+    "web_research.llm.rate_limited",
+    unit="{call}",
+    description="Model calls refused by the provider with a 429",
+)
+
+
+class TokenBucket:
+    """A thread-safe token bucket refilled continuously at a per-minute rate.
+
+    Callers reserve tokens up front and sleep for the returned delay, which
+    keeps the bucket fair between event loops and threads.
+    """
+
+    def __init__(self, per_minute: float, burst: Optional[float] = None) -> None:
+        """Create a full bucket holding at most `burst` tokens (a minute's worth)."""
+        self.rate = per_minute / 60
+        self.capacity = burst if burst is not None else per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Take `amount` tokens and return the seconds to wait before using them."""
+        with self._lock:
+            self._refill()
+            # A request larger than the bucket only has to wait for a full one
+            self._tokens -= min(amount, self.capacity)
+            return max(0.0, -self._tokens / self.rate)
+
+    def adjust(self, amount: float) -> None:
+        """Take (or give back, when negative) tokens once the real cost is known."""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens - amount)
+
+
+@dataclass
+class _Waiter:
+    wake: Callable[[], object]
+
+
+class AdaptiveConcurrency:
+    """A concurrency limit with additive increase and multiplicative decrease.
+
+    Slots are granted in FIFO order and can be shared by several event loops
+    and threads.
+    """
+
+    def __init__(
+        self,
+        initial: int = 16,
+        minimum: int = 1,
+        maximum: int = 64,
+        decrease: float = 0.5,
+        cooldown: float = 1.0,
+    ) -> None:
+        """Create a limit starting at `initial` and kept within the bounds."""
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.limit = float(min(max(initial, minimum), maximum))
+        self.in_flight = 0
+        self._waiters: deque[_Waiter] = deque()
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def queued(self) -> int:
+        """Return the number of callers waiting for a slot."""
+        return len(self._waiters)
+
+    def _grant(self) -> None:
+        """Hand free slots to waiters; the lock must be held."""
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            self.in_flight += 1
+            try:
+                waiter.wake()
+            except RuntimeError:
+                # The waiter's event loop is closed
+                self.in_flight -= 1
+
+    async def acquire(self) -> None:
+        """Wait for a free slot."""
+        with self._lock:
+            if not self._waiters and self.in_flight < int(self.limit):
+                self.in_flight += 1
+                return
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            waiter = _Waiter(lambda: loop.call_soon_threadsafe(_resolve, future))
+            self._waiters.append(waiter)
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    # The slot was granted as the wait was cancelled
+                    self.in_flight -= 1
+                    self._grant()
+            raise
+
+    def acquire_blocking(self) -> None:
+        """Wait for a free slot, blocking the calling thread."""
+        with self._lock:
+            if not self._waiters and self.in_flight < int(self.limit):
+                self.in_flight += 1
+                return
+            granted = threading.Event()
+            self._waiters.append(_Waiter(granted.set))
+        granted.wait()
+
+    def release(self, rate_limited: bool = False) -> None:
+        """Free a slot, adapting the limit to the outcome of the call."""
+        with self._lock:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if rate_limited:
+                if now - self._last_decrease >= self.cooldown:
+                    self.limit = max(self.minimum, self.limit * self.decrease)
+                    self._last_decrease = now
+            else:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._grant()
+
+
+def _resolve(future: asyncio.Future[None]) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """Return True for a provider error reporting HTTP 429."""
+    response = getattr(error, "response", None)
+    status = getattr(error, "status_code", None) or getattr(
+        response, "status_code", None
+    )
+    return status == 429 or type(error).__name__ == "RateLimitError"
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """Return the delay requested by a provider's `retry-after` headers."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms") is not None:
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if value is None:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class _Usage:
+    """The tokens a call was charged for, corrected once it finished."""
+
+    estimated: int
+    actual: Optional[int] = None
+
+
+class ProviderLimiter:
+    """The rate limits and adaptive concurrency shared by calls to one provider."""
+
+    def __init__(
+        self,
+        provider: str,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        initial_concurrency: int = 16,
+        max_concurrency: int = 64,
+    ) -> None:
+        """Create a limiter; rate limits left unset are not enforced."""
+        self.provider = provider
+        self.requests = (
+            TokenBucket(requests_per_minute) if requests_per_minute else None
+        )
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.concurrency = AdaptiveConcurrency(
+            initial=initial_concurrency, maximum=max_concurrency
+        )
+        self.paused_until = 0.0
+        self.rate_limited = 0
+        self.wait_seconds = 0.0
+        self.calls = 0
+
+    def stats(self) -> dict[str, Any]:
+        """Return a snapshot of the limiter's state and counters."""
+        return {
+            "provider": self.provider,
+            "concurrency_limit": int(self.concurrency.limit),
+            "in_flight": self.concurrency.in_flight,
+            "queued": self.concurrency.queued,
+            "calls": self.calls,
+            "rate_limited": self.rate_limited,
+            "wait_seconds": round(self.wait_seconds, 3),
+        }
+
+    def _reserve(self, tokens: int) -> float:
+        """Take a call from the buckets and return the seconds to wait."""
+        delay = self.paused_until - time.monotonic()
+        for bucket, amount in ((self.requests, 1), (self.tokens, tokens)):
+            if bucket is not None:
+                delay = max(delay, bucket.reserve(amount))
+        return delay
+
+    def _admitted(self, start: float) -> None:
+        waited = time.monotonic() - start
+        self.calls += 1
+        self.wait_seconds += waited
+        _queue_wait.record(waited, {"provider": self.provider})
+
+    def _failed(self, error: BaseException) -> None:
+        rate_limited = is_rate_limit_error(error)
+        if rate_limited:
+            self.rate_limited += 1
+            _rate_limited.add(1, {"provider": self.provider})
+            retry_after = retry_after_seconds(error)
+            if retry_after:
+                self.paused_until = max(
+                    self.paused_until, time.monotonic() + retry_after
+                )
+        self.concurrency.release(rate_limited=rate_limited)
+
+    def _succeeded(self, usage: _Usage) -> None:
+        self.concurrency.release()
+        if self.tokens is not None and usage.actual is not None:
+            self.tokens.adjust(usage.actual - usage.estimated)
+
+    @asynccontextmanager
+    async def slot(self, tokens: int) -> AsyncIterator[_Usage]:
+        """Wait until a call estimated at `tokens` tokens may be sent.
+
+        Set `actual` on the yielded usage to correct the token bucket with the
+        real cost of the call.
+        """
+        attributes = {"provider": self.provider}
+        start = time.monotonic()
+        _queued.add(1, attributes)
+        try:
+            delay = self._reserve(tokens)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await self.concurrency.acquire()
+        finally:
+            _queued.add(-1, attributes)
+        self._admitted(start)
+        usage = _Usage(tokens)
+        try:
+            yield usage
+        except BaseException as error:
+            self._failed(error)
+            raise
+        self._succeeded(usage)
+
+    @contextmanager
+    def blocking_slot(self, tokens: int) -> Iterator[_Usage]:
+        """Like `slot`, for synchronous calls: wait by blocking the thread."""
+        attributes = {"provider": self.provider}
+        start = time.monotonic()
+        _queued.add(1, attributes)
+        try:
+            delay = self._reserve(tokens)
+            if delay > 0:
+                time.sleep(delay)
+            self.concurrency.acquire_blocking()
+        finally:
+            _queued.add(-1, attributes)
+        self._admitted(start)
+        usage = _Usage(tokens)
+        try:
+            yield usage
+        except BaseException as error:
+            self._failed(error)
+            raise
+        self._succeeded(usage)
+
+
+_LIMITERS: dict[str, ProviderLimiter] = {}
+_LIMITERS_LOCK = threading.Lock()
+
+
+def get_provider_limiter(provider: str) -> ProviderLimiter:
+    """Return the process-wide limiter of a provider, creating a default one."""
+    with _LIMITERS_LOCK:
+        limiter = _LIMITERS.get(provider)
+        if limiter is None:
+            limiter = _LIMITERS[provider] = ProviderLimiter(provider)
+        return limiter
+
+
+def set_provider_limits(
+    provider: str,
+    requests_per_minute: Optional[float] = None,
+    tokens_per_minute: Optional[float] = None,
+    initial_concurrency: int = 16,
+    max_concurrency: int = 64,
+) -> ProviderLimiter:
+    """Replace the limits of a provider, such as "groq" or "anthropic".
+
+    Args:
+        provider (str): The provider part of a 'provider/model' name.
+        requests_per_minute (Optional[float]): The provider's request quota.
+        tokens_per_minute (Optional[float]): The provider's token quota.
+        initial_concurrency (int): The concurrency limit to start from.
+        max_concurrency (int): The most concurrent calls ever allowed.
+    """
+    limiter = ProviderLimiter(
+        provider,
+        requests_per_minute=requests_per_minute,
+        tokens_per_minute=tokens_per_minute,
+        initial_concurrency=initial_concurrency,
+        max_concurrency=max_concurrency,
+    )
+    with _LIMITERS_LOCK:
+        _LIMITERS[provider] = limiter
+    return limiter
+
+
+def _observe_limits(options: Any) -> Iterator[metrics.Observation]:
+    with _LIMITERS_LOCK:
+        limiters = list(_LIMITERS.values())
+    for limiter in limiters:
+        yield metrics.Observation(
+            int(limiter.concurrency.limit), {"provider": limiter.provider}
+        )
+
+
+_meter.create_observable_gauge(
+    "web_research.llm.concurrency_limit",
+    callbacks=[_observe_limits],
+    unit="{call}",
+    description="Current adaptive concurrency limit of each provider",
+)
+
+
+def _estimate_tokens(
+    messages: Sequence[BaseMessage], max_tokens: Any, provider: str
+) -> int:
+    """Estimate the prompt tokens plus the completion tokens a call may use."""
+    prompt = sum(count_tokens(str(message.content), provider) for message in messages)
+    return prompt + (max_tokens if isinstance(max_tokens, int) else 0)
+
+
+def _total_tokens(messages: Sequence[BaseMessage]) -> Optional[int]:
+    usages = [getattr(message, "usage_metadata", None) for message in messages]
+    if not any(usages):
+        return None
+    return sum(int(usage["total_tokens"]) for usage in usages if usage)
+
+
+class RateLimitedChatModel(BaseChatModel):
+    """A chat model whose calls wait for the limiter of their provider."""
+
+    model: BaseChatModel
+    provider: str
+
+    @property
+    def _llm_type(self) -> str:
+        return self.model._llm_type
+
+    @property
+    def _identifying_params(self) -> dict[str, Any]:
+        return dict(self.model._identifying_params)
+
+    def _get_ls_params(self, stop: Optional[list[str]] = None, **kwargs: Any) -> Any:
+        return self.model._get_ls_params(stop=stop, **kwargs)
+
+    def _rewrap(self, runnable: Any) -> Any:
+        """Put this model back in place of the wrapped one inside a runnable."""
+        if runnable is self.model:
+            return self
+        if isinstance(runnable, (list, tuple)):
+            return type(runnable)(self._rewrap(item) for item in runnable)
+        if isinstance(runnable, dict):
+            return {key: self._rewrap(value) for key, value in runnable.items()}
+        if not isinstance(runnable, Runnable) or not isinstance(runnable, BaseModel):
+            return runnable
+        update = {}
+        for field in type(runnable).model_fields:
+            value = getattr(runnable, field)
+            rewrapped = self._rewrap(value)
+            if rewrapped is not value:
+                update[field] = rewrapped
+        return runnable.model_copy(update=update) if update else runnable
+
+    def bind_tools(
+        self, tools: Sequence[Any], **kwargs: Any
+    ) -> Runnable[LanguageModelInput, BaseMessage]:
+        """Bind tools with the wrapped model's formatting, keeping the limits."""
+        bound: Runnable[LanguageModelInput, BaseMessage] = self._rewrap(
+            self.model.bind_tools(tools, **kwargs)
+        )
+        return bound
+
+    def with_structured_output(
+        self,
+        schema: Union[dict[str, Any], type],
+        *,
+        include_raw: bool = False,
+        **kwargs: Any,
+    ) -> Runnable[LanguageModelInput, Union[dict[str, Any], BaseModel]]:
+        """Use the wrapped model's structured output, keeping the limits."""
+        structured: Runnable[LanguageModelInput, Union[dict[str, Any], BaseModel]] = (
+            self._rewrap(
+                self.model.with_structured_output(
+                    schema, include_raw=include_raw, **kwargs
+                )
+            )
+        )
+        return structured
+
+    def _estimate(self, messages: list[BaseMessage], kwargs: dict[str, Any]) -> int:
+        return _estimate_tokens(
+            messages,
+            kwargs.get("max_tokens", getattr(self.model, "max_tokens", None)),
+            self.provider,
+        )
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        limiter = get_provider_limiter(self.provider)
+        with limiter.blocking_slot(self._estimate(messages, kwargs)) as usage:
+            result = self.model._generate(
+                messages, stop=stop, run_manager=run_manager, **kwargs
+            )
+            usage.actual = _total_tokens(
+                [generation.message for generation in result.generations]
+            )
+        return result
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        limiter = get_provider_limiter(self.provider)
+        async with limiter.slot(self._estimate(messages, kwargs)) as usage:
+            result = await self.model._agenerate(
+                messages, stop=stop, run_manager=run_manager, **kwargs
+            )
+            usage.actual = _total_tokens(
+                [generation.message for generation in result.generations]
+            )
+        return result
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        limiter = get_provider_limiter(self.provider)
+        async with limiter.slot(self._estimate(messages, kwargs)) as usage:
+            chunks: list[BaseMessage] = []
+            async for chunk in self.model._astream(
+                messages, stop=stop, run_manager=run_manager, **kwargs
+            ):
+                chunks.append(chunk.message)
+                yield chunk
+            usage.actual = _total_tokens(chunks)
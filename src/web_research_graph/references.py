@@ -0,0 +1,436 @@
+"""Append-only storage for the references gathered during research.
+
+References are deduplicated by normalized URL and by content hash, and every
+reference keeps a stable integer ID for the lifetime of a run. Stores share
+their underlying log: extending a store never copies the references gathered
+so far, which keeps state updates proportional to the new references only.
+
+By default a checkpoint holds every reference, so it can be restored by any
+process. Once a shared chunk store is set with `set_reference_chunk_store`,
+checkpoints follow the same rule as state updates: the references appended
+since the previous checkpoint are written once to the store, each chunk
+pointing to its parent, and the checkpoint itself only holds the newest chunk's
+key.
+"""
+
+from __future__ import annotations
+
+import bisect
+import hashlib
+import json
+import threading
+from collections.abc import Iterator, Mapping, Sequence
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Optional, Union
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from langgraph.channels.base import BaseChannel
+from langgraph.constants import MISSING
+from typing_extensions import Self
+
+from web_research_graph.blobs import BlobStore
+from web_research_graph.lexical_index import BM25Index
+from web_research_graph.text import count_tokens
+
+# Fragment marking a passage of a fetched page, see `passage_url`
+PASSAGE_FRAGMENT = "passage-"
+
+
+def normalize_url(url: str) -> str:
+    """Normalize a URL so trivially different links deduplicate.
+
+    Fragments are dropped, except those of page passages.
+    """
+    parts = urlsplit(url.strip())
+    if not parts.scheme or not parts.netloc:
+        return url.strip()
+    host = parts.netloc.lower().removeprefix("www.")
+    query = urlencode(
+        sorted(
+            (key, value)
+            for key, value in parse_qsl(parts.query, keep_blank_values=True)
+            if not key.startswith("utm_")
+        )
+    )
+    path = parts.path.rstrip("/")
+    fragment = parts.fragment if parts.fragment.startswith(PASSAGE_FRAGMENT) else ""
+    return urlunsplit(
+        (
+            "https" if parts.scheme == "http" else parts.scheme,
+            host,
+            path,
+            query,
+            fragment,
+        )
+    )
+
+
+def passage_url(url: str, number: int) -> str:
+    """Return the reference URL of the `number`-th passage of a page."""
+    return urlsplit(url)._replace(fragment=f"{PASSAGE_FRAGMENT}{number}").geturl()
+
+
+def page_url(url: str) -> str:
+    """Return the URL of the page a reference comes from."""
+    parts = urlsplit(url)
+    if not parts.fragment.startswith(PASSAGE_FRAGMENT):
+        return url
+    return parts._replace(fragment="").geturl()
+
+
+def content_hash(content: str) -> str:
+    """Return a hash of the content, ignoring case and whitespace."""
+    normalized = " ".join(content.casefold().split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class Reference:
+    """A single reference with a stable integer ID."""
+
+    id: int
+    url: str
+    content: str
+
+
+@dataclass
+class _ReferenceLog:
+    """Append-only log shared by the stores that extend one another."""
+
+    records: list[Reference] = field(default_factory=list)
+    by_url: dict[str, int] = field(default_factory=dict)
+    by_hash: dict[str, int] = field(default_factory=dict)
+    index: BM25Index = field(default_factory=BM25Index)
+    index_lock: threading.Lock = field(default_factory=threading.Lock)
+    # (size, key) of every checkpointed chunk, by increasing size
+    chunks: list[tuple[int, str]] = field(default_factory=list)
+    chunks_lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def catch_up_index(self) -> BM25Index:
+        """Index every record appended since the last search."""
+        with self.index_lock:
+            for record in self.records[len(self.index) :]:
+                self.index.add(record.id, f"{record.url} {record.content}")
+        return self.index
+
+    def checkpoint_chunk(self, store: BlobStore, size: int) -> Optional[str]:
+        """Return the key of the chunk ending at `size`, writing it if needed.
+
+        The chunk holds the records after the nearest checkpointed size below.
+        """
+        if size == 0:
+            return None
+        with self.chunks_lock:
+            position = bisect.bisect_right(self.chunks, (size, "\uffff"))
+            parent_size, parent = self.chunks[position - 1] if position else (0, None)
+            if parent_size == size:
+                return parent
+            chunk = {
+                "parent": parent,
+                "start": parent_size + 1,
+                "records": [[r.url, r.content] for r in self.records[parent_size:size]],
+            }
+            key = store.put(json.dumps(chunk).encode("utf-8"))
+            self.chunks.insert(position, (size, key))
+            return key
+
+
+_chunk_store: Optional[BlobStore] = None
+_chunk_store_lock = threading.Lock()
+
+
+def set_reference_chunk_store(store: Optional[BlobStore]) -> Optional[BlobStore]:
+    """Set where reference checkpoint chunks are written and read.
+
+    The store must be reachable by every process resuming the checkpoints,
+    such as the `SQLiteBlobStore` of a `BlobSerializer`. With None, the
+    default, checkpoints hold every reference instead.
+
+    Returns:
+        The previous store, so that it can be put back.
+    """
+    global _chunk_store
+    with _chunk_store_lock:
+        previous, _chunk_store = _chunk_store, store
+    return previous
+
+
+def _get_chunk_store() -> BlobStore:
+    store = _chunk_store
+    if store is None:
+        raise KeyError("No reference chunk store is set")
+    return store
+
+
+def load_reference_chunks(head: str) -> tuple[list[list[str]], list[tuple[int, str]]]:
+    """Read a chain of checkpoint chunks, oldest first.
+
+    Returns:
+        The [url, content] records, and the (size, key) of every chunk.
+
+    Raises:
+        KeyError: If a chunk is missing from the chunk store.
+    """
+    store = _get_chunk_store()
+    chunks: list[tuple[str, dict[str, Any]]] = []
+    key: Optional[str] = head
+    while key is not None:
+        chunk = json.loads(store.get(key))
+        chunks.append((key, chunk))
+        key = chunk["parent"]
+    records: list[list[str]] = []
+    sizes: list[tuple[int, str]] = []
+    for key, chunk in reversed(chunks):
+        if chunk["start"] != len(records) + 1:
+            raise ValueError(f"Reference chunk {key} does not follow its parent")
+        records.extend(chunk["records"])
+        sizes.append((len(records), key))
+    return records, sizes
+
+
+class ReferenceStore(Mapping[str, str]):
+    """An immutable view of an append-only reference log, mapping URL to content.
+
+    A store only sees the first `len(store)` records of its log. Extending the
+    newest view appends in place; extending an older view forks the log first.
+    """
+
+    __slots__ = ("_log", "_size")
+
+    def __init__(
+        self,
+        references: Union[Mapping[str, str], Iterable[Sequence[str]], None] = None,
+    ) -> None:
+        """Create a store, optionally seeded with URL to content pairs."""
+        self._log = _ReferenceLog()
+        self._size = 0
+        if references:
+            items = (
+                references.items() if isinstance(references, Mapping) else references
+            )
+            self._append((url, content) for url, content in items)
+
+    @classmethod
+    def _view(cls, log: _ReferenceLog, size: int) -> ReferenceStore:
+        store = cls.__new__(cls)
+        store._log = log
+        store._size = size
+        return store
+
+    def _find(self, url: str, content: str) -> Optional[int]:
+        """Return the ID of a visible duplicate of this reference, if any."""
+        for index, key in (
+            (self._log.by_url, normalize_url(url)),
+            (self._log.by_hash, content_hash(content)),
+        ):
+            ref_id = index.get(key)
+            if ref_id is not None and ref_id <= self._size:
+                return ref_id
+        return None
+
+    def _append(self, items: Iterable[tuple[str, str]]) -> int:
+        """Append new references to this store's log in place."""
+        added = 0
+        for url, content in items:
+            if self._find(url, content) is not None:
+                continue
+            ref_id = self._size + 1
+            self._log.records.append(Reference(id=ref_id, url=url, content=content))
+            self._log.by_url.setdefault(normalize_url(url), ref_id)
+            self._log.by_hash.setdefault(content_hash(content), ref_id)
+            self._size = ref_id
+            added += 1
+        return added
+
+    def extended(self, items: Iterable[tuple[str, str]]) -> ReferenceStore:
+        """Return a store with the new, non-duplicate references appended."""
+        if self._size == len(self._log.records):
+            log = self._log
+        else:
+            # Another view already appended to the shared log, so fork it
+            log = _ReferenceLog()
+            for record in self._log.records[: self._size]:
+                log.records.append(record)
+                log.by_url.setdefault(normalize_url(record.url), record.id)
+                log.by_hash.setdefault(content_hash(record.content), record.id)
+        store = self._view(log, self._size)
+        store._append(items)
+        return store
+
+    @property
+    def records(self) -> Sequence[Reference]:
+        """Return the visible references, ordered by ID."""
+        return self._log.records[: self._size]
+
+    @property
+    def page_count(self) -> int:
+        """Return the number of distinct pages, counting passages with their page."""
+        return len({normalize_url(page_url(record.url)) for record in self.records})
+
+    def search(self, query: str, k: int) -> list[Reference]:
+        """Return up to `k` references ranked by BM25 relevance to the query.
+
+        The lexical index is shared by every view of the log and only indexes
+        references that arrived since the previous search.
+        """
+        index = self._log.catch_up_index()
+        return [
+            self._log.records[ref_id - 1]
+            for ref_id, _ in index.search(query, k, max_id=self._size)
+        ]
+
+    def get_id(self, url: str) -> Optional[int]:
+        """Return the stable ID of the reference with this URL, if any."""
+        ref_id = self._log.by_url.get(normalize_url(url))
+        return ref_id if ref_id is not None and ref_id <= self._size else None
+
+    def __getitem__(self, url: str) -> str:
+        """Return the content of the reference with this URL."""
+        ref_id = self.get_id(url)
+        if ref_id is None:
+            raise KeyError(url)
+        return self._log.records[ref_id - 1].content
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the reference URLs in ID order."""
+        return (record.url for record in self.records)
+
+    def __len__(self) -> int:
+        """Return the number of references."""
+        return self._size
+
+    def _asdict(self) -> dict[str, list[list[str]]]:
+        """Return the constructor arguments, used by the checkpoint serializer."""
+        return {"references": [[r.url, r.content] for r in self.records]}
+
+    def __repr__(self) -> str:
+        """Return a short representation of the store."""
+        return f"ReferenceStore({len(self)} references)"
+
+
+def select_references(
+    store: ReferenceStore,
+    query: str,
+    k: int,
+    max_tokens: int,
+    model: Optional[str] = None,
+) -> list[Reference]:
+    """Select the references most relevant to a query within a token budget.
+
+    Lexical matches come first; remaining slots are filled with the newest
+    references, which come from the search run for the latest question.
+    """
+    ranked = store.search(query, k)
+    seen = {record.id for record in ranked}
+    for record in reversed(store.records):
+        if len(ranked) >= k:
+            break
+        if record.id not in seen:
+            ranked.append(record)
+            seen.add(record.id)
+
+    selected: list[Reference] = []
+    used = 0
+    for record in ranked:
+        cost = count_tokens(record.url, model) + count_tokens(record.content, model)
+        if used + cost > max_tokens:
+            continue
+        selected.append(record)
+        used += cost
+    return selected
+
+
+ReferenceUpdate = Union[Mapping[str, str], Sequence[Sequence[str]]]
+
+
+# Every [url, content] record, or the head of a chain of chunks
+ReferenceCheckpoint = Union[list[list[str]], dict[str, Any]]
+
+
+class ReferenceChannel(
+    BaseChannel[ReferenceStore, ReferenceUpdate, ReferenceCheckpoint]
+):
+    """A LangGraph channel that appends references to a ReferenceStore.
+
+    Nodes write a mapping of URL to content (or another store); only references
+    that are not already known are appended. With a chunk store set,
+    checkpoints only write the references appended since the previous one.
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self, typ: Any = ReferenceStore, key: str = "") -> None:
+        """Create an empty reference channel."""
+        super().__init__(typ, key)
+        self.value = ReferenceStore()
+
+    def __eq__(self, value: object) -> bool:
+        """Return True for any other reference channel."""
+        return isinstance(value, ReferenceChannel)
+
+    @property
+    def ValueType(self) -> Any:
+        """The type of the value stored in the channel."""
+        return ReferenceStore
+
+    @property
+    def UpdateType(self) -> Any:
+        """The type of the update received by the channel."""
+        return ReferenceUpdate
+
+    def copy(self) -> Self:
+        """Return a copy of the channel, sharing the immutable store view."""
+        channel = self.__class__(self.typ, self.key)
+        channel.value = self.value
+        return channel
+
+    def checkpoint(self) -> ReferenceCheckpoint:
+        """Return every reference, or write the new ones as a chunk.
+
+        Without a chunk store the checkpoint holds the [url, content] records
+        themselves; with one, only the head of the chain of chunks.
+        """
+        store = self.value
+        chunks = _chunk_store
+        if chunks is None:
+            return [[record.url, record.content] for record in store.records]
+        return {
+            "head": store._log.checkpoint_chunk(chunks, len(store)),
+            "size": len(store),
+        }
+
+    def from_checkpoint(self, checkpoint: Any) -> Self:
+        """Return a new channel restored from a checkpoint."""
+        channel = self.__class__(self.typ, self.key)
+        if checkpoint is MISSING or not checkpoint:
+            return channel
+        if isinstance(checkpoint, list):
+            channel.value = ReferenceStore(checkpoint)
+        elif checkpoint["head"] is not None:
+            records, chunks = load_reference_chunks(checkpoint["head"])
+            channel.value = ReferenceStore(records)
+            if len(channel.value) != checkpoint["size"]:
+                raise ValueError(
+                    f"Reference checkpoint expects {checkpoint['size']} references, "
+                    f"its chunks hold {len(channel.value)}"
+                )
+            channel.value._log.chunks = chunks
+        return channel
+
+    def update(self, values: Sequence[ReferenceUpdate]) -> bool:
+        """Append the new references from every update."""
+        size = len(self.value)
+        for update in values:
+            items = update.items() if isinstance(update, Mapping) else update
+            self.value = self.value.extended(
+                (str(url), str(content)) for url, content in items
+            )
+        return len(self.value) != size
+
+    def get(self) -> ReferenceStore:
+        """Return the current reference store."""
+        return self.value
+
+    def is_available(self) -> bool:
+        """Return True, since an empty store is a valid value."""
+        return True
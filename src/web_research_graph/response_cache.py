@@ -0,0 +1,90 @@
+"""Exact-match caching of structured model responses.
+
+Responses are keyed by a hash of the model name, the fully rendered prompt and
+the JSON schema of the expected output, so any change to one of them misses
+the cache. Responses are always validated into the output type, pydantic model
+or dataclass, so callers receive the same objects with or without the cache.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any, Mapping, Sequence, TypeVar
+
+from langchain_core.messages import BaseMessage
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import RunnableConfig
+from pydantic import TypeAdapter
+
+from web_research_graph.cache import get_cache
+from web_research_graph.configuration import Configuration
+from web_research_graph.telemetry import record_cache_lookup
+from web_research_graph.utils import get_message_text, load_chat_model
+
+OutputT = TypeVar("OutputT")
+
+
+def response_cache_key(
+    model_name: str, messages: Sequence[BaseMessage], schema: type[Any]
+) -> str:
+    """Hash the model name, rendered prompt and output schema into a cache key."""
+    payload = json.dumps(
+        {
+            "model": model_name,
+            "messages": [
+                [message.type, get_message_text(message)] for message in messages
+            ],
+            "schema": TypeAdapter(schema).json_schema(),
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+async def ainvoke_structured(
+    prompt: ChatPromptTemplate,
+    inputs: Mapping[str, Any],
+    schema: type[OutputT],
+    model_name: str,
+    config: RunnableConfig,
+    cache_enabled: bool = True,
+) -> OutputT:
+    """Run a prompt with structured output, reusing cached responses.
+
+    Args:
+        prompt (ChatPromptTemplate): The prompt to render.
+        inputs (Mapping[str, Any]): The prompt variables.
+        schema (type[OutputT]): The pydantic model or dataclass to parse into.
+        model_name (str): The 'provider/model' to call.
+        config (RunnableConfig): The run configuration.
+        cache_enabled (bool): Whether the calling node opted into the cache.
+    """
+    configuration = Configuration.from_runnable_config(config)
+    model = load_chat_model(model_name)
+    chain = (prompt | model.with_structured_output(schema)).with_config(config)
+
+    cache = (
+        get_cache(
+            configuration.llm_cache,
+            "llm_responses",
+            configuration.cache_path,
+            maxsize=configuration.llm_cache_max_entries,
+        )
+        if cache_enabled
+        else None
+    )
+    adapter = TypeAdapter(schema)
+    if cache is None:
+        return adapter.validate_python(await chain.ainvoke(dict(inputs)))
+
+    key = response_cache_key(model_name, prompt.format_messages(**inputs), schema)
+    entry = cache.get(key)
+    if entry is not None and entry.age < configuration.llm_cache_ttl:
+        await record_cache_lookup("llm", "hit", config)
+        return adapter.validate_python(entry.value)
+    await record_cache_lookup("llm", "miss", config)
+
+    response = adapter.validate_python(await chain.ainvoke(dict(inputs)))
+    cache.set(key, adapter.dump_python(response, mode="json"))
+    return response
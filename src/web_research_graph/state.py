@@ -11,6 +11,8 @@ from langgraph.managed import IsLastStep
 from pydantic import BaseModel, Field
 from typing_extensions import Annotated
 
+from web_research_graph.references import ReferenceChannel, ReferenceStore
+
 
 @dataclass
 class Editor:
@@ -130,12 +132,6 @@ def default_topic_validation() -> TopicValidation:
     return TopicValidation(is_valid=False, topic=None, message=None)
 
 
-# Custom reducer function to merge dictionaries
-def merge_dicts(existing: dict[str, str], new: dict[str, str]) -> dict[str, str]:
-    """Merge two dictionaries, with new keys overriding old keys."""
-    return {**existing, **new}
-
-
 @dataclass
 class State(InputState, OutputState):
     """Represents the complete state of the agent."""
@@ -145,7 +141,9 @@ class State(InputState, OutputState):
     is_last_step: IsLastStep = field(default=False)
     outline: Optional[Outline] = field(default=None)
     perspectives: Optional[Perspectives] = field(default=None)
-    references: Annotated[dict[str, str], merge_dicts] = field(default_factory=dict)
+    references: Annotated[ReferenceStore, ReferenceChannel] = field(
+        default_factory=ReferenceStore
+    )
     article: Optional[str] = field(default=None)
     interviews: list[Annotated[list[AnyMessage], add_messages]] = field(
         default_factory=list
@@ -155,11 +153,32 @@ class State(InputState, OutputState):
 
 @dataclass
 class InterviewState(State):
-    """State for the interview process between editors and experts."""
+    """State for dispatching interviews to every editor."""
 
     editors: list[Editor] = field(default_factory=list)
-    current_editor_index: int = field(default=0)
-    interviews: list[Annotated[list[AnyMessage], add_messages]] = field(
-        default_factory=list
+
+
+@dataclass
+class EditorInterviewState(State):
+    """State for a single editor's interview with the expert.
+
+    Every editor gets its own sub-run with a private transcript, so interviews
+    can be conducted concurrently without interleaving their dialogues.
+    """
+
+    editor: Optional[Editor] = field(default=None)
+    editor_index: int = field(default=0)
+    interview: Annotated[list[AnyMessage], add_messages] = field(default_factory=list)
+    # Number of reference pages known when the interview starts and after each
+    # expert answer
+    reference_counts: list[int] = field(default_factory=list)
+
+
+@dataclass
+class InterviewOutputState:
+    """Defines what the interviews hand back to the research state."""
+
+    messages: Annotated[list[AnyMessage], add_messages] = field(default_factory=list)
+    references: Annotated[ReferenceStore, ReferenceChannel] = field(
+        default_factory=ReferenceStore
     )
-    is_complete: bool = field(default=False)
@@ -0,0 +1,385 @@
+"""OpenTelemetry tracing and metrics for graph nodes and model calls.
+
+`TelemetryCallbackHandler` turns LangChain callbacks into one span per graph
+node (in every subgraph) and one child span per model call, and records
+latency histograms and token counters. The OpenTelemetry API is a no-op until
+an SDK is configured, either by the host application or with
+`configure_telemetry`.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler, adispatch_custom_event
+from langchain_core.outputs import LLMResult
+from langchain_core.runnables import RunnableConfig
+from opentelemetry import metrics, trace
+from opentelemetry.trace import Span, SpanKind, Status, StatusCode
+
+# Name of the custom callback event reporting cache lookups
+CACHE_EVENT = "web_research.cache_lookup"
+
+
+async def record_cache_lookup(
+    cache: str, status: str, config: Optional[RunnableConfig]
+) -> None:
+    """Report a cache lookup to the telemetry of the current run.
+
+    Args:
+        cache (str): The cache name, such as "search" or "llm".
+        status (str): The lookup result, such as "hit" or "miss".
+        config (Optional[RunnableConfig]): The config of the calling node.
+    """
+    # Events can only be dispatched from inside a traced run
+    if config and config.get("callbacks"):
+        await adispatch_custom_event(
+            CACHE_EVENT, {"cache": cache, "status": status}, config=config
+        )
+
+
+def _state_value(state: Any, key: str) -> Any:
+    """Read a field from a node input, which may be a dataclass or a dict."""
+    if isinstance(state, dict):
+        return state.get(key)
+    return getattr(state, key, None)
+
+
+@dataclass
+class _SpanRun:
+    """A run that has its own span."""
+
+    span: Span
+    started: float
+    metric_attributes: dict[str, str]
+    namespace: Optional[str] = None
+    # The graph run that runs the node, and retries it on failure
+    graph: Optional[UUID] = None
+    retries: int = 0
+    cache_lookups: dict[str, int] = field(default_factory=dict)
+
+
+class TelemetryCallbackHandler(BaseCallbackHandler):
+    """Create OpenTelemetry spans and metrics from LangChain callbacks.
+
+    Node spans record the node name, superstep, attempt, editor index and
+    interview turn. Model spans record the provider, model and token usage.
+    Retries and cache lookups are recorded on the nearest span.
+    """
+
+    # Spans are cheap to create, so skip the thread pool hop
+    run_inline = True
+
+    def __init__(
+        self,
+        tracer_provider: Optional[trace.TracerProvider] = None,
+        meter_provider: Optional[metrics.MeterProvider] = None,
+    ) -> None:
+        """Create a handler using the global providers unless others are given."""
+        self._tracer = trace.get_tracer(__name__, tracer_provider=tracer_provider)
+        meter = metrics.get_meter(__name__, meter_provider=meter_provider)
+        self._node_duration = meter.create_histogram(
+            "web_research.node.duration",
+            unit="s",
+            description="Wall time of each graph node",
+        )
+        self._llm_duration = meter.create_histogram(
+            "web_research.llm.duration",
+            unit="s",
+            description="Wall time of each model call",
+        )
+        self._llm_tokens = meter.create_counter(
+            "web_research.llm.tokens",
+            unit="{token}",
+            description="Prompt and completion tokens used by model calls",
+        )
+        self._cache_lookups = meter.create_counter(
+            "web_research.cache.lookups",
+            unit="{lookup}",
+            description="Cache lookups by cache and result",
+        )
+        self._lock = threading.Lock()
+        self._spans: dict[UUID, _SpanRun] = {}
+        self._parents: dict[UUID, Optional[UUID]] = {}
+        # Attempts per node task, which keeps its namespace across retries,
+        # grouped by the graph run that retries it
+        self._attempts: dict[Optional[UUID], dict[str, int]] = {}
+
+    def _nearest(self, run_id: Optional[UUID]) -> Optional[_SpanRun]:
+        """Return the span of the run or of its closest ancestor with one."""
+        while run_id is not None:
+            run = self._spans.get(run_id)
+            if run is not None:
+                return run
+            run_id = self._parents.get(run_id)
+        return None
+
+    def _start(
+        self,
+        run_id: UUID,
+        parent_run_id: Optional[UUID],
+        name: str,
+        kind: SpanKind,
+        attributes: dict[str, Any],
+        metric_attributes: dict[str, str],
+    ) -> _SpanRun:
+        parent = self._nearest(parent_run_id)
+        context = trace.set_span_in_context(parent.span) if parent else None
+        span = self._tracer.start_span(
+            name,
+            context=context,
+            kind=kind,
+            attributes={k: v for k, v in attributes.items() if v is not None},
+        )
+        run = self._spans[run_id] = _SpanRun(
+            span, time.perf_counter(), metric_attributes
+        )
+        return run
+
+    def _end(
+        self, run_id: UUID, error: Optional[BaseException] = None
+    ) -> Optional[tuple[_SpanRun, float]]:
+        self._parents.pop(run_id, None)
+        run = self._spans.pop(run_id, None)
+        if run is None:
+            return None
+        if run.retries:
+            run.span.set_attribute("retries", run.retries)
+        for name, count in run.cache_lookups.items():
+            run.span.set_attribute(name, count)
+        if error is not None:
+            run.span.record_exception(error)
+            run.span.set_status(Status(StatusCode.ERROR, str(error)))
+        run.span.end()
+        return run, time.perf_counter() - run.started
+
+    def _forget_attempts(
+        self, run_id: UUID, ended: Optional[tuple[_SpanRun, float]]
+    ) -> None:
+        # A graph run that ended will not retry its nodes anymore
+        self._attempts.pop(run_id, None)
+        if ended is None or ended[0].namespace is None:
+            return
+        attempts = self._attempts.get(ended[0].graph)
+        if attempts is not None:
+            attempts.pop(ended[0].namespace, None)
+            if not attempts:
+                del self._attempts[ended[0].graph]
+
+    def on_chain_start(
+        self,
+        serialized: Optional[dict[str, Any]],
+        inputs: Any,
+        *,
+        run_id: UUID,
+        parent_run_id: Optional[UUID] = None,
+        metadata: Optional[dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        """Start a node span when the run is a graph node."""
+        metadata = metadata or {}
+        node = metadata.get("langgraph_node")
+        with self._lock:
+            self._parents[run_id] = parent_run_id
+            if node is None or kwargs.get("name") != node:
+                return
+            namespace = str(metadata.get("langgraph_checkpoint_ns", node))
+            attempts = self._attempts.setdefault(parent_run_id, {})
+            attempt = attempts[namespace] = attempts.get(namespace, 0) + 1
+            interview = _state_value(inputs, "interview")
+            run = self._start(
+                run_id,
+                parent_run_id,
+                f"node {node}",
+                SpanKind.INTERNAL,
+                {
+                    "langgraph.node": node,
+                    "langgraph.step": metadata.get("langgraph_step"),
+                    "langgraph.checkpoint_ns": namespace,
+                    "langgraph.attempt": attempt,
+                    "interview.editor_index": _state_value(inputs, "editor_index"),
+                    # The transcript opens with the expert, then alternates
+                    "interview.turn": (len(interview) + 1) // 2
+                    if isinstance(interview, list)
+                    else None,
+                },
+                {"node": node},
+            )
+            run.namespace = namespace
+            run.graph = parent_run_id
+
+    def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        """End the span of a finished node."""
+        with self._lock:
+            ended = self._end(run_id)
+            self._forget_attempts(run_id, ended)
+        if ended is not None:
+            self._node_duration.record(ended[1], ended[0].metric_attributes)
+
+    def on_chain_error(
+        self, error: BaseException, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        """End the span of a failed node, keeping its attempt count for a retry.
+
+        The attempt counts of a graph's nodes are dropped once the graph
+        itself fails, as nothing is left to retry them.
+        """
+        with self._lock:
+            ended = self._end(run_id, error)
+            self._attempts.pop(run_id, None)
+        if ended is not None:
+            attributes = {**ended[0].metric_attributes, "error": type(error).__name__}
+            self._node_duration.record(ended[1], attributes)
+
+    def on_chat_model_start(
+        self,
+        serialized: dict[str, Any],
+        messages: Any,
+        *,
+        run_id: UUID,
+        parent_run_id: Optional[UUID] = None,
+        metadata: Optional[dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        """Start a span for a model call."""
+        metadata = metadata or {}
+        provider = str(metadata.get("ls_provider", "unknown"))
+        model = str(metadata.get("ls_model_name", "unknown"))
+        node = str(metadata.get("langgraph_node", ""))
+        with self._lock:
+            self._parents[run_id] = parent_run_id
+            self._start(
+                run_id,
+                parent_run_id,
+                f"chat {model}",
+                SpanKind.CLIENT,
+                {
+                    "gen_ai.system": provider,
+                    "gen_ai.request.model": model,
+                    "gen_ai.request.max_tokens": metadata.get("ls_max_tokens"),
+                    "langgraph.node": node or None,
+                },
+                {"provider": provider, "model": model, "node": node},
+            )
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        """Record the token usage and latency of a model call."""
+        input_tokens = output_tokens = 0
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                usage = getattr(message, "usage_metadata", None) or {}
+                input_tokens += usage.get("input_tokens", 0)
+                output_tokens += usage.get("output_tokens", 0)
+        with self._lock:
+            run = self._spans.get(run_id)
+            if run is not None:
+                run.span.set_attribute("gen_ai.usage.input_tokens", input_tokens)
+                run.span.set_attribute("gen_ai.usage.output_tokens", output_tokens)
+            ended = self._end(run_id)
+        if ended is not None:
+            attributes = ended[0].metric_attributes
+            self._llm_duration.record(ended[1], attributes)
+            self._llm_tokens.add(input_tokens, {**attributes, "type": "input"})
+            self._llm_tokens.add(output_tokens, {**attributes, "type": "output"})
+
+    def on_llm_error(
+        self, error: BaseException, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        """End the span of a failed model call."""
+        with self._lock:
+            ended = self._end(run_id, error)
+        if ended is not None:
+            attributes = {**ended[0].metric_attributes, "error": type(error).__name__}
+            self._llm_duration.record(ended[1], attributes)
+
+    def on_retry(
+        self,
+        retry_state: Any,
+        *,
+        run_id: UUID,
+        parent_run_id: Optional[UUID] = None,
+        **kwargs: Any,
+    ) -> None:
+        """Count a retry on the nearest span."""
+        with self._lock:
+            run = self._nearest(run_id)
+            if run is not None:
+                run.retries += 1
+                run.span.add_event(
+                    "retry", {"attempt": getattr(retry_state, "attempt_number", 0)}
+                )
+
+    def on_custom_event(
+        self,
+        name: str,
+        data: Any,
+        *,
+        run_id: UUID,
+        **kwargs: Any,
+    ) -> None:
+        """Record cache lookups reported with `record_cache_lookup`."""
+        if name != CACHE_EVENT:
+            return
+        attributes = {"cache": str(data["cache"]), "status": str(data["status"])}
+        with self._lock:
+            run = self._nearest(run_id)
+            if run is not None:
+                key = f"cache.{attributes['cache']}.{attributes['status']}"
+                run.cache_lookups[key] = run.cache_lookups.get(key, 0) + 1
+        self._cache_lookups.add(1, attributes)
+
+
+def configure_telemetry(
+    service_name: str = "web-research-graph", exporter: str = "otlp"
+) -> None:
+    """Install OpenTelemetry SDK providers that export traces and metrics.
+
+    Requires the `telemetry` extra. Host applications that already configure
+    OpenTelemetry do not need to call this.
+
+    Args:
+        service_name (str): The service name reported with every span.
+        exporter (str): "otlp" to export to an OTLP collector, configured with
+            the standard `OTEL_EXPORTER_OTLP_*` environment variables, or
+            "console" to print to stdout.
+    """
+    from opentelemetry.sdk.metrics import MeterProvider
+    from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+    if exporter == "console":
+        from opentelemetry.sdk.metrics.export import ConsoleMetricExporter
+        from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+
+        span_exporter: Any = ConsoleSpanExporter()
+        metric_exporter: Any = ConsoleMetricExporter()
+    elif exporter == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.metric_exporter import (
+            OTLPMetricExporter,
+        )
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+            OTLPSpanExporter,
+        )
+
+        span_exporter = OTLPSpanExporter()
+        metric_exporter = OTLPMetricExporter()
+    else:
+        raise ValueError(f"Unknown telemetry exporter: {exporter}")
+
+    resource = Resource.create({"service.name": service_name})
+    tracer_provider = TracerProvider(resource=resource)
+    tracer_provider.add_span_processor(BatchSpanProcessor(span_exporter))
+    trace.set_tracer_provider(tracer_provider)
+    metrics.set_meter_provider(
+        MeterProvider(
+            resource=resource,
+            metric_readers=[PeriodicExportingMetricReader(metric_exporter)],
+        )
+    )
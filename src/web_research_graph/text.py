@@ -0,0 +1,133 @@
+"""Lightweight text processing helpers that do not require a model."""
+
+import math
+import re
+from collections import Counter
+from typing import Optional
+
+_WORD_RE = re.compile(r"[\w][\w'-]*")
+
+STOPWORDS = frozenset(
+    """
+    a about above after again against all also am an and any are aren't as at be
+    because been before being below between both but by can can't could couldn't
+    did didn't do does doesn't doing don't down during each few for from further
+    get gets had hadn't has hasn't have haven't having he her here hers herself him
+    himself his how however i i'd i'll i'm i've if in into is isn't it it's its
+    itself just let's like me more most much must mustn't my myself no nor not now
+    of off on once only or other ought our ours ourselves out over own please same
+    shall shan't she should shouldn't so some such tell than that that's the their
+    theirs them themselves then there there's these they they'd they'll they're
+    they've this those through to too under until up upon us very was wasn't we
+    we'd we'll we're we've were weren't what what's when where which while who
+    whom why will with won't would wouldn't you you'd you'll you're you've your
+    yours yourself yourselves thank thanks hello hi regarding specifically
+    particular know understand explain describe discuss share insights interested
+    curious wondering question questions
+    """.split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lowercase word tokens."""
+    return [token.casefold().strip("'-") for token in _WORD_RE.findall(text)]
+
+
+def content_terms(text: str) -> list[str]:
+    """Return the tokens of `text` that are not stopwords."""
+    return [
+        token
+        for token in tokenize(text)
+        if token and token not in STOPWORDS and (len(token) > 1 or token.isdigit())
+    ]
+
+
+# Approximate characters per token for each model family
+CHARS_PER_TOKEN = {
+    "anthropic": 3.5,
+    "openai": 4.0,
+    "groq": 3.8,
+    "fireworks": 3.8,
+    "ollama": 3.8,
+}
+DEFAULT_CHARS_PER_TOKEN = 4.0
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """Approximate the number of tokens in a text for a 'provider/model'.
+
+    Counting is local: each model family gets a characters per token ratio
+    calibrated on English prose, so no tokenizer is loaded on the hot path.
+    A bare provider name works too.
+    """
+    provider = (model or "").split("/", maxsplit=1)[0]
+    return math.ceil(len(text) / CHARS_PER_TOKEN.get(provider, DEFAULT_CHARS_PER_TOKEN))
+
+
+def extract_keywords(text: str, max_keywords: int = 8) -> str:
+    """Compress text into a keyword query without calling a model.
+
+    Terms are scored TF-IDF style: term frequency weighted by an inverse
+    frequency proxy that favours longer tokens, with a boost for capitalized
+    words and numbers, which tend to be names, places and dates. The selected
+    terms are returned in their original order.
+    """
+    words = [word.strip("'-") for word in _WORD_RE.findall(text)]
+    counts = Counter(content_terms(text))
+    if not counts:
+        return " ".join(text.split())
+
+    scores: dict[str, float] = {}
+    for position, word in enumerate(words):
+        term = word.casefold()
+        if term not in counts or term in scores:
+            continue
+        score = counts[term] * math.log(1 + len(term))
+        if word[:1].isupper() and position > 0:
+            score *= 1.5
+        if term.isdigit():
+            score *= 1.5
+        scores[term] = score
+
+    selected = set(sorted(scores, key=lambda t: scores[t], reverse=True)[:max_keywords])
+    ordered: list[str] = []
+    for word in words:
+        term = word.casefold()
+        if term in selected and term not in ordered:
+            ordered.append(term)
+    return " ".join(ordered)
+
+
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def split_passages(text: str, max_tokens: int = 200, min_tokens: int = 20) -> list[str]:
+    """Split text into passages of whole paragraphs within a token budget.
+
+    Paragraphs are packed together until the budget is reached; a paragraph
+    longer than the budget is split between sentences. Passages shorter than
+    `min_tokens`, such as stray captions and menu labels, are dropped.
+    """
+    pieces: list[str] = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = " ".join(paragraph.split())
+        if count_tokens(paragraph) <= max_tokens:
+            pieces.append(paragraph)
+        else:
+            pieces.extend(_SENTENCE_END_RE.split(paragraph))
+
+    passages: list[str] = []
+    current: list[str] = []
+    used = 0
+    for piece in pieces:
+        cost = count_tokens(piece)
+        if not cost:
+            continue
+        if current and used + cost > max_tokens:
+            passages.append(" ".join(current))
+            current, used = [], 0
+        current.append(piece)
+        used += cost
+    if current:
+        passages.append(" ".join(current))
+    return [passage for passage in passages if count_tokens(passage) >= min_tokens]
@@ -0,0 +1,95 @@
+"""Token counting and budgeting for prompts and interview transcripts.
+
+Counting is local and approximate, with `text.count_tokens`, which is
+accurate enough to keep prompts within budget.
+"""
+
+from __future__ import annotations
+
+from typing import Optional, Sequence
+
+from langchain_core.messages import AnyMessage, BaseMessage, trim_messages
+
+from web_research_graph.text import count_tokens
+from web_research_graph.utils import get_message_text
+
+# Role markers and separators added by chat templates
+MESSAGE_OVERHEAD_TOKENS = 4
+# Characters kept from each older turn when compacting a transcript
+COMPACTED_TURN_CHARS = 240
+
+
+def count_message_tokens(
+    messages: Sequence[BaseMessage], model: Optional[str] = None
+) -> int:
+    """Approximate the number of tokens in a list of messages."""
+    return sum(
+        count_tokens(get_message_text(message), model) + MESSAGE_OVERHEAD_TOKENS
+        for message in messages
+    )
+
+
+def compact_messages(
+    messages: Sequence[BaseMessage], max_tokens: int, model: Optional[str] = None
+) -> str:
+    """Compact messages into short notes, keeping the newest that fit the budget."""
+    notes: list[str] = []
+    used = 0
+    for message in reversed(messages):
+        text = " ".join(get_message_text(message).split())
+        if len(text) > COMPACTED_TURN_CHARS:
+            text = text[:COMPACTED_TURN_CHARS].rsplit(" ", 1)[0] + " ..."
+        note = f"- {message.name or message.type}: {text}"
+        cost = count_tokens(note, model)
+        if used + cost > max_tokens:
+            break
+        notes.append(note)
+        used += cost
+    return "\n".join(reversed(notes))
+
+
+def fit_messages(
+    messages: Sequence[AnyMessage],
+    max_tokens: int,
+    model: Optional[str] = None,
+    start_on: Optional[str] = None,
+) -> list[AnyMessage]:
+    """Fit a transcript into a token budget.
+
+    The newest turns are kept verbatim. Older turns are compacted into short
+    notes prepended to the first kept message, for as long as the budget allows.
+
+    Args:
+        messages: The transcript, oldest first.
+        max_tokens (int): The token budget for the whole transcript.
+        model (Optional[str]): The 'provider/model' used to count tokens.
+        start_on (Optional[str]): The message type the kept turns must start on.
+    """
+    if count_message_tokens(messages, model) <= max_tokens:
+        return list(messages)
+
+    # Reserve part of the budget for the compacted older turns
+    kept: list[AnyMessage] = trim_messages(
+        messages,
+        max_tokens=max(1, int(max_tokens * 0.75)),
+        token_counter=lambda msgs: count_message_tokens(msgs, model),
+        strategy="last",
+        start_on=start_on,
+        allow_partial=False,
+    )
+    if not kept:
+        # Even the newest turn exceeds the budget; it is still needed to respond
+        return [messages[-1]]
+
+    dropped = messages[: len(messages) - len(kept)]
+    remaining = max_tokens - count_message_tokens(kept, model)
+    summary = compact_messages(dropped, remaining, model)
+    if summary:
+        first = kept[0]
+        kept[0] = first.model_copy(
+            update={
+                "content": f"Earlier in the conversation:\n{summary}\n\n"
+                f"{get_message_text(first)}"
+            }
+        )
+    return kept
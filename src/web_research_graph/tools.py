@@ -6,9 +6,15 @@ These tools are intended as free examples to get started. For production use,
 consider implementing more robust and specialized tools tailored to your needs.
 """
 
+import asyncio
+import functools
+import re
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Callable, List, Optional
 
-from langchain_community.utilities.duckduckgo_search import DuckDuckGoSearchAPIWrapper
+from duckduckgo_search import DDGS
 from langchain_core.language_models import BaseChatModel
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.runnables import RunnableConfig
@@ -16,12 +22,92 @@ from langchain_core.tools import InjectedToolArg
 from opentelemetry import trace
 from typing_extensions import Annotated
 
+from web_research_graph.cache import BaseCache, get_cache
 from web_research_graph.configuration import Configuration
 from web_research_graph.prompts import QUERY_SUMMARIZATION_PROMPT
+from web_research_graph.telemetry import record_cache_lookup
+from web_research_graph.text import extract_keywords
 from web_research_graph.utils import load_chat_model
 
 tracer = trace.get_tracer(__name__)
 
+# The DuckDuckGo client is synchronous, so searches run on a dedicated, bounded
+# thread pool instead of blocking the event loop shared by every run.
+MAX_SEARCH_WORKERS = 4
+_search_executor = ThreadPoolExecutor(
+    max_workers=MAX_SEARCH_WORKERS, thread_name_prefix="web-search"
+)
+# A search that timed out keeps its worker until the request itself gives up,
+# so the client's own timeout bounds how long a worker can be held.
+SEARCH_CLIENT_TIMEOUT = 10
+_search_client: Optional[DDGS] = None
+_search_client_lock = threading.Lock()
+
+# Process-wide search cache counters, reported on every search span.
+SEARCH_CACHE_STATS: Counter[str] = Counter()
+# Keep references to background refreshes so they are not garbage collected.
+_refreshes: dict[str, asyncio.Task[None]] = {}
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a search query so near-identical queries share a cache key."""
+    return " ".join(re.findall(r"\w+", query.casefold()))
+
+
+def search_cache_key(query: str, max_results: int) -> str:
+    """Build the search cache key for a query and result count."""
+    return f"{max_results}:{normalize_query(query)}"
+
+
+def get_search_client() -> DDGS:
+    """Return the DuckDuckGo client shared by every search."""
+    global _search_client
+    with _search_client_lock:
+        if _search_client is None:
+            _search_client = DDGS(timeout=SEARCH_CLIENT_TIMEOUT)
+        return _search_client
+
+
+def _search_sync(query: str, max_results: int) -> list[dict[str, Any]]:
+    """Search DuckDuckGo, returning results with a snippet, title and link."""
+    results = get_search_client().text(query, max_results=max_results)
+    return [
+        {"snippet": r["body"], "title": r["title"], "link": r["href"]} for r in results
+    ]
+
+
+async def _run_search(
+    query: str, max_results: int, timeout: Optional[float] = None
+) -> list[dict[str, Any]]:
+    """Run a search against DuckDuckGo without blocking the event loop.
+
+    A search that times out while still queued is cancelled before it starts,
+    so timed-out searches do not pile up behind the busy workers.
+
+    Raises:
+        asyncio.TimeoutError: If the search takes longer than `timeout` seconds.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(_search_executor, _search_sync, query, max_results)
+    return await asyncio.wait_for(future, timeout)
+
+
+async def _refresh_search(
+    cache: BaseCache, key: str, query: str, max_results: int, timeout: float
+) -> None:
+    """Refresh a stale search cache entry in the background."""
+    result = await _run_search(query, max_results, timeout)
+    if result:
+        cache.set(key, result)
+
+
+def _finish_refresh(key: str, task: asyncio.Task[None]) -> None:
+    """Forget a finished refresh and count it if it failed."""
+    _refreshes.pop(key, None)
+    if not task.cancelled() and task.exception() is not None:
+        # The stale entry stays cached and the next search retries
+        SEARCH_CACHE_STATS["refresh_error"] += 1
+
 
 async def summarize_query(
     query: str, model: BaseChatModel, config: RunnableConfig
@@ -31,6 +117,32 @@ async def summarize_query(
     return await chain.ainvoke({"query": query})
 
 
+async def compress_query(query: str, config: RunnableConfig) -> str:
+    """Shorten a long query using the configured compression strategy."""
+    configuration = Configuration.from_runnable_config(config)
+    if (
+        configuration.query_compression == "none"
+        or len(query) <= configuration.query_compression_threshold
+    ):
+        return query
+
+    if configuration.query_compression == "keywords":
+        return extract_keywords(query, configuration.query_max_keywords)
+
+    # Memoize LLM summaries so repeated questions cost a single call
+    summaries = get_cache("memory", "query_summaries")
+    if summaries is None:
+        raise RuntimeError("The query summary cache is unavailable")
+    key = f"{configuration.long_context_model}:{normalize_query(query)}"
+    entry = summaries.get(key)
+    if entry is not None:
+        return str(entry.value)
+    model = load_chat_model(configuration.long_context_model)
+    summary = await summarize_query(query, model, config)
+    summaries.set(key, summary)
+    return summary
+
+
 async def search(
     query: str, *, config: Annotated[RunnableConfig, InjectedToolArg]
 ) -> Optional[list[dict[str, Any]]]:
@@ -40,20 +152,62 @@ async def search(
     to provide comprehensive, accurate, and trusted results. It's particularly useful
     for answering questions about current events.
 
-    If the query is longer than 350 characters, it will be automatically summarized
-    using an LLM to create a more focused search query.
+    If the query is longer than the configured threshold, it is compressed into
+    a more focused search query, by default with local keyword extraction.
     """
     configuration = Configuration.from_runnable_config(config)
-    model = load_chat_model(configuration.long_context_model)
-    # If query is too long, summarize it using the LLM
-    if len(query) > 40:
-        query = await summarize_query(query, model, config)
+    # If query is too long, compress it
+    query = await compress_query(query, config)
 
     with tracer.start_span("search") as span:
-        wrapped = DuckDuckGoSearchAPIWrapper()
-        result = wrapped.results(query, configuration.max_search_results)
         span.set_attribute("search.query", query)
+        max_results = configuration.max_search_results
+        cache = get_cache(
+            configuration.search_cache, "search", configuration.cache_path
+        )
+        result = None
+        status = "disabled"
+        if cache is not None:
+            key = search_cache_key(query, max_results)
+            entry = cache.get(key)
+            if entry is not None and entry.age < configuration.search_cache_ttl:
+                status = "hit"
+                result = entry.value
+            elif entry is not None and entry.age < (
+                configuration.search_cache_ttl + configuration.search_cache_stale_ttl
+            ):
+                # Serve the stale result and revalidate it in the background
+                status = "stale"
+                result = entry.value
+                if key not in _refreshes:
+                    refresh = _refreshes[key] = asyncio.create_task(
+                        _refresh_search(
+                            cache,
+                            key,
+                            query,
+                            max_results,
+                            configuration.search_timeout,
+                        )
+                    )
+                    refresh.add_done_callback(functools.partial(_finish_refresh, key))
+            else:
+                status = "miss"
+            SEARCH_CACHE_STATS[status] += 1
+            await record_cache_lookup("search", status, config)
+
+        if result is None:
+            result = await _run_search(query, max_results, configuration.search_timeout)
+            if cache is not None and result:
+                cache.set(key, result)
+
         span.set_attribute("search.results", len(result))
+        span.set_attribute("search.cache", status)
+        span.set_attribute("search.cache.hits", SEARCH_CACHE_STATS["hit"])
+        span.set_attribute("search.cache.stale_hits", SEARCH_CACHE_STATS["stale"])
+        span.set_attribute("search.cache.misses", SEARCH_CACHE_STATS["miss"])
+        span.set_attribute(
+            "search.cache.refresh_errors", SEARCH_CACHE_STATS["refresh_error"]
+        )
     return result
 
 
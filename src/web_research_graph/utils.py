@@ -1,12 +1,14 @@
 """Utility & helper functions."""
 
 import re
-from typing import Any, Dict, Optional
+import threading
+from typing import Any, Dict, Hashable, Optional
 
 from langchain.chat_models import init_chat_model
 from langchain_core.language_models import BaseChatModel
 from langchain_core.messages import AIMessage, AnyMessage, BaseMessage, HumanMessage
 
+from web_research_graph.rate_limits import RateLimitedChatModel
 from web_research_graph.state import Section, Subsection
 
 
@@ -22,20 +24,65 @@ def get_message_text(msg: BaseMessage) -> str:
         return "".join(txts).strip()
 
 
+# Process-wide pool of chat models. Reusing an instance also reuses the provider
+# client it wraps, along with its HTTP connection pool.
+_CHAT_MODELS: dict[tuple[str, str, Hashable], BaseChatModel] = {}
+_CHAT_MODELS_LOCK = threading.Lock()
+
+
+def _freeze_kwargs(kwargs: Dict[str, Any]) -> Hashable:
+    """Turn model keyword arguments into a hashable cache key."""
+    return tuple(sorted((key, repr(value)) for key, value in kwargs.items()))
+
+
 def load_chat_model(
-    fully_specified_name: str, max_tokens: Optional[int] = None
+    fully_specified_name: str, max_tokens: Optional[int] = None, **kwargs: Any
 ) -> BaseChatModel:
     """Load a chat model from a fully specified name.
 
+    Models are cached process-wide, keyed by provider, model name and keyword
+    arguments, so repeated calls share one client instead of building a new one.
+    Their async calls wait for the provider's shared rate limits, see
+    `web_research_graph.rate_limits`.
+
     Args:
         fully_specified_name (str): String in the format 'provider/model'.
         max_tokens (Optional[int]): Maximum number of tokens to generate.
+        **kwargs: Additional keyword arguments passed to `init_chat_model`.
     """
     provider, model = fully_specified_name.split("/", maxsplit=1)
-    kwargs = {}
     if max_tokens is not None:
         kwargs["max_tokens"] = max_tokens
-    return init_chat_model(model, model_provider=provider, **kwargs)
+    key = (provider, model, _freeze_kwargs(kwargs))
+    with _CHAT_MODELS_LOCK:
+        chat_model = _CHAT_MODELS.get(key)
+        if chat_model is None:
+            chat_model = init_chat_model(model, model_provider=provider, **kwargs)
+            if isinstance(chat_model, BaseChatModel):
+                chat_model = RateLimitedChatModel(model=chat_model, provider=provider)
+            _CHAT_MODELS[key] = chat_model
+    return chat_model
+
+
+def clear_chat_model_cache(fully_specified_name: Optional[str] = None) -> int:
+    """Drop cached chat models so the next load builds a fresh client.
+
+    Args:
+        fully_specified_name (Optional[str]): Only drop models with this
+            'provider/model' name. Drops every cached model when omitted.
+
+    Returns:
+        int: The number of cached models that were dropped.
+    """
+    with _CHAT_MODELS_LOCK:
+        if fully_specified_name is None:
+            keys = list(_CHAT_MODELS)
+        else:
+            provider, model = fully_specified_name.split("/", maxsplit=1)
+            keys = [key for key in _CHAT_MODELS if key[:2] == (provider, model)]
+        for key in keys:
+            del _CHAT_MODELS[key]
+    return len(keys)
 
 
 def dict_to_section(section_dict: Dict[str, Any]) -> Section:
@@ -0,0 +1,146 @@
+"""A small in-process vector index backed by NumPy.
+
+All document embeddings live in one contiguous, L2-normalized float32 matrix,
+so a batch of queries is answered with a single matrix multiply followed by
+`argpartition` to pick each query's top-k.
+"""
+
+from __future__ import annotations
+
+from typing import Sequence
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from web_research_graph.embeddings import CachedEmbeddings
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize the rows of a matrix, leaving zero rows untouched."""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    normalized: np.ndarray = (vectors / norms).astype(np.float32, copy=False)
+    return normalized
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Return the indices of the `k` highest scores per row, best first."""
+    k = min(k, scores.shape[1])
+    candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, candidates, axis=1), axis=1)
+    return np.take_along_axis(candidates, order, axis=1)
+
+
+class VectorIndex:
+    """An exact cosine-similarity index over a fixed set of documents."""
+
+    def __init__(
+        self,
+        documents: Sequence[Document],
+        vectors: np.ndarray,
+        embeddings: Embeddings,
+    ) -> None:
+        """Create an index from documents and their embedding matrix."""
+        if len(documents) != len(vectors):
+            raise ValueError("Every document needs exactly one embedding")
+        self.documents = list(documents)
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.ndim != 2:
+            matrix = matrix.reshape(len(self.documents), -1 if len(matrix) else 0)
+        self.matrix = _normalize(matrix)
+        self.embeddings = embeddings
+
+    @classmethod
+    async def afrom_documents(
+        cls, documents: Sequence[Document], embeddings: Embeddings
+    ) -> VectorIndex:
+        """Embed the documents in one batch and index them."""
+        vectors = (
+            await embeddings.aembed_documents([doc.page_content for doc in documents])
+            if documents
+            else []
+        )
+        return cls(documents, np.asarray(vectors, dtype=np.float32), embeddings)
+
+    def __len__(self) -> int:
+        """Return the number of indexed documents."""
+        return len(self.documents)
+
+    def close(self) -> None:
+        """Do nothing: the index holds no resources besides memory."""
+
+    def search_by_vectors(
+        self,
+        query_vectors: np.ndarray,
+        k: int = 3,
+        mmr: bool = False,
+        fetch_k: int = 20,
+        lambda_mult: float = 0.5,
+    ) -> list[list[Document]]:
+        """Return the top-k documents for each query vector.
+
+        Args:
+            query_vectors (np.ndarray): One query embedding per row.
+            k (int): The number of documents to return per query.
+            mmr (bool): Diversify results with maximal marginal relevance.
+            fetch_k (int): The number of candidates considered by MMR.
+            lambda_mult (float): Trade-off between relevance (1) and diversity (0).
+        """
+        queries = np.atleast_2d(np.asarray(query_vectors, dtype=np.float32))
+        if not self.documents or k <= 0:
+            return [[] for _ in range(len(queries))]
+
+        scores = _normalize(queries) @ self.matrix.T
+        if not mmr:
+            return [
+                [self.documents[i] for i in row] for row in _top_k(scores, k).tolist()
+            ]
+
+        candidates = _top_k(scores, max(k, fetch_k))
+        return [
+            [
+                self.documents[i]
+                for i in self._mmr(scores[row], candidates[row], k, lambda_mult)
+            ]
+            for row in range(len(queries))
+        ]
+
+    def _mmr(
+        self, scores: np.ndarray, candidates: np.ndarray, k: int, lambda_mult: float
+    ) -> list[int]:
+        """Greedily select diverse documents among the candidates."""
+        similarity = self.matrix[candidates] @ self.matrix[candidates].T
+        relevance = scores[candidates]
+        selected: list[int] = [0]
+        while len(selected) < min(k, len(candidates)):
+            redundancy = similarity[:, selected].max(axis=1)
+            mmr_scores = lambda_mult * relevance - (1 - lambda_mult) * redundancy
+            mmr_scores[selected] = -np.inf
+            selected.append(int(np.argmax(mmr_scores)))
+        return [int(candidates[i]) for i in selected]
+
+    async def abatch_search(
+        self,
+        queries: Sequence[str],
+        k: int = 3,
+        mmr: bool = False,
+        fetch_k: int = 20,
+        lambda_mult: float = 0.5,
+    ) -> list[list[Document]]:
+        """Embed all queries in one request and return the top-k for each.
+
+        Queries are sent to the model behind any embedding cache, so they do
+        not fill the cache with one-off texts.
+        """
+        if not queries:
+            return []
+        if not self.documents:
+            return [[] for _ in queries]
+        embeddings = self.embeddings
+        if isinstance(embeddings, CachedEmbeddings):
+            embeddings = embeddings.underlying
+        vectors = await embeddings.aembed_documents(list(queries))
+        return self.search_by_vectors(
+            np.asarray(vectors, dtype=np.float32), k, mmr, fetch_k, lambda_mult
+        )
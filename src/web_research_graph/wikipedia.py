@@ -0,0 +1,117 @@
+"""Cached, deduplicated Wikipedia page lookups.
+
+Loading a page with all of its metadata takes several requests to the
+Wikipedia API, so pages are cached by title and concurrent lookups of the same
+title share a single fetch.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+from typing import Any, Optional, Sequence, Union
+
+from langchain_community.retrievers import WikipediaRetriever
+from langchain_core.documents import Document
+from langchain_core.runnables import RunnableConfig
+
+from web_research_graph.cache import BaseCache, get_cache
+from web_research_graph.configuration import Configuration
+from web_research_graph.telemetry import record_cache_lookup
+
+_retriever: Optional[WikipediaRetriever] = None
+_retriever_lock = threading.Lock()
+# Fetches in progress, keyed by page title cache key
+_inflight: dict[str, asyncio.Task[list[Document]]] = {}
+
+
+def get_wikipedia_retriever() -> WikipediaRetriever:
+    """Return the Wikipedia retriever shared by every lookup."""
+    global _retriever
+    with _retriever_lock:
+        if _retriever is None:
+            _retriever = WikipediaRetriever(  # type: ignore[call-arg]
+                load_all_available_meta=True, top_k_results=1
+            )
+        return _retriever
+
+
+def page_cache_key(title: str) -> str:
+    """Build the cache key for a page title."""
+    return " ".join(title.split()).casefold()
+
+
+def _dump_docs(docs: Sequence[Document]) -> list[dict[str, Any]]:
+    # Metadata may hold values JSON cannot encode, such as dates
+    return [
+        {
+            "page_content": doc.page_content,
+            "metadata": json.loads(json.dumps(doc.metadata, default=str)),
+        }
+        for doc in docs
+    ]
+
+
+def _load_docs(payload: list[dict[str, Any]]) -> list[Document]:
+    return [Document(**doc) for doc in payload]
+
+
+async def _fetch_pages(
+    title: str,
+    semaphore: asyncio.Semaphore,
+    cache: Optional[BaseCache],
+    config: Optional[RunnableConfig],
+) -> list[Document]:
+    """Fetch the pages for a title and store them in the cache."""
+    async with semaphore:
+        docs = await get_wikipedia_retriever().ainvoke(title, config)
+    if cache is not None and docs:
+        cache.set(page_cache_key(title), _dump_docs(docs))
+    return docs
+
+
+async def load_wikipedia_pages(
+    titles: Sequence[str], config: Optional[RunnableConfig] = None
+) -> list[Union[list[Document], BaseException]]:
+    """Load the Wikipedia page for each title, using the page cache.
+
+    Lookups run with at most `max_concurrent_wikipedia_lookups` fetches in
+    flight, and concurrent lookups of the same title share one fetch.
+
+    Returns:
+        The documents for each title, in order, or the exception raised while
+        fetching them.
+    """
+    configuration = Configuration.from_runnable_config(config)
+    cache = get_cache(
+        configuration.wikipedia_cache, "wikipedia", configuration.cache_path
+    )
+    semaphore = asyncio.Semaphore(
+        max(1, configuration.max_concurrent_wikipedia_lookups)
+    )
+    loop = asyncio.get_running_loop()
+
+    async def lookup(title: str) -> list[Document]:
+        key = page_cache_key(title)
+        if cache is not None:
+            entry = cache.get(key)
+            if entry is not None and entry.age < configuration.wikipedia_cache_ttl:
+                await record_cache_lookup("wikipedia", "hit", config)
+                return _load_docs(entry.value)
+            await record_cache_lookup("wikipedia", "miss", config)
+
+        task = _inflight.get(key)
+        if task is None or task.get_loop() is not loop:
+            task = loop.create_task(_fetch_pages(title, semaphore, cache, config))
+            _inflight[key] = task
+            task.add_done_callback(
+                lambda done: _inflight.pop(key) if _inflight.get(key) is done else None
+            )
+        # Shield the shared fetch so one cancelled caller does not cancel the others
+        docs = await asyncio.shield(task)
+        return list(docs)
+
+    return await asyncio.gather(
+        *(lookup(title) for title in titles), return_exceptions=True
+    )
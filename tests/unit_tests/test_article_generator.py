@@ -0,0 +1,266 @@
+import asyncio
+import itertools
+from typing import Any, Optional
+
+import pytest
+from langchain_core.documents import Document
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import Runnable, RunnableLambda
+from langgraph.graph import StateGraph
+
+from web_research_graph.article_assembly import renumber_citations
+from web_research_graph.fts_index import FTSIndex
+from web_research_graph.nodes import article_generator
+from web_research_graph.state import (
+    Outline,
+    Section,
+    State,
+    Subsection,
+    TopicValidation,
+)
+
+# Kept before the fixture replaces it
+generate_section = article_generator.generate_section
+
+OUTLINE = Outline(
+    page_title="Rome",
+    sections=[
+        Section(section_title=title, description="d", subsections=[])
+        for title in ("History", "Culture")
+    ],
+)
+
+
+@pytest.fixture
+def fake_article_models(monkeypatch: pytest.MonkeyPatch) -> None:
+    async def fake_retriever(references: Any, config: Any = None) -> FTSIndex:
+        return FTSIndex([])
+
+    async def fake_docs(
+        index: Any, topic: str, titles: list[str], config: Any = None
+    ) -> list[list[Document]]:
+        return [[] for _ in titles]
+
+    async def fake_section(
+        outline: str, title: str, docs: Any, config: Any = None
+    ) -> Section:
+        # The first section finishes last
+        await asyncio.sleep(0.05 if title == "History" else 0)
+        return Section(
+            section_title=title, description=f"About {title}", subsections=[]
+        )
+
+    def fake_model(name: str, max_tokens: Optional[int] = None) -> Any:
+        # The transition model is the only one limited to 500 tokens
+        text = "Then came culture." if max_tokens == 500 else "Rome was great."
+        return GenericFakeChatModel(messages=itertools.repeat(AIMessage(text)))
+
+    monkeypatch.setattr(article_generator, "create_retriever", fake_retriever)
+    monkeypatch.setattr(article_generator, "retrieve_section_docs", fake_docs)
+    monkeypatch.setattr(article_generator, "generate_section", fake_section)
+    monkeypatch.setattr(article_generator, "load_chat_model", fake_model)
+
+
+@pytest.mark.usefixtures("fake_article_models")
+def test_generate_article_streams_sections_and_tokens() -> None:
+    builder = StateGraph(State)
+    builder.add_node("generate_article", article_generator.generate_article)
+    builder.set_entry_point("generate_article")
+    graph = builder.compile()
+    state = State(
+        topic=TopicValidation(is_valid=True, topic="Rome", message=None),
+        outline=OUTLINE,
+    )
+
+    async def collect() -> list[Any]:
+        return [event async for event in graph.astream(state, stream_mode="custom")]
+
+    events = asyncio.run(collect())
+    sections = [event for event in events if event["type"] == "section"]
+    assert [(e["index"], e["title"]) for e in sections] == [
+        (1, "Culture"),
+        (0, "History"),
+    ]
+    assert sections[0]["markdown"].startswith("## Culture")
+    tokens = [event["content"] for event in events if event["type"] == "article_token"]
+    assert len(tokens) > 1 and "".join(tokens) == "Rome was great."
+    assert events.index(sections[-1]) < events.index(
+        next(e for e in events if e["type"] == "article_token")
+    )
+
+
+def test_renumber_citations_merges_duplicates() -> None:
+    sections = [
+        Section(
+            section_title="A",
+            description="One [1], two [2].",
+            subsections=[Subsection(subsection_title="A1", description="Two [2].")],
+            citations=["http://x", "http://y"],
+        ),
+        Section(
+            section_title="B",
+            description="Y again [1], z [2], unknown [7].",
+            subsections=[],
+            citations=["http://y", "http://z"],
+        ),
+    ]
+    renumbered, citations = renumber_citations(sections)
+    assert citations == ["http://x", "http://y", "http://z"]
+    assert renumbered[0].subsections[0].description == "Two [2]."
+    assert renumbered[1].description == "Y again [2], z [3], unknown [7]."
+    assert all(not section.citations for section in renumbered)
+
+
+@pytest.mark.usefixtures("fake_article_models")
+@pytest.mark.parametrize("assembly", ["deterministic", "boundaries"])
+def test_generate_article_assembles_without_rewrite(assembly: str) -> None:
+    state = State(
+        topic=TopicValidation(is_valid=True, topic="Rome", message=None),
+        outline=OUTLINE,
+    )
+    events: list[Any] = []
+    config: Any = {"configurable": {"article_assembly": assembly}}
+    result = asyncio.run(
+        article_generator.generate_article(state, config, writer=events.append)
+    )
+    article = result["article"]  # type: ignore[index]
+
+    assert article.startswith("# Rome\n\nRome was great.\n\n## History")
+    assert ("Then came culture." in article) == (assembly == "boundaries")
+    assert "About History" in article
+    tokens = [event["content"] for event in events if event["type"] == "article_token"]
+    assert "".join(tokens) == article
+
+
+@pytest.mark.usefixtures("fake_article_models")
+def test_streamed_lead_matches_article_despite_whitespace(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    def padded_model(name: str, max_tokens: Optional[int] = None) -> Any:
+        return GenericFakeChatModel(
+            messages=itertools.repeat(AIMessage("\n  Rome was great.  \n"))
+        )
+
+    monkeypatch.setattr(article_generator, "load_chat_model", padded_model)
+    state = State(
+        topic=TopicValidation(is_valid=True, topic="Rome", message=None),
+        outline=OUTLINE,
+    )
+    events: list[Any] = []
+    config: Any = {"configurable": {"article_assembly": "deterministic"}}
+    result = asyncio.run(
+        article_generator.generate_article(state, config, writer=events.append)
+    )
+    article = result["article"]  # type: ignore[index]
+    assert article.startswith("# Rome\n\nRome was great.\n\n## History")
+    tokens = [event["content"] for event in events if event["type"] == "article_token"]
+    assert "".join(tokens) == article
+
+
+def rome(titles: list[str]) -> State:
+    outline = Outline(
+        page_title="Rome",
+        sections=[
+            Section(section_title=title, description="d", subsections=[])
+            for title in titles
+        ],
+    )
+    return State(
+        topic=TopicValidation(is_valid=True, topic="Rome", message=None),
+        outline=outline,
+    )
+
+
+@pytest.mark.usefixtures("fake_article_models")
+def test_sections_are_capped_and_keep_the_outline_order(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    titles = [f"Part {n}" for n in range(6)]
+    running = peak = 0
+
+    async def counted_section(
+        outline: str, title: str, docs: Any, config: Any = None
+    ) -> Section:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        # Later sections finish first
+        await asyncio.sleep(0.01 * (len(titles) - titles.index(title)))
+        running -= 1
+        return Section(section_title=title, description="x", subsections=[])
+
+    monkeypatch.setattr(article_generator, "generate_section", counted_section)
+    config: Any = {
+        "configurable": {
+            "article_assembly": "deterministic",
+            "max_concurrent_sections": 2,
+        }
+    }
+    result = asyncio.run(article_generator.generate_article(rome(titles), config))
+    article = result["article"]  # type: ignore[index]
+
+    assert peak == 2
+    positions = [article.index(f"## {title}") for title in titles]
+    assert positions == sorted(positions)
+
+
+@pytest.mark.usefixtures("fake_article_models")
+def test_malformed_section_is_retried_on_its_own(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    calls: dict[str, int] = {}
+
+    def write(prompt: Any) -> Any:
+        text = prompt.to_string()
+        title = next(t for t in ("History", "Culture") if f"the {t} section" in text)
+        calls[title] = calls.get(title, 0) + 1
+        if title == "Culture" and calls[title] == 1:
+            return "not a section"
+        return Section(section_title=title, description="x", subsections=[])
+
+    class SectionWriter:
+        def with_structured_output(self, schema: Any) -> Runnable:
+            return RunnableLambda(write)
+
+    fake_model = article_generator.load_chat_model
+    monkeypatch.setattr(article_generator, "generate_section", generate_section)
+    monkeypatch.setattr(
+        article_generator,
+        "load_chat_model",
+        lambda name, max_tokens=None: (
+            SectionWriter() if max_tokens == 2000 else fake_model(name, max_tokens)
+        ),
+    )
+    config: Any = {"configurable": {"article_assembly": "deterministic"}}
+    result = asyncio.run(
+        article_generator.generate_article(rome(["History", "Culture"]), config)
+    )
+
+    assert calls == {"History": 1, "Culture": 2}
+    assert "## Culture" in result["article"]  # type: ignore[index]
+
+
+@pytest.mark.usefixtures("fake_article_models")
+def test_failed_section_cancels_the_others(monkeypatch: pytest.MonkeyPatch) -> None:
+    cancelled: list[str] = []
+
+    async def failing_section(
+        outline: str, title: str, docs: Any, config: Any = None
+    ) -> Section:
+        if title == "History":
+            raise RuntimeError("out of retries")
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(title)
+            raise
+        return Section(section_title=title, description="x", subsections=[])
+
+    monkeypatch.setattr(article_generator, "generate_section", failing_section)
+
+    with pytest.raises(RuntimeError, match="out of retries"):
+        asyncio.run(
+            article_generator.generate_article(rome(["History", "Culture"]), {})
+        )
+    assert cancelled == ["Culture"]
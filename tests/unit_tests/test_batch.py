@@ -0,0 +1,102 @@
+import asyncio
+from pathlib import Path
+from typing import Any, Optional
+
+import pytest
+
+from benchmarks.fakes import INSTANT, fake_backends
+from web_research_graph import batch, references
+from web_research_graph import graph as graph_module
+from web_research_graph.batch import load_manifest, read_topics, run_batch
+from web_research_graph.graph import create_graph
+
+
+def test_read_topics_skips_comments_and_duplicates(tmp_path: Path) -> None:
+    path = tmp_path / "topics.txt"
+    path.write_text("# nightly\nRoman Empire\n\nPhotosynthesis\nRoman Empire\n")
+    assert read_topics(str(path)) == ["Roman Empire", "Photosynthesis"]
+
+
+def test_batch_writes_articles_and_resumes(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    output_dir = str(tmp_path / "articles")
+    topics = ["Roman Empire", "Photosynthesis", "Jazz in New Orleans"]
+    research = batch._research
+
+    async def flaky_research(graph: Any, topic: str, *args: Any) -> Optional[str]:
+        if topic == "Photosynthesis":
+            raise RuntimeError("provider down")
+        return await research(graph, topic, *args)
+
+    monkeypatch.setattr(batch, "_research", flaky_research)
+    configurable = {"cache_path": str(tmp_path / "cache.sqlite")}
+    with fake_backends(INSTANT):
+        first = asyncio.run(run_batch(topics, output_dir, configurable))
+        assert {(r.topic, r.status) for r in first} == {
+            ("Roman Empire", "done"),
+            ("Photosynthesis", "failed"),
+            ("Jazz in New Orleans", "done"),
+        }
+        done = next(r for r in first if r.topic == "Roman Empire")
+        assert (Path(output_dir) / str(done.path)).read_text()
+
+        monkeypatch.setattr(batch, "_research", research)
+        second = asyncio.run(run_batch(topics, output_dir, configurable))
+
+    assert [(r.topic, r.status) for r in second] == [("Photosynthesis", "done")]
+    assert {r.status for r in load_manifest(output_dir).values()} == {"done"}
+
+
+def test_checkpoints_resume_a_topic_from_its_last_step(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    pytest.importorskip("langgraph.checkpoint.sqlite")
+    output_dir = str(tmp_path / "articles")
+    configurable = {
+        "cache_path": str(tmp_path / "cache.sqlite"),
+        "search_cache": "none",
+    }
+    generate_article = graph_module.generate_article
+
+    async def failing_article(*args: Any, **kwargs: Any) -> Any:
+        raise RuntimeError("provider down")
+
+    async def run(resume: bool = True) -> list[batch.BatchResult]:
+        async with batch.open_checkpointer(output_dir) as checkpointer:
+            return await run_batch(
+                ["Roman Empire"],
+                output_dir,
+                configurable,
+                resume=resume,
+                checkpointer=checkpointer,
+            )
+
+    async def thread_values(thread_id: str) -> dict[str, Any]:
+        async with batch.open_checkpointer(output_dir) as checkpointer:
+            graph = create_graph(interactive=False, checkpointer=checkpointer)
+            config: Any = {"configurable": {"thread_id": thread_id}}
+            return dict((await graph.aget_state(config)).values)
+
+    with fake_backends(INSTANT) as fakes:
+        monkeypatch.setattr(graph_module, "generate_article", failing_article)
+        assert [r.status for r in asyncio.run(run())] == ["failed"]
+        searches = fakes["search"].calls
+        assert searches
+        # The process-wide chunk store is put back once the batch is over
+        assert references._chunk_store is None
+
+        # A new process resumes at the article, without interviewing again
+        monkeypatch.setattr(graph_module, "generate_article", generate_article)
+        assert [r.status for r in asyncio.run(run())] == ["done"]
+        assert fakes["search"].calls == searches
+
+        # Starting over researches the topic again on a thread of its own
+        assert [r.status for r in asyncio.run(run(resume=False))] == ["done"]
+        assert fakes["search"].calls == 2 * searches
+
+    slug = batch.topic_slug("Roman Empire")
+    first = asyncio.run(thread_values(slug))
+    second = asyncio.run(thread_values(f"{slug}-2"))
+    assert len(second["messages"]) == len(first["messages"])
+    assert len(second["references"]) == len(first["references"])
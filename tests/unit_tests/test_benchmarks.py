@@ -0,0 +1,19 @@
+import asyncio
+
+from benchmarks.fakes import INSTANT
+from benchmarks.run import run_benchmark
+
+
+def test_benchmark_runs_the_full_graph_offline() -> None:
+    results = asyncio.run(
+        run_benchmark(["Roman Empire"], INSTANT, measure_memory=False)
+    )
+    (run,) = results["runs"]
+    assert run["article_chars"] > 0
+    assert run["llm_calls"] == sum(n["llm_calls"] for n in run["nodes"].values())
+    assert run["prompt_tokens"] > 0 and run["completion_tokens"] > 0
+    assert {"validate_topic", "conduct_interviews", "generate_article"} <= set(
+        run["nodes"]
+    )
+    assert results["backend_calls"]["search"] > 0
+    assert results["summary"]["latency_seconds"]["median"] == run["latency_seconds"]
@@ -0,0 +1,89 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+from langchain_core.messages import AIMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import StateGraph
+from typing_extensions import Annotated
+
+from web_research_graph.blobs import (
+    BlobSerializer,
+    InMemoryBlobStore,
+    SQLiteBlobStore,
+    blob_key,
+)
+from web_research_graph.references import ReferenceChannel, ReferenceStore
+from web_research_graph.state import Outline, Section
+
+LONG = "A long reference body. " * 50
+
+
+def test_sqlite_blob_store_is_content_addressed(tmp_path: Path) -> None:
+    path = str(tmp_path / "blobs.sqlite")
+    store = SQLiteBlobStore(path)
+    key = store.put(b"body")
+    assert key == blob_key(b"body")
+    assert store.put(b"body") == key
+    store.close()
+
+    reopened = SQLiteBlobStore(path)
+    assert reopened.get(key) == b"body"
+    assert reopened.get_many([key, "missing"]) == {key: b"body"}
+
+
+def test_blob_serializer_moves_long_strings_out_of_line() -> None:
+    store = InMemoryBlobStore()
+    serde = BlobSerializer(store)
+    value: Any = {
+        "references": [["https://a.example", LONG], ["https://b.example", "short"]],
+        "message": AIMessage(content=LONG, name="expert"),
+        "outline": Outline(
+            page_title="T",
+            sections=[Section(section_title="S", description=LONG, subsections=[])],
+        ),
+        "article": LONG,
+    }
+
+    type_, data = serde.dumps_typed(value)
+    assert LONG.encode() not in data
+    assert len(store) == 1
+
+    restored = serde.loads_typed((type_, data))
+    assert restored == value
+    assert isinstance(restored["message"], AIMessage)
+    assert serde.dumps_typed(value) == (type_, data)
+
+
+@dataclass
+class _State:
+    references: Annotated[ReferenceStore, ReferenceChannel] = field(
+        default_factory=ReferenceStore
+    )
+    article: Optional[str] = None
+
+
+def test_checkpoints_keep_only_blob_references() -> None:
+    def research(state: _State) -> dict:
+        return {"references": {f"https://{i}.example": f"{i} {LONG}" for i in range(3)}}
+
+    def write(state: _State) -> dict:
+        return {"article": LONG}
+
+    builder = StateGraph(_State)
+    builder.add_node("research", research)
+    builder.add_node("write", write)
+    builder.add_edge("__start__", "research")
+    builder.add_edge("research", "write")
+    store = InMemoryBlobStore()
+    saver = MemorySaver(serde=BlobSerializer(store))
+    graph = builder.compile(checkpointer=saver)
+    config: Any = {"configurable": {"thread_id": "1"}}
+
+    graph.invoke({}, config)
+
+    assert len(store) == 4
+    assert all(LONG.encode() not in blob for blob in saver.blobs.values())
+    state = graph.get_state(config).values
+    assert state["article"] == LONG
+    assert state["references"]["https://1.example"] == f"1 {LONG}"
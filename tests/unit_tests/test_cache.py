@@ -0,0 +1,57 @@
+import asyncio
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from web_research_graph import tools
+from web_research_graph.cache import InMemoryCache, SQLiteCache
+
+
+def test_in_memory_cache_evicts_least_recently_used() -> None:
+    cache = InMemoryCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") is not None
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert [cache.get(k).value for k in ("a", "c")] == [1, 3]  # type: ignore[union-attr]
+
+
+def test_sqlite_cache_persists_across_connections(tmp_path: Path) -> None:
+    path = str(tmp_path / "cache.sqlite")
+    cache = SQLiteCache(path, namespace="search")
+    cache.set("q", [{"link": "http://a", "snippet": "s"}])
+    cache.close()
+
+    reopened = SQLiteCache(path, namespace="search")
+    entry = reopened.get("q")
+    assert entry is not None and entry.value == [{"link": "http://a", "snippet": "s"}]
+    assert SQLiteCache(path, namespace="other").get("q") is None
+
+
+def test_search_reuses_cached_results(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls: list[str] = []
+
+    async def fake_run_search(
+        query: str, max_results: int, timeout: float
+    ) -> list[dict[str, Any]]:
+        calls.append(query)
+        return [{"link": "http://a", "snippet": query}]
+
+    monkeypatch.setattr(tools, "_run_search", fake_run_search)
+    monkeypatch.setattr(tools, "load_chat_model", lambda *a, **k: None)
+    config: Any = {"configurable": {"search_cache": "memory"}}
+
+    first = asyncio.run(tools.search("Cat  breeds?", config=config))
+    second = asyncio.run(tools.search("cat breeds", config=config))
+    assert first == second
+    assert calls == ["Cat  breeds?"]
+
+
+def test_sqlite_cache_evicts_oldest_entries(tmp_path: Path) -> None:
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite"), maxsize=2)
+    for key in ("a", "b", "c"):
+        cache.set(key, key)
+    assert cache.get("a") is None
+    assert [cache.get(k).value for k in ("b", "c")] == ["b", "c"]  # type: ignore[union-attr]
@@ -0,0 +1,35 @@
+import asyncio
+from pathlib import Path
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from web_research_graph.embeddings import CachedEmbeddings, EmbeddingStore
+
+
+class CountingEmbedding(DeterministicFakeEmbedding):
+    calls: list[list[str]] = []
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.calls.append(list(texts))
+        return super().embed_documents(texts)
+
+
+def test_cached_embeddings_only_embed_misses(tmp_path: Path) -> None:
+    underlying = CountingEmbedding(size=8)
+    store = EmbeddingStore(str(tmp_path / "embeddings.sqlite"))
+    embeddings = CachedEmbeddings(underlying, "fake", store)
+
+    first = embeddings.embed_documents(["a", "b", "a"])
+    second = asyncio.run(embeddings.aembed_documents(["b", "c"]))
+
+    assert underlying.calls == [["a", "b"], ["c"]]
+    assert first[0] == first[2]
+    assert second[0] == first[1]
+    assert len(store) == 3
+
+
+def test_embedding_store_is_keyed_by_model(tmp_path: Path) -> None:
+    store = EmbeddingStore(str(tmp_path / "embeddings.sqlite"))
+    store.put_many("m1", {"h": [0.5, 0.25]})
+    assert store.get_many("m1", ["h"]) == {"h": [0.5, 0.25]}
+    assert store.get_many("m2", ["h"]) == {}
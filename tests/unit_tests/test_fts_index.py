@@ -0,0 +1,123 @@
+import asyncio
+import sqlite3
+from typing import Any
+
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from web_research_graph.fts_index import (
+    FTSIndex,
+    HybridIndex,
+    fts_query,
+    reciprocal_rank_fusion,
+)
+from web_research_graph.nodes import article_generator
+from web_research_graph.vector_index import VectorIndex
+
+DOCS = [
+    Document(page_content=text, metadata={"source": f"https://example.com/{n}"})
+    for n, text in enumerate(
+        [
+            "Roman aqueducts carried water into the city.",
+            "The legions defended the frontier of the empire.",
+            "Aqueduct engineering relied on gentle gradients.",
+            "Gladiators fought in the amphitheatre.",
+        ]
+    )
+]
+
+
+class FailingEmbeddings(DeterministicFakeEmbedding):
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        raise ConnectionError("Ollama is not running")
+
+
+def contents(docs: list[Document]) -> list[str]:
+    return [doc.page_content for doc in docs]
+
+
+def test_fts_query_quotes_terms() -> None:
+    assert fts_query('What about "Rome" OR Carthage?') == '"rome" OR "carthage"'
+    assert fts_query("What is it?") == ""
+
+
+def test_bm25_ranks_stemmed_matches() -> None:
+    index = FTSIndex(DOCS)
+    results = asyncio.run(index.abatch_search(["aqueduct water", "the"], k=2))
+    assert contents(results[0]) == [DOCS[0].page_content, DOCS[2].page_content]
+    assert results[1] == []
+
+
+def test_reciprocal_rank_fusion_favours_agreement() -> None:
+    a, b, c = DOCS[:3]
+    assert reciprocal_rank_fusion([[a, b, c], [b, c]], k=2) == [b, c]
+
+
+def test_hybrid_fuses_rankings_and_falls_back_to_bm25() -> None:
+    # The vector ranking puts the gladiators first, BM25 ignores them, so
+    # the fusion interleaves the best of both
+    vectors = np.array([[0.0, 1.0], [0.1, 1.0], [0.0, 1.0], [1.0, 0.0]])
+
+    class Query(DeterministicFakeEmbedding):
+        async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+            return [[1.0, 0.0] for _ in texts]
+
+    hybrid = HybridIndex(FTSIndex(DOCS), VectorIndex(DOCS, vectors, Query(size=2)))
+    results = asyncio.run(hybrid.abatch_search(["aqueduct water"], k=2, fetch_k=2))
+    assert contents(results[0]) == [DOCS[0].page_content, DOCS[3].page_content]
+
+    hybrid.vector = VectorIndex(DOCS, vectors, FailingEmbeddings(size=2))
+    with pytest.warns(RuntimeWarning, match="BM25 only"):
+        results = asyncio.run(hybrid.abatch_search(["aqueduct water"], k=2))
+    assert contents(results[0]) == [DOCS[0].page_content, DOCS[2].page_content]
+
+
+def test_create_retriever_backends(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(
+        article_generator,
+        "load_embeddings",
+        lambda configuration: FailingEmbeddings(size=2),
+    )
+    references = {doc.metadata["source"]: doc.page_content for doc in DOCS}
+
+    def create(backend: str) -> Any:
+        config: Any = {"configurable": {"retrieval_backend": backend}}
+        return asyncio.run(article_generator.create_retriever(references, config))
+
+    assert isinstance(create("bm25"), FTSIndex)
+    with pytest.warns(RuntimeWarning, match="BM25 only"):
+        hybrid = create("hybrid")
+    assert isinstance(hybrid, HybridIndex) and hybrid.vector is None
+    with pytest.raises(ConnectionError):
+        create("vector")
+    with pytest.raises(ValueError, match="Unknown retrieval backend"):
+        create("semantic")
+
+
+def test_hybrid_retriever_without_fts5_uses_embeddings(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    def no_fts5(documents: Any) -> FTSIndex:
+        raise sqlite3.OperationalError("no such module: fts5")
+
+    monkeypatch.setattr(article_generator, "FTSIndex", no_fts5)
+    monkeypatch.setattr(
+        article_generator,
+        "load_embeddings",
+        lambda configuration: DeterministicFakeEmbedding(size=2),
+    )
+    references = {doc.metadata["source"]: doc.page_content for doc in DOCS}
+    config: Any = {"configurable": {"retrieval_backend": "hybrid"}}
+
+    with pytest.warns(RuntimeWarning, match="embeddings only"):
+        index = asyncio.run(article_generator.create_retriever(references, config))
+    assert isinstance(index, VectorIndex) and len(index) == len(DOCS)
+
+
+def test_closed_index_releases_its_connection() -> None:
+    index = FTSIndex(DOCS)
+    index.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        index.search("aqueduct", 1)
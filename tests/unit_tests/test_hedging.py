@@ -0,0 +1,134 @@
+import asyncio
+import time
+from collections.abc import AsyncIterator
+from typing import Any, Optional
+
+import pytest
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from benchmarks.fakes import FakeChatModel, FakeSettings
+from web_research_graph import hedging
+from web_research_graph.hedging import HedgedChatModel, LatencyTracker
+from web_research_graph.state import RelatedTopics
+
+
+class DelayedModel(BaseChatModel):
+    answer: str
+    delay: float = 0.0
+    fail: bool = False
+    calls: int = 0
+    cancelled: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "delayed"
+
+    def _generate(self, messages: Any, stop: Any = None, **kwargs: Any) -> ChatResult:
+        raise NotImplementedError
+
+    async def _wait(self) -> None:
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.fail:
+            raise RuntimeError(f"{self.answer} failed")
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        await self._wait()
+        return ChatResult(
+            generations=[ChatGeneration(message=AIMessage(content=self.answer))]
+        )
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        await self._wait()
+        for word in self.answer.split():
+            yield ChatGenerationChunk(message=AIMessageChunk(content=f"{word} "))
+
+
+@pytest.fixture(autouse=True)
+def reset_trackers() -> Any:
+    yield
+    hedging._TRACKERS.clear()
+
+
+def hedged(primary: BaseChatModel, backup: BaseChatModel) -> HedgedChatModel:
+    return HedgedChatModel(
+        primary=primary,
+        backup=backup,
+        primary_name="groq/primary",
+        backup_name="anthropic/backup",
+        initial_delay=0.05,
+    )
+
+
+def test_latency_tracker_percentile() -> None:
+    tracker = LatencyTracker()
+    for seconds in range(1, 101):
+        tracker.observe(seconds / 100)
+    assert tracker.percentile(0.95) == 0.95
+    assert LatencyTracker().percentile(0.5) is None
+
+
+def test_fast_primary_is_not_hedged() -> None:
+    primary, backup = DelayedModel(answer="primary"), DelayedModel(answer="backup")
+    result = asyncio.run(hedged(primary, backup).ainvoke("hi"))
+    assert result.content == "primary"
+    assert backup.calls == 0
+
+
+def test_slow_primary_is_hedged_and_cancelled() -> None:
+    primary = DelayedModel(answer="primary", delay=5)
+    backup = DelayedModel(answer="backup answer")
+    model = hedged(primary, backup)
+
+    start = time.monotonic()
+    result = asyncio.run(model.ainvoke("hi"))
+    assert result.content == "backup answer"
+    assert time.monotonic() - start < 1
+    assert primary.cancelled == 1
+
+    async def stream() -> str:
+        return "".join([str(chunk.content) async for chunk in model.astream("hi")])
+
+    assert asyncio.run(stream()) == "backup answer "
+    assert primary.cancelled == 2
+
+
+def test_failing_primary_falls_back_at_once() -> None:
+    primary = DelayedModel(answer="primary", fail=True)
+    backup = DelayedModel(answer="backup")
+    model = HedgedChatModel(
+        primary=primary,
+        backup=backup,
+        primary_name="groq/primary",
+        backup_name="anthropic/backup",
+        initial_delay=5,
+    )
+    assert asyncio.run(model.ainvoke("hi")).content == "backup"
+
+    backup.fail = True
+    with pytest.raises(RuntimeError, match="primary failed"):
+        asyncio.run(model.ainvoke("hi"))
+
+
+def test_structured_output_uses_the_tools_of_each_model() -> None:
+    primary = FakeChatModel(settings=FakeSettings(model_latency=5))
+    backup = FakeChatModel(settings=FakeSettings(model_latency=0))
+    chain = hedged(primary, backup).with_structured_output(RelatedTopics)
+    result = asyncio.run(chain.ainvoke("Topic of interest: Roman Empire"))
+    assert isinstance(result, RelatedTopics) and result.topics
@@ -0,0 +1,201 @@
+import asyncio
+import itertools
+from typing import Any
+
+import pytest
+from langchain_core.language_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langgraph.graph import StateGraph
+
+from web_research_graph.configuration import Configuration
+from web_research_graph.interviews_graph import interview_graph, session
+from web_research_graph.interviews_graph.answers_graph.nodes import generate, search
+from web_research_graph.interviews_graph.nodes import question
+from web_research_graph.interviews_graph.router import (
+    dispatch_interviews,
+    information_gain,
+    route_messages,
+)
+from web_research_graph.references import ReferenceStore
+from web_research_graph.state import (
+    Editor,
+    EditorInterviewState,
+    InterviewState,
+    Outline,
+    Perspectives,
+    Section,
+    State,
+    TopicValidation,
+)
+
+EDITOR = Editor(affiliation="Uni", name="Ada L", role="Historian", description="d")
+
+
+def test_dispatch_interviews_gives_each_editor_a_private_transcript() -> None:
+    state = InterviewState(
+        topic=TopicValidation(is_valid=True, topic="Cats", message=None),
+        editors=[EDITOR, EDITOR],
+        references=ReferenceStore({"https://cats.example": "Cats purr"}),
+    )
+    sends = dispatch_interviews(state)
+    assert [send.node for send in sends] == ["interview_editor"] * 2
+    assert [send.arg["editor_index"] for send in sends] == [0, 1]
+    first, second = (send.arg["interview"] for send in sends)
+    assert first is not second
+    assert len(first) == 1 and first[0].name == "expert"
+    assert all(send.arg["references"] is state.references for send in sends)
+    assert sends[0].arg["reference_counts"] == [1]
+
+
+def test_route_messages_alternates_until_max_turns() -> None:
+    opening = AIMessage(content="So?", name="expert")
+    question = AIMessage(content="Why?", name="Ada_L")
+    answer = AIMessage(content="Because.", name="expert")
+
+    config: Any = {"configurable": {"interview_min_information_gain": 0}}
+
+    state = EditorInterviewState(editor=EDITOR, interview=[opening])
+    assert route_messages(state, config) == "ask_question"
+    state.interview.append(question)
+    assert route_messages(state, config) == "answer_question"
+    state.interview.append(answer)
+    assert route_messages(state, config) == "ask_question"
+
+    max_turns = Configuration().max_interview_turns
+    state.interview.extend([question, answer] * (max_turns - 1))
+    assert route_messages(state, config) == "end"
+
+
+def test_route_messages_ends_when_editor_says_thanks() -> None:
+    state = EditorInterviewState(
+        editor=EDITOR,
+        interview=[
+            AIMessage(content="So?", name="expert"),
+            AIMessage(content="Thank you so much for your help!", name="Ada_L"),
+        ],
+    )
+    assert route_messages(state) == "end"
+
+
+def test_route_messages_stops_once_answers_bring_nothing_new() -> None:
+    outline = Outline(
+        page_title="Cats",
+        sections=[
+            Section(
+                section_title="Domestication",
+                description="Origins in the Fertile Crescent and spread by trade.",
+                subsections=[],
+            )
+        ],
+    )
+    state = EditorInterviewState(
+        editor=EDITOR,
+        topic=TopicValidation(is_valid=True, topic="Cats", message=None),
+        outline=outline,
+        interview=[
+            AIMessage(content="So?", name="expert"),
+            AIMessage(content="Where were cats domesticated?", name="Ada_L"),
+            AIMessage(
+                content="Cats were domesticated in the Fertile Crescent.",
+                name="expert",
+            ),
+        ],
+        reference_counts=[2],
+    )
+    config: Any = {"configurable": {"interview_min_information_gain": 3}}
+    # Two new references and the outline terms "cats", "fertile" and "crescent"
+    assert information_gain(state) == 5
+    assert route_messages(state, config) == "ask_question"
+
+    state.interview.extend(
+        [
+            AIMessage(content="Tell me more?", name="Ada_L"),
+            AIMessage(
+                content="Again, cats come from the Fertile Crescent.", name="expert"
+            ),
+        ]
+    )
+    state.reference_counts.append(3)
+    assert information_gain(state) == 1
+    assert route_messages(state, config) == "end"
+    # Early stopping is off by default
+    assert route_messages(state) == "ask_question"
+
+
+def test_empty_answer_is_replaced_so_the_interview_goes_on(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    empty = GenericFakeChatModel(messages=itertools.repeat(AIMessage(content="")))
+    monkeypatch.setattr(generate, "load_hedged_chat_model", lambda *args: empty)
+    state = EditorInterviewState(
+        editor=EDITOR,
+        interview=[
+            AIMessage(content="So?", name="expert"),
+            AIMessage(content="Why?", name="Ada_L"),
+        ],
+    )
+
+    update: Any = asyncio.run(generate.generate_expert_answer(state, {}))
+
+    assert update["interview"].content == generate.NO_ANSWER
+    state.interview.append(update["interview"])
+    assert route_messages(state) == "ask_question"
+
+
+def test_interviews_merge_back_into_the_research_state(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    asks = GenericFakeChatModel(messages=itertools.repeat(AIMessage(content="Why?")))
+    answers = GenericFakeChatModel(
+        messages=itertools.repeat(AIMessage(content="Because."))
+    )
+    monkeypatch.setattr(question, "load_hedged_chat_model", lambda *args: asks)
+    monkeypatch.setattr(generate, "load_hedged_chat_model", lambda *args: answers)
+
+    running = peak = searches = 0
+
+    async def fake_search(query: str, *, config: Any = None) -> list[dict[str, str]]:
+        nonlocal running, peak, searches
+        running += 1
+        searches += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return [{"link": f"https://{searches}.example", "snippet": f"Page {searches}"}]
+
+    monkeypatch.setattr(search, "search", fake_search)
+
+    builder = StateGraph(State)
+    builder.add_node("conduct_interviews", interview_graph)
+    builder.set_entry_point("conduct_interviews")
+    graph = builder.compile()
+    editors = [
+        EDITOR,
+        Editor(affiliation="Uni", name="Bob", role="Poet", description="d"),
+    ]
+    config: Any = {
+        "configurable": {
+            "max_interview_turns": 1,
+            "max_concurrent_interviews": 1,
+            "dedup_questions": False,
+        }
+    }
+
+    result = asyncio.run(
+        graph.ainvoke(
+            {
+                "topic": TopicValidation(is_valid=True, topic="Cats", message=None),
+                "perspectives": Perspectives(editors=editors),
+            },
+            config,
+        )
+    )
+
+    # Both transcripts and every page found are merged into the parent state
+    names = [message.name for message in result["messages"]]
+    assert names.count("Ada_L") == names.count("Bob") == 1
+    assert names.count("expert") == 4
+    assert sorted(result["references"]) == ["https://1.example", "https://2.example"]
+    # One interview at a time, and the run's session is closed at the end
+    assert peak == 1
+    assert not session._SESSIONS
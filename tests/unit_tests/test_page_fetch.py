@@ -0,0 +1,288 @@
+import asyncio
+import threading
+import time
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from web_research_graph import page_fetch
+from web_research_graph.interviews_graph.answers_graph.nodes import search as node
+from web_research_graph.interviews_graph.session import close_session
+from web_research_graph.page_fetch import PageFetcher, html_to_text
+from web_research_graph.references import ReferenceStore, page_url, passage_url
+from web_research_graph.state import Editor, EditorInterviewState
+from web_research_graph.text import split_passages
+
+PARAGRAPH = (
+    "The Roman aqueducts carried water from distant springs into the cities, "
+    "using gentle gradients over long distances and arches across valleys."
+)
+ARTICLE = f"""<html><head><title>Aqueducts</title><script>var x = 1;</script></head>
+<body><nav>Home | About</nav><main><h1>Aqueducts</h1>
+<p>{PARAGRAPH}</p><p>{PARAGRAPH.replace("Roman", "Greek")}</p></main>
+<footer>Copyright</footer></body></html>"""
+# A page on several subjects, one paragraph each
+SUBJECTS = [
+    "The aqueducts carried fresh water from distant springs into the city "
+    "fountains, public baths and private houses of the wealthiest citizens.",
+    "The legions marched on paved roads that linked the provinces to the "
+    "capital, building forts and camps at every day's march along the way.",
+    "The senators debated new laws in the curia before the consuls enacted "
+    "them, and the assemblies of the people voted on them in the forum.",
+]
+LONG_PAGE = "\n\n".join(SUBJECTS)
+
+
+class Handler(BaseHTTPRequestHandler):
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def do_GET(self) -> None:
+        with Handler.lock:
+            Handler.active += 1
+            Handler.peak = max(Handler.peak, Handler.active)
+        try:
+            time.sleep(0.05)
+            if self.path.startswith("/article"):
+                self._send("text/html; charset=utf-8", ARTICLE.encode())
+            elif self.path == "/long":
+                self._send("text/plain", LONG_PAGE.encode())
+            elif self.path == "/huge":
+                self._send("text/plain", b"word " * 100_000)
+            elif self.path == "/image":
+                self._send("image/png", b"\x89PNG")
+            elif self.path == "/redirect":
+                self.send_response(302)
+                self.send_header("Location", "http://127.0.0.2:1/article")
+                self.end_headers()
+            else:
+                self.send_error(404)
+        finally:
+            with Handler.lock:
+                Handler.active -= 1
+
+    def _send(self, content_type: str, body: bytes) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+
+@pytest.fixture
+def server() -> Iterator[str]:
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    Handler.peak = 0
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_html_to_text_keeps_main_content() -> None:
+    assert html_to_text(ARTICLE).split("\n\n") == [
+        "Aqueducts",
+        PARAGRAPH,
+        PARAGRAPH.replace("Roman", "Greek"),
+    ]
+
+
+def test_split_passages_packs_paragraphs_within_budget() -> None:
+    passages = split_passages("\n\n".join([PARAGRAPH] * 5), max_tokens=80)
+    assert len(passages) == 3
+    assert passages[0] == f"{PARAGRAPH} {PARAGRAPH}"
+
+
+def test_passage_urls_are_distinct_references() -> None:
+    url = "https://example.com/aqueducts"
+    store = ReferenceStore({url: "snippet", passage_url(url, 1): "first passage"})
+    assert len(store) == 2
+    assert store.page_count == 1
+    assert page_url(passage_url(url, 1)) == url
+
+
+def test_fetcher_limits_hosts_caps_size_and_skips_other_types(server: str) -> None:
+    async def run() -> list[Any]:
+        async with PageFetcher(
+            max_per_host=2, max_bytes=1000, allow_private=True
+        ) as fetcher:
+            pages = await asyncio.gather(
+                *(fetcher.fetch(f"{server}/article/{n}") for n in range(6)),
+                fetcher.fetch(f"{server}/huge"),
+                fetcher.fetch(f"{server}/image"),
+                fetcher.fetch(f"{server}/missing"),
+                fetcher.fetch(f"{server}/article/0"),
+            )
+            return [*pages, await fetcher.fetch_passages(f"{server}/article/0")]
+
+    *pages, huge, image, missing, again, passages = asyncio.run(run())
+    assert Handler.peak == 2
+    assert all(page == (ARTICLE, True) for page in pages)
+    assert huge is not None and len(huge[0]) == 1000 and huge[1] is False
+    assert image is None and missing is None
+    assert again == pages[0]
+    assert passages == [
+        (1, f"Aqueducts {PARAGRAPH} {PARAGRAPH.replace('Roman', 'Greek')}")
+    ]
+
+
+def test_failed_pages_are_counted_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    outcomes: list[str] = []
+
+    class Counter:
+        def add(self, amount: int, attributes: dict[str, str]) -> None:
+            outcomes.append(attributes["outcome"])
+
+    monkeypatch.setattr(page_fetch, "_page_fetches", Counter())
+
+    async def run() -> list[Any]:
+        async with PageFetcher(timeout=2, allow_private=True) as fetcher:
+            # Nothing listens on port 1
+            return [await fetcher.fetch("http://127.0.0.1:1/page") for _ in range(3)]
+
+    assert asyncio.run(run()) == [None] * 3
+    assert outcomes == ["failed"]
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "http://127.0.0.1/admin",
+        "http://localhost:8080/",
+        "http://10.0.0.5/",
+        "http://[::1]/",
+        "http://[::ffff:192.168.0.1]/",
+        "http://169.254.169.254/latest/meta-data/",
+        "http://224.0.0.1/",
+        "ftp://example.com/file",
+    ],
+)
+def test_urls_that_are_not_public_are_blocked(url: str) -> None:
+    with pytest.raises(page_fetch.BlockedURLError):
+        asyncio.run(page_fetch.check_public_url(url))
+
+
+def test_public_addresses_are_allowed() -> None:
+    asyncio.run(page_fetch.check_public_url("https://93.184.215.14/page"))
+    assert page_fetch.is_public_address("2606:4700::1111")
+
+
+def test_fetcher_blocks_private_pages_and_redirects(
+    server: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    outcomes: list[str] = []
+
+    class Counter:
+        def add(self, amount: int, attributes: dict[str, str]) -> None:
+            outcomes.append(attributes["outcome"])
+
+    monkeypatch.setattr(page_fetch, "_page_fetches", Counter())
+
+    async def run() -> list[Any]:
+        async with PageFetcher(timeout=2) as fetcher:
+            blocked = await fetcher.fetch(f"{server}/article/0")
+            # Only the test server counts as public, not where it redirects
+            monkeypatch.setattr(
+                page_fetch, "is_public_address", lambda address: address == "127.0.0.1"
+            )
+            return [blocked, await fetcher.fetch(f"{server}/redirect")]
+
+    assert asyncio.run(run()) == [None, None]
+    assert outcomes == ["blocked", "blocked"]
+
+
+def test_extract_executor_can_be_shut_down() -> None:
+    executor = page_fetch.get_extract_executor()
+    assert page_fetch.get_extract_executor() is executor
+    page_fetch.shutdown_extract_executor()
+    assert page_fetch._extract_executor is None
+    page_fetch.shutdown_extract_executor()
+    assert page_fetch.get_extract_executor() is not executor
+
+
+def interview_config(**configurable: Any) -> Any:
+    """Return the config of a search node run by the interview graph."""
+    namespace = "interview_editor:1|answer_question:1|search_context:1"
+    return {
+        "configurable": {
+            "checkpoint_ns": namespace,
+            "fetch_pages": True,
+            # The test server listens on a loopback address
+            "fetch_private_hosts": True,
+            **configurable,
+        }
+    }
+
+
+def ask(question: str) -> EditorInterviewState:
+    editor = Editor(affiliation="Uni", name="Ada", role="r", description="d")
+    return EditorInterviewState(
+        editor=editor,
+        interview=[
+            AIMessage(content="So?", name="expert"),
+            AIMessage(content=question, name="Ada"),
+        ],
+    )
+
+
+def test_search_node_stores_page_passages(
+    server: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    link = f"{server}/article/1"
+
+    async def fake_search(query: str, *, config: Any) -> list[dict[str, Any]]:
+        return [
+            {"link": link, "snippet": "Aqueducts"},
+            {"link": f"{server}/missing", "snippet": "Gone"},
+        ]
+
+    monkeypatch.setattr(node, "search", fake_search)
+    state = ask("How were aqueducts built?")
+
+    async def run() -> Any:
+        config = interview_config()
+        try:
+            return await node.search_for_context(state, config)
+        finally:
+            await close_session(config)
+
+    references = asyncio.run(run())["references"]
+    assert list(references) == [link, f"{server}/missing", passage_url(link, 1)]
+
+
+def test_questions_on_one_page_keep_their_own_passages(
+    server: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    link = f"{server}/long"
+
+    async def fake_search(query: str, *, config: Any) -> list[dict[str, Any]]:
+        return [{"link": link, "snippet": "Rome"}]
+
+    monkeypatch.setattr(node, "search", fake_search)
+
+    async def run() -> ReferenceStore:
+        store = ReferenceStore()
+        config = interview_config(passages_per_page=1, passage_max_tokens=40)
+        try:
+            for question in (
+                "What did the senators debate?",
+                "Where did the legions march?",
+            ):
+                update = await node.search_for_context(ask(question), config)
+                store = store.extended(update["references"].items())
+        finally:
+            await close_session(config)
+        return store
+
+    store = asyncio.run(run())
+    assert store[passage_url(link, 3)] == SUBJECTS[2]
+    assert store[passage_url(link, 2)] == SUBJECTS[1]
+    assert passage_url(link, 1) not in store
@@ -0,0 +1,112 @@
+import asyncio
+from typing import Any
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from web_research_graph.interviews_graph.answers_graph.nodes import search as node
+from web_research_graph.interviews_graph.session import close_session
+from web_research_graph.question_index import QuestionIndex, question_shingles
+from web_research_graph.state import Editor, EditorInterviewState, TopicValidation
+
+TOPIC_TERMS = question_shingles("Roman Empire")
+TRADE = "How did trade routes shape the economy of the Roman Empire?"
+TRADE_AGAIN = "How did the trade routes shape the Roman Empire's economy?"
+ARMY = "What role did the army play in the Roman Empire?"
+
+
+def test_index_finds_near_duplicates_only() -> None:
+    async def run() -> QuestionIndex[str]:
+        index: QuestionIndex[str] = QuestionIndex(ignore=TOPIC_TERMS)
+
+        async def fake_search() -> str:
+            return "trade results"
+
+        await index.search(TRADE, fake_search)
+        return index
+
+    index = asyncio.run(run())
+    assert index.find(TRADE_AGAIN) is not None
+    assert index.find(ARMY) is None
+    assert index.find("Tell me about the Roman Empire?") is None
+
+
+def test_concurrent_duplicates_share_one_search() -> None:
+    calls: list[str] = []
+
+    async def run() -> list[tuple[str, bool]]:
+        index: QuestionIndex[str] = QuestionIndex(ignore=TOPIC_TERMS)
+
+        def searcher(question: str) -> Any:
+            async def fake_search() -> str:
+                calls.append(question)
+                await asyncio.sleep(0.01)
+                return f"results for {question}"
+
+            return fake_search
+
+        results = await asyncio.gather(
+            *(index.search(q, searcher(q)) for q in (TRADE, TRADE_AGAIN, ARMY))
+        )
+        assert index.dedup_ratio == pytest.approx(1 / 3)
+        return results
+
+    results = asyncio.run(run())
+    assert calls == [TRADE, ARMY]
+    assert results[1] == (f"results for {TRADE}", True)
+
+
+def test_failed_search_is_not_reused() -> None:
+    async def run() -> tuple[str, bool]:
+        index: QuestionIndex[str] = QuestionIndex(ignore=TOPIC_TERMS)
+
+        async def failing_search() -> str:
+            raise RuntimeError("search down")
+
+        async def fake_search() -> str:
+            return "results"
+
+        with pytest.raises(RuntimeError):
+            await index.search(TRADE, failing_search)
+        return await index.search(TRADE_AGAIN, fake_search)
+
+    assert asyncio.run(run()) == ("results", False)
+
+
+def test_search_node_reuses_results_across_editors(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    queries: list[str] = []
+
+    async def fake_search(query: str, *, config: Any) -> list[dict[str, Any]]:
+        queries.append(query)
+        return [{"link": "https://trade.example", "snippet": "Trade routes"}]
+
+    monkeypatch.setattr(node, "search", fake_search)
+    # Every editor's search node runs under the same interview graph run
+    config: Any = {"configurable": {"checkpoint_ns": "interview_editor:1|search:1"}}
+    topic = TopicValidation(is_valid=True, topic="Roman Empire", message=None)
+
+    def state(name: str, question: str) -> EditorInterviewState:
+        editor = Editor(affiliation="Uni", name=name, role="r", description="d")
+        return EditorInterviewState(
+            topic=topic,
+            editor=editor,
+            interview=[
+                AIMessage(content="So?", name="expert"),
+                AIMessage(content=question, name=name),
+            ],
+        )
+
+    async def run() -> list[Any]:
+        try:
+            return [
+                await node.search_for_context(state("Ada", TRADE), config),
+                await node.search_for_context(state("Bob", TRADE_AGAIN), config),
+            ]
+        finally:
+            await close_session(config)
+
+    first, second = asyncio.run(run())
+    assert queries == [TRADE]
+    assert first == second == {"references": {"https://trade.example": "Trade routes"}}
@@ -0,0 +1,147 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import Any, Optional
+
+import pytest
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import Runnable, RunnableLambda
+
+from web_research_graph import rate_limits
+from web_research_graph.rate_limits import (
+    AdaptiveConcurrency,
+    RateLimitedChatModel,
+    TokenBucket,
+    retry_after_seconds,
+    set_provider_limits,
+)
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+    def __init__(self, retry_after: str) -> None:
+        super().__init__("rate limited")
+        self.response = SimpleNamespace(headers={"retry-after": retry_after})
+
+
+_sync_lock = threading.Lock()
+
+
+class SlowModel(BaseChatModel):
+    in_flight: int = 0
+    peak: int = 0
+    failures: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "slow"
+
+    def _generate(self, messages: Any, stop: Any = None, **kwargs: Any) -> ChatResult:
+        with _sync_lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        time.sleep(0.02)
+        with _sync_lock:
+            self.in_flight -= 1
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="ok"))])
+
+    def with_structured_output(self, schema: Any, **kwargs: Any) -> Runnable:
+        # Like the provider models: format the request, then parse the reply
+        parse = RunnableLambda(lambda message: {"answer": message.content})
+        return self.bind(response_format="json") | parse
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self.failures:
+            self.failures -= 1
+            raise RateLimitError("0.2")
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.02)
+        self.in_flight -= 1
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="ok"))])
+
+
+@pytest.fixture(autouse=True)
+def reset_limiters() -> Any:
+    yield
+    rate_limits._LIMITERS.clear()
+
+
+def test_token_bucket_spaces_out_requests() -> None:
+    bucket = TokenBucket(per_minute=60, burst=1)
+    assert bucket.reserve(1) == 0
+    assert bucket.reserve(1) == pytest.approx(1.0, abs=0.05)
+    bucket.adjust(-2)
+    assert bucket.reserve(1) == 0
+
+
+def test_concurrency_increases_additively_and_halves_on_429() -> None:
+    async def run() -> AdaptiveConcurrency:
+        concurrency = AdaptiveConcurrency(initial=4, cooldown=0)
+        await concurrency.acquire()
+        concurrency.release()
+        assert concurrency.limit == pytest.approx(4.25)
+        await concurrency.acquire()
+        concurrency.release(rate_limited=True)
+        return concurrency
+
+    assert asyncio.run(run()).limit == pytest.approx(2.125)
+
+
+def test_retry_after_headers() -> None:
+    assert retry_after_seconds(RateLimitError("3")) == 3
+    assert retry_after_seconds(ValueError()) is None
+
+
+def test_rate_limited_model_caps_concurrency_and_honours_retry_after() -> None:
+    limiter = set_provider_limits("test", initial_concurrency=2)
+    inner = SlowModel(failures=1)
+    model = RateLimitedChatModel(model=inner, provider="test")
+    prompt = [HumanMessage(content="hi")]
+
+    async def run() -> float:
+        with pytest.raises(RateLimitError):
+            await model.ainvoke(prompt)
+        assert limiter.concurrency.limit == 1
+        start = time.monotonic()
+        await asyncio.gather(*(model.ainvoke(prompt) for _ in range(6)))
+        return time.monotonic() - start
+
+    elapsed = asyncio.run(run())
+    assert inner.peak == 2
+    assert elapsed >= 0.15
+    stats = limiter.stats()
+    assert stats["rate_limited"] == 1 and stats["calls"] == 7
+    assert stats["in_flight"] == 0 and stats["queued"] == 0
+
+
+def test_sync_calls_share_the_provider_limits() -> None:
+    limiter = set_provider_limits("test", initial_concurrency=2, max_concurrency=2)
+    inner = SlowModel()
+    model = RateLimitedChatModel(model=inner, provider="test")
+
+    with ThreadPoolExecutor(6) as pool:
+        list(pool.map(lambda _: model.invoke("hi"), range(6)))
+
+    assert inner.peak == 2
+    assert limiter.stats()["calls"] == 6 and limiter.stats()["in_flight"] == 0
+
+
+def test_structured_output_uses_the_wrapped_model_and_keeps_the_limits() -> None:
+    limiter = set_provider_limits("test")
+    model = RateLimitedChatModel(model=SlowModel(), provider="test")
+
+    chain = model.with_structured_output(dict)
+
+    assert asyncio.run(chain.ainvoke("hi")) == {"answer": "ok"}
+    assert limiter.stats()["calls"] == 1
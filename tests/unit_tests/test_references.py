@@ -0,0 +1,116 @@
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from web_research_graph.blobs import InMemoryBlobStore
+from web_research_graph.references import (
+    ReferenceChannel,
+    ReferenceStore,
+    select_references,
+    set_reference_chunk_store,
+)
+
+
+def test_store_deduplicates_by_url_and_content() -> None:
+    store = ReferenceStore(
+        {
+            "http://www.example.com/page/": "first",
+            "https://example.com/page?utm_source=x": "other text",
+            "https://mirror.org/page": "  FIRST ",
+            "https://example.org/new": "second",
+        }
+    )
+    assert list(store) == ["http://www.example.com/page/", "https://example.org/new"]
+    assert store.get_id("https://example.com/page") == 1
+    assert store["https://example.org/new"] == "second"
+
+
+def test_extending_an_older_view_forks_the_log() -> None:
+    base = ReferenceStore({"https://a.com": "a"})
+    newer = base.extended([("https://b.com", "b")])
+    forked = base.extended([("https://c.com", "c")])
+
+    assert list(base) == ["https://a.com"]
+    assert list(newer) == ["https://a.com", "https://b.com"]
+    assert list(forked) == ["https://a.com", "https://c.com"]
+    assert forked.get_id("https://c.com") == 2
+
+
+def test_channel_appends_only_new_references_and_round_trips() -> None:
+    channel = ReferenceChannel()
+    assert channel.update([{"https://a.com": "a"}, {"https://b.com": "b"}])
+    assert not channel.update([{"https://a.com/": "a"}])
+
+    restored = channel.from_checkpoint(channel.checkpoint())
+    assert [(r.id, r.url) for r in restored.get().records] == [
+        (1, "https://a.com"),
+        (2, "https://b.com"),
+    ]
+
+
+def test_checkpoints_only_write_new_references() -> None:
+    serde = JsonPlusSerializer()
+    chunks = InMemoryBlobStore()
+    set_reference_chunk_store(chunks)
+    try:
+        channel = ReferenceChannel()
+        sizes = []
+        for step in range(200):
+            channel.update([{f"https://{step}.com": f"Content {step} " * 20}])
+            sizes.append(len(serde.dumps_typed(channel.checkpoint())[1]))
+        assert max(sizes) < 100
+        assert len(chunks) == 200
+
+        # A restored channel keeps appending deltas to the same chain
+        restored = channel.from_checkpoint(channel.checkpoint())
+        restored.update([{"https://new.com": "new"}])
+        restored = channel.from_checkpoint(restored.checkpoint())
+        assert len(chunks) == 201
+        assert [r.id for r in restored.get().records] == list(range(1, 202))
+        assert restored.get()["https://new.com"] == "new"
+    finally:
+        set_reference_chunk_store(None)
+
+
+def test_checkpoints_without_a_chunk_store_hold_every_reference() -> None:
+    channel = ReferenceChannel()
+    channel.update([{"https://a.com": "a", "https://b.com": "b"}])
+    checkpoint = channel.checkpoint()
+    assert checkpoint == [["https://a.com", "a"], ["https://b.com", "b"]]
+
+    # A chunk store set later, as in another process, is not needed to restore
+    set_reference_chunk_store(InMemoryBlobStore())
+    try:
+        restored = ReferenceChannel().from_checkpoint(checkpoint)
+    finally:
+        set_reference_chunk_store(None)
+    assert list(restored.get().items()) == [
+        ("https://a.com", "a"),
+        ("https://b.com", "b"),
+    ]
+
+
+def test_search_ranks_references_and_indexes_new_ones() -> None:
+    store = ReferenceStore(
+        {
+            "https://a.com": "Roman aqueducts carried water into cities.",
+            "https://b.com": "The printing press spread books across Europe.",
+        }
+    )
+    assert [r.url for r in store.search("aqueducts water", 3)] == ["https://a.com"]
+
+    store = store.extended([("https://c.com", "Aqueducts of Segovia and Nimes.")])
+    assert {r.url for r in store.search("aqueducts", 3)} == {
+        "https://a.com",
+        "https://c.com",
+    }
+
+
+def test_select_references_pads_with_newest_and_respects_budget() -> None:
+    store = ReferenceStore(
+        {
+            "https://a.com": "Roman aqueducts.",
+            "https://b.com": "Printing press.",
+            "https://c.com": "x" * 400,
+        }
+    )
+    selected = select_references(store, "aqueducts", k=3, max_tokens=50)
+    assert [r.url for r in selected] == ["https://a.com", "https://b.com"]
@@ -0,0 +1,78 @@
+import asyncio
+from pathlib import Path
+from typing import Any
+
+import pytest
+from langchain_core.runnables import RunnableLambda
+
+from web_research_graph import response_cache
+from web_research_graph.prompts import RELATED_TOPICS_PROMPT
+from web_research_graph.state import Perspectives, RelatedTopics
+
+
+class FakeModel:
+    def __init__(self, response: Any) -> None:
+        self.response = response
+        self.calls = 0
+
+    def with_structured_output(self, schema: Any) -> RunnableLambda:
+        def respond(_: Any) -> Any:
+            self.calls += 1
+            return self.response
+
+        return RunnableLambda(respond)
+
+
+def test_structured_responses_are_cached(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    model = FakeModel(RelatedTopics(topics=["Carthage", "Sparta"]))
+    monkeypatch.setattr(response_cache, "load_chat_model", lambda name: model)
+    config: Any = {
+        "configurable": {
+            "llm_cache": "sqlite",
+            "cache_path": str(tmp_path / "cache.sqlite"),
+        }
+    }
+
+    def run(topic: str, enabled: bool = True) -> RelatedTopics:
+        return asyncio.run(
+            response_cache.ainvoke_structured(
+                RELATED_TOPICS_PROMPT,
+                {"topic": topic},
+                RelatedTopics,
+                "openai/gpt-4o-mini",
+                config,
+                cache_enabled=enabled,
+            )
+        )
+
+    first = run("Rome")
+    second = run("Rome")
+    assert isinstance(second, RelatedTopics) and second == first
+    assert model.calls == 1
+
+    run("Athens")
+    run("Rome", enabled=False)
+    assert model.calls == 3
+
+
+def test_dataclass_responses_are_parsed(monkeypatch: pytest.MonkeyPatch) -> None:
+    editor = {"affiliation": "A", "name": "N", "role": "R", "description": "D"}
+    model = FakeModel({"editors": [editor]})
+    monkeypatch.setattr(response_cache, "load_chat_model", lambda name: model)
+    config: Any = {"configurable": {"llm_cache": "memory"}}
+
+    for _ in range(2):
+        perspectives = asyncio.run(
+            response_cache.ainvoke_structured(
+                RELATED_TOPICS_PROMPT,
+                {"topic": "Rome"},
+                Perspectives,
+                "openai/gpt-4o-mini",
+                config,
+            )
+        )
+        assert isinstance(perspectives, Perspectives)
+        assert perspectives.editors[0].name == "N"
+    assert model.calls == 1
@@ -0,0 +1,99 @@
+import asyncio
+from typing import Any
+from uuid import uuid4
+
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+    InMemorySpanExporter,
+)
+
+from benchmarks.fakes import INSTANT, fake_backends
+from web_research_graph.graph import graph
+from web_research_graph.telemetry import TelemetryCallbackHandler
+
+
+def test_every_node_and_model_call_gets_a_span(tmp_path: Any) -> None:
+    exporter = InMemorySpanExporter()
+    tracer_provider = TracerProvider()
+    tracer_provider.add_span_processor(SimpleSpanProcessor(exporter))
+    reader = InMemoryMetricReader()
+    handler = TelemetryCallbackHandler(
+        tracer_provider, MeterProvider(metric_readers=[reader])
+    )
+    config: Any = {
+        "callbacks": [handler],
+        "configurable": {"cache_path": str(tmp_path / "cache.sqlite")},
+    }
+
+    with fake_backends(INSTANT):
+        asyncio.run(graph.ainvoke({"input": "Roman Empire"}, config))
+
+    spans = exporter.get_finished_spans()
+    by_id = {span.context.span_id: span for span in spans}
+    names = {span.name for span in spans}
+    assert {
+        "node validate_topic",
+        "node ask_question",
+        "node generate_article",
+    } <= names
+
+    questions = [span for span in spans if span.name == "node ask_question"]
+    assert {span.attributes["interview.editor_index"] for span in questions} == {
+        0,
+        1,
+        2,
+    }
+    assert max(span.attributes["interview.turn"] for span in questions) == 3
+    interview = next(span for span in spans if span.name == "node interview_editor")
+    assert by_id[questions[0].parent.span_id].name == "node interview_editor"
+    assert by_id[interview.parent.span_id].name == "node conduct_interviews"
+
+    chats = [span for span in spans if span.name.startswith("chat ")]
+    assert chats and all(
+        span.attributes["gen_ai.usage.input_tokens"] > 0 for span in chats
+    )
+    assert all(by_id[span.parent.span_id].name.startswith("node ") for span in chats)
+    search = next(span for span in spans if span.name == "node search_context")
+    assert search.attributes["cache.search.miss"] == 1
+
+    metrics = {
+        metric.name
+        for resource in reader.get_metrics_data().resource_metrics
+        for scope in resource.scope_metrics
+        for metric in scope.metrics
+    }
+    assert {
+        "web_research.node.duration",
+        "web_research.llm.duration",
+        "web_research.llm.tokens",
+        "web_research.cache.lookups",
+    } <= metrics
+
+
+def test_failed_runs_forget_their_attempt_counts() -> None:
+    exporter = InMemorySpanExporter()
+    tracer_provider = TracerProvider()
+    tracer_provider.add_span_processor(SimpleSpanProcessor(exporter))
+    handler = TelemetryCallbackHandler(tracer_provider, MeterProvider())
+    metadata = {"langgraph_node": "search", "langgraph_checkpoint_ns": "search:1"}
+    graph = uuid4()
+    handler.on_chain_start(None, {}, run_id=graph, name="LangGraph")
+
+    # The node fails, is retried and fails again, which fails the graph
+    for _ in range(2):
+        node = uuid4()
+        handler.on_chain_start(
+            None, {}, run_id=node, parent_run_id=graph, metadata=metadata, name="search"
+        )
+        handler.on_chain_error(RuntimeError("search down"), run_id=node)
+    handler.on_chain_error(RuntimeError("search down"), run_id=graph)
+
+    attempts = [
+        span.attributes["langgraph.attempt"] for span in exporter.get_finished_spans()
+    ]
+    assert attempts == [1, 2]
+    assert not handler._attempts
+    assert not handler._parents
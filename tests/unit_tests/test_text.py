@@ -0,0 +1,24 @@
+from web_research_graph.text import content_terms, extract_keywords
+
+
+def test_content_terms_drops_stopwords() -> None:
+    assert content_terms("What is the history of the Roman Empire?") == [
+        "history",
+        "roman",
+        "empire",
+    ]
+
+
+def test_extract_keywords_keeps_order_and_limit() -> None:
+    query = (
+        "Hello, I am a historian. Could you tell me how the Roman aqueducts "
+        "built in 312 BC were engineered?"
+    )
+    keywords = extract_keywords(query, max_keywords=5)
+    assert keywords.split() == [
+        "historian",
+        "roman",
+        "aqueducts",
+        "312",
+        "engineered",
+    ]
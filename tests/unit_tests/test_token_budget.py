@@ -0,0 +1,31 @@
+from langchain_core.messages import AIMessage, HumanMessage
+
+from web_research_graph.text import count_tokens
+from web_research_graph.token_budget import fit_messages
+
+
+def test_count_tokens_depends_on_model_family() -> None:
+    text = "x" * 700
+    assert count_tokens(text, "anthropic/claude") == 200
+    assert count_tokens(text, "openai/gpt-4o") == 175
+
+
+def test_fit_messages_keeps_short_transcripts() -> None:
+    messages = [HumanMessage(content="Hi"), AIMessage(content="Hello")]
+    assert fit_messages(messages, 100) == messages
+
+
+def test_fit_messages_keeps_newest_turns_and_compacts_older_ones() -> None:
+    messages = [
+        HumanMessage(content=f"question {i} " + "word " * 50, name="expert")
+        if i % 2 == 0
+        else AIMessage(content=f"answer {i} " + "word " * 50, name="editor")
+        for i in range(10)
+    ]
+    fitted = fit_messages(messages, 300, start_on="human")
+
+    assert isinstance(fitted[0], HumanMessage)
+    assert fitted[-1] is messages[-1]
+    assert len(fitted) < len(messages)
+    assert "Earlier in the conversation" in str(fitted[0].content)
+    assert "- expert: question" in str(fitted[0].content)
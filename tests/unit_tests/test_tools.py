@@ -0,0 +1,111 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import pytest
+
+from web_research_graph import tools
+
+
+class SlowClient:
+    def __init__(self) -> None:
+        self.queries: list[str] = []
+
+    def text(self, keywords: str, max_results: int) -> list[dict[str, str]]:
+        self.queries.append(keywords)
+        time.sleep(0.2)
+        return [{"href": "http://a", "title": "A", "body": keywords}]
+
+
+def test_run_search_does_not_block_event_loop(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(tools, "get_search_client", SlowClient)
+
+    async def main() -> int:
+        ticks = 0
+
+        async def tick() -> None:
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.create_task(tick())
+        results = await tools._run_search("cats", 1, timeout=5)
+        ticker.cancel()
+        assert results == [{"snippet": "cats", "title": "A", "link": "http://a"}]
+        return ticks
+
+    assert asyncio.run(main()) > 5
+
+
+def test_run_search_times_out(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(tools, "get_search_client", SlowClient)
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(tools._run_search("cats", 1, timeout=0.01))
+
+
+def test_search_client_is_created_once() -> None:
+    assert tools.get_search_client() is tools.get_search_client()
+
+
+def test_queued_search_that_timed_out_never_runs(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    client = SlowClient()
+    monkeypatch.setattr(tools, "get_search_client", lambda: client)
+    monkeypatch.setattr(tools, "_search_executor", ThreadPoolExecutor(max_workers=1))
+
+    async def main() -> None:
+        running = asyncio.create_task(tools._run_search("dogs", 1, timeout=5))
+        await asyncio.sleep(0.05)
+        # Waits behind "dogs" for the only worker and gives up first
+        with pytest.raises(asyncio.TimeoutError):
+            await tools._run_search("cats", 1, timeout=0.01)
+        await running
+
+    asyncio.run(main())
+    tools._search_executor.shutdown(wait=True)
+    assert client.queries == ["dogs"]
+
+
+def test_compress_query_memoizes_llm_summaries(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls: list[str] = []
+
+    async def fake_summarize(query: str, model: Any, config: Any) -> str:
+        calls.append(query)
+        return "short query"
+
+    monkeypatch.setattr(tools, "summarize_query", fake_summarize)
+    monkeypatch.setattr(tools, "load_chat_model", lambda *a, **k: None)
+    config: Any = {"configurable": {"query_compression": "llm"}}
+    query = "What were the most important causes of the fall of the Roman Empire?"
+
+    assert asyncio.run(tools.compress_query(query, config)) == "short query"
+    assert asyncio.run(tools.compress_query(query, config)) == "short query"
+    assert calls == [query]
+
+
+def test_failed_refresh_is_counted(monkeypatch: pytest.MonkeyPatch) -> None:
+    class FailingClient:
+        def text(self, keywords: str, max_results: int) -> list[dict[str, str]]:
+            raise RuntimeError("search down")
+
+    monkeypatch.setattr(tools, "get_search_client", FailingClient)
+    cache = tools.get_cache("memory", "search")
+    assert cache is not None
+    key = tools.search_cache_key("stale cats", 4)
+    cache.set(key, [{"link": "http://a", "snippet": "cats"}])
+    config: Any = {"configurable": {"search_cache_ttl": 0, "cache_path": ""}}
+    errors = tools.SEARCH_CACHE_STATS["refresh_error"]
+
+    async def main() -> Any:
+        result = await tools.search("stale cats", config=config)
+        while tools._refreshes:
+            await asyncio.sleep(0.01)
+        return result
+
+    assert asyncio.run(main()) == [{"link": "http://a", "snippet": "cats"}]
+    assert tools.SEARCH_CACHE_STATS["refresh_error"] == errors + 1
+    assert not tools._refreshes
+    cache.delete(key)
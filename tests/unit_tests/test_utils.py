@@ -0,0 +1,35 @@
+from typing import Any, Iterator
+
+import pytest
+
+from web_research_graph import utils
+
+
+@pytest.fixture
+def init_calls(monkeypatch: pytest.MonkeyPatch) -> Iterator[list[tuple[str, str]]]:
+    calls: list[tuple[str, str]] = []
+
+    def fake_init_chat_model(model: str, model_provider: str, **kwargs: Any) -> Any:
+        calls.append((model_provider, model))
+        return object()
+
+    monkeypatch.setattr(utils, "init_chat_model", fake_init_chat_model)
+    utils.clear_chat_model_cache()
+    yield calls
+    utils.clear_chat_model_cache()
+
+
+def test_load_chat_model_reuses_instances(init_calls: list[tuple[str, str]]) -> None:
+    first = utils.load_chat_model("groq/llama", max_tokens=10)
+    assert utils.load_chat_model("groq/llama", max_tokens=10) is first
+    assert utils.load_chat_model("groq/llama", max_tokens=20) is not first
+    assert init_calls == [("groq", "llama"), ("groq", "llama")]
+
+
+def test_clear_chat_model_cache_by_name(init_calls: list[tuple[str, str]]) -> None:
+    groq = utils.load_chat_model("groq/llama")
+    anthropic = utils.load_chat_model("anthropic/claude")
+
+    assert utils.clear_chat_model_cache("groq/llama") == 1
+    assert utils.load_chat_model("groq/llama") is not groq
+    assert utils.load_chat_model("anthropic/claude") is anthropic
@@ -0,0 +1,51 @@
+import asyncio
+from pathlib import Path
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from web_research_graph.embeddings import CachedEmbeddings, EmbeddingStore
+from web_research_graph.vector_index import VectorIndex
+
+DOCS = [Document(page_content=name) for name in ("x", "x-copy", "y", "xy")]
+VECTORS = np.array([[1.0, 0.0], [0.99, 0.01], [0.0, 1.0], [0.7, 0.7]])
+
+
+def test_search_by_vectors_returns_top_k_per_query() -> None:
+    index = VectorIndex(DOCS, VECTORS, DeterministicFakeEmbedding(size=2))
+    results = index.search_by_vectors(np.array([[1.0, 0.0], [0.0, 2.0]]), k=2)
+    assert [[d.page_content for d in docs] for docs in results] == [
+        ["x", "x-copy"],
+        ["y", "xy"],
+    ]
+
+
+def test_mmr_skips_near_duplicates() -> None:
+    index = VectorIndex(DOCS, VECTORS, DeterministicFakeEmbedding(size=2))
+    results = index.search_by_vectors(
+        np.array([[1.0, 0.0]]), k=2, mmr=True, fetch_k=4, lambda_mult=0.3
+    )
+    assert [d.page_content for d in results[0]] == ["x", "y"]
+
+
+def test_empty_index_returns_no_documents() -> None:
+    index = VectorIndex([], np.zeros((0, 2)), DeterministicFakeEmbedding(size=2))
+    assert index.search_by_vectors(np.ones((2, 2))) == [[], []]
+
+
+def test_queries_are_embedded_in_one_request_and_not_cached(tmp_path: Path) -> None:
+    requests: list[list[str]] = []
+
+    class Recording(DeterministicFakeEmbedding):
+        async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+            requests.append(texts)
+            return [[1.0, 0.0] if text == "x?" else [0.0, 1.0] for text in texts]
+
+    store = EmbeddingStore(str(tmp_path / "embeddings.sqlite"))
+    embeddings = CachedEmbeddings(Recording(size=2), "fake", store)
+    index = VectorIndex(DOCS, VECTORS, embeddings)
+    results = asyncio.run(index.abatch_search(["x?", "y?"], k=1))
+    assert [docs[0].page_content for docs in results] == ["x", "y"]
+    assert requests == [["x?", "y?"]]
+    assert len(store) == 0
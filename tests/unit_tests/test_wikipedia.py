@@ -0,0 +1,53 @@
+import asyncio
+from typing import Any
+
+import pytest
+from langchain_core.documents import Document
+
+from web_research_graph import wikipedia
+
+
+class FakeRetriever:
+    def __init__(self) -> None:
+        self.calls: list[str] = []
+        self.active = 0
+        self.peak = 0
+
+    async def ainvoke(self, title: str, config: Any = None) -> list[Document]:
+        self.calls.append(title)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.05)
+        self.active -= 1
+        if title == "missing":
+            raise LookupError(title)
+        return [Document(page_content=f"About {title}", metadata={"title": title})]
+
+
+def test_load_wikipedia_pages_deduplicates_caches_and_limits(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    retriever = FakeRetriever()
+    monkeypatch.setattr(wikipedia, "get_wikipedia_retriever", lambda: retriever)
+    config: Any = {
+        "configurable": {
+            "wikipedia_cache": "memory",
+            "max_concurrent_wikipedia_lookups": 2,
+        }
+    }
+    titles = ["Rome", "rome", "Carthage", "Sparta", "Athens", "missing"]
+
+    first = asyncio.run(wikipedia.load_wikipedia_pages(titles, config))
+    assert sorted(retriever.calls) == sorted(
+        ["Rome", "Carthage", "Sparta", "Athens", "missing"]
+    )
+    assert retriever.peak == 2
+    assert isinstance(first[-1], LookupError)
+    assert first[0] == first[1]
+
+    second = asyncio.run(wikipedia.load_wikipedia_pages(["Rome", "Athens"], config))
+    assert len(retriever.calls) == 5
+    assert [docs[0].page_content for docs in second] == [  # type: ignore[index]
+        "About Rome",
+        "About Athens",
+    ]